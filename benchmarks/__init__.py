@@ -0,0 +1,4 @@
+"""Microbenchmarks for the theater booking engine.
+
+Run a benchmark from the repository root, e.g.: python3 -m benchmarks.lookup
+"""
@@ -0,0 +1,38 @@
+"""Clerks flipping between suggestions on a busy 26x50 hall: memoized row helpers versus recomputing"""
+import random
+import timeit
+
+from theater_booking import (Theater, allocation_cache_info, clear_allocation_caches,
+                             consecutive_start, find_default_seats, middle_out_columns)
+
+def main(number=20000):
+    rng = random.Random(14)
+    theater = Theater("Bench", 26, 50)
+    for row in range(26):
+        for col in range(50):
+            if rng.random() < 0.6:
+                theater.seating_map[row][col] = "TAKEN"
+    # The same few party sizes and start positions asked for again and again
+    requests = [(rng.randint(1, 8), rng.choice([None, (rng.randrange(26), rng.randrange(50))]))
+                for _ in range(50)]
+
+    def suggest():
+        for num_tickets, start_pos in requests:
+            find_default_seats(theater.seating_map, num_tickets, start_pos)
+
+    clear_allocation_caches()
+    cached = timeit.timeit(suggest, number=number // len(requests))
+    for name, info in allocation_cache_info().items():
+        print(f"{name:20s} hits {info.hits:8d} misses {info.misses:6d}")
+
+    # Same work with the caches emptied before every round of requests
+    def uncached():
+        for helper in (consecutive_start, middle_out_columns):
+            helper.cache_clear()
+        suggest()
+    plain = timeit.timeit(uncached, number=number // len(requests))
+    print(f"{number} suggestions: memoized {cached / number * 1e6:.1f} us, "
+          f"recomputed {plain / number * 1e6:.1f} us each")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Dashboard numbers for hundreds of half-sold 26x50 shows: pure Python vs SeatAnalytics"""
+import random
+import time
+
+from seat_analytics import SeatAnalytics
+from theater_booking import Theater, free_runs
+
+def half_sold(rng):
+    theater = Theater("Bench", 26, 50)
+    while theater.get_available_seats() > 650:
+        theater.book_batch([rng.randint(1, 8)])
+    return theater
+
+def pure_python(theaters, party_sizes=(2, 4)):
+    """The same numbers by scanning every theater's seating_map"""
+    summary = []
+    for theater in theaters:
+        seats_per_row = theater.seats_per_row
+        rows = theater.seating_map.blocked_masks
+        row_fill = [sum(seat is not None for seat in row) / seats_per_row for row in theater.seating_map]
+        column_fill = [sum(theater.seating_map[row][col] is not None for row in range(theater.rows)) / theater.rows
+                       for col in range(seats_per_row)]
+        runs = [[end - start for start, end in free_runs(mask, seats_per_row)] for mask in rows]
+        summary.append((theater.get_available_seats(), row_fill, column_fill,
+                        [max(r, default=0) for r in runs],
+                        [sum(length // size for r in runs for length in r) for size in party_sizes]))
+    return summary
+
+def vectorized(theaters, party_sizes=(2, 4)):
+    analytics = SeatAnalytics(theaters)
+    return (analytics.available(), analytics.row_occupancy(), analytics.column_occupancy(),
+            analytics.longest_free_run(), analytics.parties_that_fit(list(party_sizes)))
+
+def best_of(func, theaters, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(theaters)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    rng = random.Random(1)
+    theaters = [half_sold(rng) for _ in range(500)]
+    for shows in (50, 200, 500):
+        python = best_of(pure_python, theaters[:shows])
+        numpy = best_of(vectorized, theaters[:shows])
+        print(f"{shows:4d} shows: pure Python {python * 1e3:8.2f} ms, "
+              f"NumPy {numpy * 1e3:7.2f} ms ({python / numpy:5.1f}x)")
+
+if __name__ == "__main__":
+    main()
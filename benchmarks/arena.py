@@ -0,0 +1,43 @@
+"""Allocation on arena-sized halls: the index-backed find_default_seats
+against a row-by-row scan, with the front 90% of rows already sold"""
+import random
+import time
+
+from theater_booking import Theater, allocate_seats, find_default_seats, render_seating_map
+
+HALLS = ((26, 50), (100, 200), (300, 300), (500, 500))
+
+def sold_from_front(rng, rows, seats_per_row, sold=0.9):
+    """Full rows up to the sold fraction, then rows about half taken"""
+    theater = Theater("Arena", rows, seats_per_row)
+    for row in range(rows):
+        if row < rows * sold:
+            seats = [(row, col) for col in range(seats_per_row)]
+        else:
+            seats = [(row, col) for col in range(seats_per_row) if rng.random() < 0.5]
+        theater.seating_map.hold(seats)  # held seats block allocation like booked ones
+    return theater
+
+def per_call(func, calls):
+    start = time.perf_counter()
+    for args in calls:
+        func(*args)
+    return (time.perf_counter() - start) / len(calls) * 1e6
+
+def main():
+    rng = random.Random(1)
+    print(f"{'hall':>9s} {'index us':>9s} {'scan us':>9s} {'hold us':>8s} {'render ms':>10s}")
+    for rows, seats_per_row in HALLS:
+        theater = sold_from_front(rng, rows, seats_per_row)
+        seating_map = theater.seating_map
+        calls = [(rng.randint(1, 8),) for _ in range(2000)]
+        indexed = per_call(lambda n: find_default_seats(seating_map, n), calls)
+        scanned = per_call(lambda n: allocate_seats(seating_map.blocked_masks, seats_per_row, n), calls)
+        held = per_call(lambda n: theater.release_hold(theater.hold_seats(n)), calls)
+        start = time.perf_counter()
+        render_seating_map(seating_map)
+        render = (time.perf_counter() - start) * 1e3
+        print(f"{rows:4d}x{seats_per_row:<4d} {indexed:9.1f} {scanned:9.1f} {held:8.1f} {render:10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Drain a queue of orders at sale open: one-at-a-time versus find_batch_seats"""
+import random
+import time
+
+from theater_booking import Theater, find_batch_seats, find_default_seats
+
+def order_queue(seed=1, total_seats=26 * 50):
+    rng = random.Random(seed)
+    parties = []
+    while sum(parties) < total_seats:
+        parties.append(rng.randint(1, 6))
+    return parties
+
+def sequential(parties):
+    theater = Theater("Bench", 26, 50)
+    start = time.perf_counter()
+    for num_tickets in parties:
+        seats = find_default_seats(theater.seating_map, num_tickets)
+        if seats:
+            theater.confirm_booking(theater.generate_booking_id(), seats)
+    return time.perf_counter() - start
+
+def planned(parties):
+    theater = Theater("Bench", 26, 50)
+    start = time.perf_counter()
+    find_batch_seats(theater.seating_map, parties)
+    return time.perf_counter() - start
+
+def booked(parties):
+    theater = Theater("Bench", 26, 50)
+    start = time.perf_counter()
+    theater.book_batch(parties)
+    return time.perf_counter() - start
+
+def main():
+    parties = order_queue()
+    print(f"{len(parties)} orders into an empty 26x50 hall")
+    for name, run in (("one at a time", sequential), ("batch plan", planned), ("book_batch", booked)):
+        elapsed = min(run(parties) for _ in range(5))
+        print(f"{name:14s}: {elapsed * 1e3:7.2f} ms ({len(parties) / elapsed:,.0f} orders/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Seat ownership with integer booking handles against interning each booking
+id string: memory and write time for a 500x500 hall sold in pairs, plus
+booking id encode/decode rates"""
+import time
+import tracemalloc
+
+from theater_booking import BookingIdGenerator, SeatMap
+
+ROWS, SEATS_PER_ROW = 500, 500
+
+def sell_in_pairs(id_codec):
+    """A SeatMap with every seat booked, two seats per booking id"""
+    ids = BookingIdGenerator()
+    seat_map = SeatMap(ROWS, SEATS_PER_ROW, id_codec=id_codec)
+    for row in range(ROWS):
+        seats = seat_map[row]
+        for col in range(0, SEATS_PER_ROW, 2):
+            booking_id = ids.generate()
+            seats[col] = booking_id
+            seats[col + 1] = booking_id
+    return seat_map
+
+def measure(id_codec):
+    start = time.perf_counter()
+    sell_in_pairs(id_codec)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    seat_map = sell_in_pairs(id_codec)
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del seat_map
+    return elapsed, current
+
+def main():
+    bookings = ROWS * SEATS_PER_ROW // 2
+    print(f"{ROWS}x{SEATS_PER_ROW} hall, {bookings:,} bookings of two seats")
+    for name, id_codec in (("handles", BookingIdGenerator()), ("interned ids", None)):
+        elapsed, memory = measure(id_codec)
+        print(f"{name:12s} {elapsed * 1e9 / (ROWS * SEATS_PER_ROW):6.0f} ns per seat write, "
+              f"{memory / 2**20:6.1f} MiB ({memory / bookings:5.1f} B per booking)")
+
+    ids = BookingIdGenerator()
+    handles = range(1, 2_000_001, 7)
+    start = time.perf_counter()
+    booking_ids = [ids.encode(handle) for handle in handles]
+    encode = (time.perf_counter() - start) / len(handles)
+    start = time.perf_counter()
+    decoded = [ids.decode(booking_id) for booking_id in booking_ids]
+    decode = (time.perf_counter() - start) / len(handles)
+    assert decoded == list(handles)
+    print(f"encode {encode * 1e9:5.0f} ns, decode {decode * 1e9:5.0f} ns per id "
+          f"(up to {booking_ids[-1]})")
+
+if __name__ == "__main__":
+    main()
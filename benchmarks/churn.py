@@ -0,0 +1,36 @@
+"""Refund and exchange churn on a 90% sold 26x50 hall: cancel and allocation cost over time"""
+import random
+import time
+
+from theater_booking import Theater, find_default_seats
+
+def main(cycles=20000, report_every=5000):
+    rng = random.Random(21)
+    theater = Theater("Bench", 26, 50)
+    while theater.get_available_seats() > 130:
+        theater.book_batch([rng.randint(1, 6)])
+    cancel_time = book_time = 0.0
+    for cycle in range(1, cycles + 1):
+        booking_id = rng.choice(list(theater.bookings))
+        booking = theater.bookings[booking_id]
+        # Half the refunds are partial (some seats of a group)
+        seats = None if rng.random() < 0.5 else booking.seats[:rng.randint(1, len(booking))]
+        start = time.perf_counter()
+        released = theater.cancel_booking(booking_id, seats)
+        cancel_time += time.perf_counter() - start
+        # Resell as many seats as were refunded, so the hall stays 90% sold
+        start = time.perf_counter()
+        theater.book_batch([len(released)])
+        book_time += time.perf_counter() - start
+        if cycle % report_every == 0:
+            start = time.perf_counter()
+            for _ in range(1000):
+                find_default_seats(theater.seating_map, 4)
+            search = (time.perf_counter() - start) / 1000
+            print(f"after {cycle:6d} cycles: cancel {cancel_time / report_every * 1e6:6.1f} us, "
+                  f"book {book_time / report_every * 1e6:6.1f} us, "
+                  f"find_default_seats {search * 1e6:6.1f} us, {theater.get_available_seats()} free")
+            cancel_time = book_time = 0.0
+
+if __name__ == "__main__":
+    main()
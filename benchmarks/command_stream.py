@@ -0,0 +1,57 @@
+"""Replay a long generated day of commands through the headless mode:
+throughput and peak memory as the stream grows"""
+import io
+import random
+import time
+import tracemalloc
+
+from command_stream import read_commands, run_commands, write_results
+
+def day_of_commands(rng, count):
+    """setup, then bookings, start-position bookings, lookups and cancels;
+    a new hall every 1000 commands, before the old one sells out"""
+    issued = 0
+    for index in range(count):
+        if index % 1000 == 0:
+            issued = 0  # booking ids start again with each hall
+            yield "setup Bench 26 50\n"
+            continue
+        roll = rng.random()
+        if roll < 0.5 or not issued:
+            issued += 1
+            yield f"book {rng.randint(1, 8)}\n"
+        elif roll < 0.6:
+            issued += 1
+            yield f"book-at {rng.randint(1, 8)} {chr(65 + rng.randrange(26))}{rng.randint(1, 50)}\n"
+        elif roll < 0.85:
+            yield f"lookup HKG{rng.randint(1, issued):04d}\n"
+        else:
+            yield f"cancel HKG{rng.randint(1, issued):04d}\n"
+
+class Sink(io.TextIOBase):
+    """Counts what is written instead of keeping it"""
+    def __init__(self):
+        self.chars = 0
+
+    def write(self, text):
+        self.chars += len(text)
+        return len(text)
+
+def replay(count):
+    return write_results(run_commands(read_commands(day_of_commands(random.Random(1), count))), Sink())
+
+def main():
+    for count in (10_000, 100_000, 300_000):
+        start = time.perf_counter()
+        written, errors = replay(count)
+        elapsed = time.perf_counter() - start
+        # Memory in a second run, so tracing does not slow the timed one
+        tracemalloc.start()
+        replay(count)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{written:7d} commands ({errors:6d} errors): {written / elapsed:9,.0f} commands/s, "
+              f"peak {peak / 1024:7.1f} KiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Sell out a hall from many threads with hold/confirm and report throughput.
+
+"default" runs every seller through the centre-first allocator, so they all
+contend for the same front rows. "spread" gives each seller its own starting
+row, which is the low-contention case the per-row locks are designed for.
+"""
+import threading
+import time
+
+from theater_booking import Theater
+
+def sell_out(num_threads, spread, rows=26, seats_per_row=50, party_size=2):
+    theater = Theater("Bench", rows, seats_per_row)
+    counts = [0] * num_threads
+
+    def sell(worker):
+        row = worker * rows // num_threads
+        while theater.get_available_seats():
+            start_pos = None
+            if spread and not theater.seating_map.is_row_full(row):
+                start_pos = (row, 0)
+            hold = theater.hold_seats(min(party_size, theater.get_available_seats()), start_pos)
+            if hold is not None and theater.confirm_hold(hold) is not None:
+                counts[worker] += 1
+            elif spread and start_pos is not None:
+                row = (row + 1) % rows
+
+    threads = [threading.Thread(target=sell, args=(worker,)) for worker in range(num_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    sold = sum(len(booking) for booking in theater.bookings.values())
+    assert sold == rows * seats_per_row, "seats were double-booked or lost"
+    return sum(counts) / elapsed
+
+def main():
+    print("threads  default (bookings/s)  spread (bookings/s)")
+    for num_threads in (1, 2, 4, 8, 16):
+        default = sell_out(num_threads, spread=False)
+        spread = sell_out(num_threads, spread=True)
+        print(f"{num_threads:7d}  {default:20.0f}  {spread:19.0f}")
+
+if __name__ == "__main__":
+    main()
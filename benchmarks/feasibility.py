@@ -0,0 +1,45 @@
+"""Turning down hopeless requests on a nearly sold-out 26x50 hall: the
+feasibility index against running the seat search to find nothing"""
+import random
+import time
+
+from theater_booking import Theater, find_default_seats
+
+def nearly_sold_out(rng):
+    theater = Theater("Bench", 26, 50)
+    while theater.get_available_seats() > 40:
+        theater.book_batch([min(rng.randint(1, 8), theater.get_available_seats() - 40)])
+    return theater
+
+def hopeless_requests(rng, theater, count=20000):
+    """(num_tickets, start_pos) pairs asking for more seats than are left
+    from the start row onward"""
+    starts = [(row, col) for row in range(theater.rows) for col in range(theater.seats_per_row)
+              if theater.seating_map[row][col] is None]
+    requests = []
+    for _ in range(count):
+        start_pos = rng.choice(starts)
+        num_tickets = theater.seating_map.index.free_from(start_pos[0]) + rng.randint(1, 8)
+        requests.append((num_tickets, start_pos))
+    return requests
+
+def timed(func, requests):
+    start = time.perf_counter()
+    for num_tickets, start_pos in requests:
+        func(num_tickets, start_pos)
+    return (time.perf_counter() - start) / len(requests)
+
+def main():
+    rng = random.Random(1)
+    theater = nearly_sold_out(rng)
+    requests = hopeless_requests(rng, theater)
+    search = timed(lambda n, pos: find_default_seats(theater.seating_map, n, pos), requests)
+    check = timed(lambda n, pos: theater.can_seat(n, pos[0]), requests)
+    hold = timed(lambda n, pos: theater.hold_seats(n, pos), requests)
+    print(f"{len(requests)} hopeless requests, {theater.get_available_seats()} seats left")
+    print(f"seat search     {search * 1e6:6.2f} us per request")
+    print(f"index check     {check * 1e6:6.2f} us per request")
+    print(f"hold_seats      {hold * 1e6:6.2f} us per request (rejected by the index)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Thousands of same-size shows: one shared HallGeometry, and cold-cache
+allocation and rendering now that middles, center-out orders, centred
+windows and map frames are table lookups"""
+import random
+import timeit
+import tracemalloc
+
+from theater_booking import (Theater, clear_allocation_caches, find_default_seats, hall_geometry,
+                             render_seating_map)
+
+def main(shows=2000):
+    tracemalloc.start()
+    theaters = [Theater("Bench", 26, 50) for _ in range(shows)]
+    per_show = tracemalloc.get_traced_memory()[0] / shows
+    tracemalloc.stop()
+    geometries = {id(theater.geometry) for theater in theaters}
+    print(f"{shows} 26x50 shows: {len(geometries)} geometry, {per_show / 1024:.1f} KiB per show")
+
+    rng = random.Random(24)
+    theater = theaters[0]
+    for row in range(26):
+        for col in range(50):
+            if rng.random() < 0.5:
+                theater.seating_map[row][col] = "TAKEN"
+    requests = [(rng.randint(1, 8), rng.choice([None, (rng.randrange(26), rng.randrange(50))]))
+                for _ in range(50)]
+
+    def cold_suggest():
+        clear_allocation_caches()  # every helper call misses and does its own work
+        for num_tickets, start_pos in requests:
+            find_default_seats(theater.seating_map, num_tickets, start_pos)
+    number = 200
+    allocate = timeit.timeit(cold_suggest, number=number) / (number * len(requests))
+    render = timeit.timeit(lambda: render_seating_map(theater.seating_map), number=2000) / 2000
+    print(f"cold-cache allocation {allocate * 1e6:.1f} us, render {render * 1e6:.1f} us")
+    print(f"geometry cache: {hall_geometry.cache_info()}")
+
+if __name__ == "__main__":
+    main()
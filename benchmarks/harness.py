@@ -0,0 +1,184 @@
+"""Workload benchmarks with machine-readable results and regression checks.
+
+    python3 -m benchmarks.harness                          # run every workload
+    python3 -m benchmarks.harness --only sellout,lookup    # run some of them
+    python3 -m benchmarks.harness --out results.json       # save the results
+    python3 -m benchmarks.harness --compare results.json   # flag regressions
+
+Each workload is timed op by op for ops/sec and latency percentiles, then
+run again under tracemalloc for its peak memory, so tracing does not skew
+the timings. --compare exits with status 1 when a workload's p50 or p90
+latency got worse than --threshold against the saved run. Throughput is
+reported but not compared: on a busy machine one preemption swings it for
+short workloads, while the percentiles hold steady.
+"""
+import argparse
+import io
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+from benchmarks.load_generator import percentile
+from theater_booking import Theater, display_seating_map, find_default_seats
+
+def sellout(rng, rows=26, seats_per_row=50, halls=20):
+    """Random parties of 1-8 booked through holds until each hall is sold out"""
+    for _ in range(halls):
+        theater = Theater("Bench", rows, seats_per_row)
+        def book():
+            num_tickets = min(rng.randint(1, 8), theater.get_available_seats())
+            theater.confirm_hold(theater.hold_seats(num_tickets))
+        while theater.get_available_seats():
+            yield book
+
+def sellout_small(rng):
+    """The same sell-out on 100 10x20 halls"""
+    return sellout(rng, 10, 20, 100)
+
+def start_positions(rng):
+    """find_default_seats with a start position typed in by the clerk, half-sold hall"""
+    theater = _half_sold(rng)
+    for _ in range(5000):
+        start_pos = (rng.randrange(theater.rows), rng.randrange(theater.seats_per_row))
+        num_tickets = rng.randint(1, 8)
+        yield lambda: find_default_seats(theater.seating_map, num_tickets, start_pos)
+
+def lookup_mix(rng):
+    """Booking lookups on a sold-out hall: 90% hits, 10% unknown ids"""
+    theater = Theater("Bench", 26, 50)
+    while theater.get_available_seats():
+        theater.book_batch([min(rng.randint(1, 8), theater.get_available_seats())])
+    booking_ids = list(theater.bookings)
+    for _ in range(20000):
+        booking_id = rng.choice(booking_ids) if rng.random() < 0.9 else "HKG9999X"
+        yield lambda: theater.find_booking(booking_id)
+
+def display(rng):
+    """display_seating_map of a half-sold hall with one booking selected"""
+    theater = _half_sold(rng)
+    bookings = list(theater.bookings.values())
+    sink = io.StringIO()
+    for _ in range(2000):
+        seats = rng.choice(bookings).seats
+        def show():
+            with redirect_stdout(sink):
+                display_seating_map(theater.seating_map, seats)
+            sink.seek(0)
+            sink.truncate()
+        yield show
+
+def _half_sold(rng):
+    theater = Theater("Bench", 26, 50)
+    while theater.get_available_seats() > 650:
+        theater.book_batch([rng.randint(1, 8)])
+    return theater
+
+MIN_REGRESSION_US = 1.0
+
+WORKLOADS = {
+    "sellout": sellout,
+    "sellout-small": sellout_small,
+    "start-position": start_positions,
+    "lookup": lookup_mix,
+    "display": display,
+}
+
+def measure(workload, seed, repeat=3):
+    """Time every op of the workload; the fastest of repeat runs is kept,
+    which filters out runs disturbed by the rest of the machine"""
+    perf_counter_ns = time.perf_counter_ns
+    runs = []
+    for _ in range(repeat):
+        latencies = []
+        for op in workload(random.Random(seed)):
+            start = perf_counter_ns()
+            op()
+            latencies.append(perf_counter_ns() - start)
+        runs.append(latencies)
+    latencies = min(runs, key=sum)
+    total = sum(latencies) / 1e9
+    latencies.sort()
+
+    tracemalloc.start()
+    for op in workload(random.Random(seed)):
+        op()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "ops": len(latencies),
+        "seconds": round(total, 6),
+        "ops_per_sec": round(len(latencies) / total, 1) if total else 0.0,
+        "p50_us": percentile(latencies, 0.50) / 1e3,
+        "p90_us": percentile(latencies, 0.90) / 1e3,
+        "p99_us": percentile(latencies, 0.99) / 1e3,
+        "max_us": latencies[-1] / 1e3 if latencies else 0.0,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+def run(names, seed, repeat=3):
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "workloads": {name: measure(WORKLOADS[name], seed, repeat) for name in names},
+    }
+
+def regressions(results, baseline, threshold):
+    """Workloads whose p50 or p90 latency rose by more than threshold
+    (and by more than MIN_REGRESSION_US, below the timer's noise)"""
+    found = []
+    for name, current in results["workloads"].items():
+        previous = baseline.get("workloads", {}).get(name)
+        if previous is None:
+            continue
+        for key in ("p50_us", "p90_us"):
+            if (current[key] > previous[key] * (1 + threshold)
+                    and current[key] - previous[key] > MIN_REGRESSION_US):
+                found.append(f"{name}: {key[:3]} {previous[key]:.1f} -> {current[key]:.1f} us")
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", help="comma-separated workloads: " + ",".join(WORKLOADS))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per workload, fastest kept")
+    parser.add_argument("--out", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to check against")
+    parser.add_argument("--threshold", type=float, default=0.3,
+                        help="allowed slowdown before a regression is flagged (default 0.3)")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(WORKLOADS)
+    unknown = [name for name in names if name not in WORKLOADS]
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(unknown)}")
+
+    results = run(names, args.seed, args.repeat)
+    print(f"{'workload':15s} {'ops':>7s} {'ops/s':>11s} {'p50 us':>8s} {'p90 us':>8s} "
+          f"{'p99 us':>8s} {'max us':>9s} {'peak KiB':>9s}")
+    for name, r in results["workloads"].items():
+        print(f"{name:15s} {r['ops']:7d} {r['ops_per_sec']:11,.0f} {r['p50_us']:8.1f} {r['p90_us']:8.1f} "
+              f"{r['p99_us']:8.1f} {r['max_us']:9.1f} {r['peak_kib']:9.1f}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            found = regressions(results, json.load(f), args.threshold)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
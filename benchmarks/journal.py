@@ -0,0 +1,80 @@
+"""Booking latency with the journal attached, and recovery time as history grows"""
+import statistics
+import tempfile
+import threading
+import time
+
+from booking_journal import open_journaled_theater
+from theater_booking import find_default_seats
+
+def churn(theater, bookings, rng_seed=0):
+    """Book and release parties repeatedly so history grows but the hall doesn't fill"""
+    latencies = []
+    for i in range(bookings):
+        start = time.perf_counter()
+        seats = find_default_seats(theater.seating_map, 1 + i % 4)
+        if not seats:
+            for booking_id in list(theater.bookings)[:50]:
+                for row, col in list(theater.bookings[booking_id].seats):
+                    theater.seating_map[row][col] = None
+            continue
+        theater.confirm_booking(theater.generate_booking_id(), seats)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def burst_latency(threads=8, per_thread=200):
+    """Each thread waits for durability (commit) after every booking"""
+    with tempfile.TemporaryDirectory() as directory:
+        theater, journal = open_journaled_theater(directory, "Bench", 26, 50)
+        latencies = []
+
+        def seller():
+            for _ in range(per_thread):
+                start = time.perf_counter()
+                hold = theater.hold_seats(2)
+                if hold is None:
+                    return
+                theater.confirm_hold(hold)
+                journal.commit()
+                latencies.append(time.perf_counter() - start)
+
+        workers = [threading.Thread(target=seller) for _ in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        journal.close()
+    latencies.sort()
+    print(f"durable bookings from {threads} threads: {len(latencies) / elapsed:,.0f}/s, "
+          f"p50 {statistics.median(latencies) * 1e3:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:.2f} ms")
+
+def recovery_time(history, snapshot_every):
+    with tempfile.TemporaryDirectory() as directory:
+        theater, journal = open_journaled_theater(directory, "Bench", 26, 50,
+                                                  snapshot_every=snapshot_every)
+        churn(theater, history)
+        journal.close()
+        start = time.perf_counter()
+        _, journal = open_journaled_theater(directory)
+        elapsed = time.perf_counter() - start
+        journal.close()
+    return elapsed
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        theater, journal = open_journaled_theater(directory, "Bench", 26, 50)
+        latencies = churn(theater, 5000)
+        journal.close()
+    print(f"booking with journal attached (no wait): {statistics.mean(latencies) * 1e6:.1f} us mean")
+    burst_latency()
+    for history in (5000, 20000, 80000):
+        unbounded = recovery_time(history, snapshot_every=10 ** 9)
+        bounded = recovery_time(history, snapshot_every=5000)
+        print(f"recovery after {history:6d} bookings: {unbounded * 1e3:7.1f} ms without snapshots, "
+              f"{bounded * 1e3:6.1f} ms with snapshots")
+
+if __name__ == "__main__":
+    main()
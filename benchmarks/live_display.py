@@ -0,0 +1,38 @@
+"""Keep many displays of a selling 26x50 hall current: full redraws versus deltas"""
+import io
+import random
+import time
+
+from live_display import LiveDisplay, SeatMapBroadcaster
+from theater_booking import Theater, render_seating_map
+
+def main(displays=200, sales=300):
+    for mode in ("full", "ansi", "message"):
+        theater = Theater("Bench", 26, 50)
+        rng = random.Random(5)
+        broadcaster = SeatMapBroadcaster(theater, "message" if mode == "message" else "ansi")
+        screens = [LiveDisplay(broadcaster, io.StringIO()) for _ in range(displays)]
+        for display in screens:
+            display.refresh()
+        written = 0
+        start = time.perf_counter()
+        for _ in range(sales):
+            hold = theater.hold_seats(rng.randint(1, 4))
+            if hold is None:
+                break
+            theater.confirm_hold(hold)
+            for display in screens:
+                if mode == "full":
+                    frame = render_seating_map(theater.seating_map)
+                    display.out.write(frame)
+                    written += len(frame)
+                else:
+                    written += display.refresh()
+            for display in screens:
+                display.out.seek(0)
+                display.out.truncate()
+        elapsed = time.perf_counter() - start
+        print(f"{mode:8s} {elapsed * 1e3:8.1f} ms, {written / (sales * displays):7.1f} chars per display update")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Load generator for booking_server.py: many concurrent clients, latency report.
+
+Start the server first (python3 booking_server.py), or pass --start-server:
+
+    python3 -m benchmarks.load_generator --clients 1000 --requests 20 --start-server
+
+Each client keeps one connection open and cycles through AVAIL, HOLD,
+CONFIRM/CANCEL and LOOKUP against the first show the server lists.
+"""
+import argparse
+import asyncio
+import random
+import subprocess
+import sys
+import time
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+async def request(reader, writer, line, latencies):
+    start = time.perf_counter()
+    writer.write(line.encode() + b"\n")
+    response = (await reader.readline()).decode().strip()
+    latencies.append(time.perf_counter() - start)
+    return response
+
+async def client(host, port, show, num_requests, latencies, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    booking_id = None
+    try:
+        sent = 0
+        while sent < num_requests:
+            step = sent % 4
+            if step == 0:
+                await request(reader, writer, f"AVAIL {show}", latencies)
+            elif step == 1:
+                response = await request(reader, writer, f"HOLD {show} {rng.randint(1, 4)}", latencies)
+                booking_id = response.split()[1] if response.startswith("OK") else None
+            elif step == 2:
+                command = "CONFIRM" if rng.random() < 0.8 else "CANCEL"
+                await request(reader, writer, f"{command} {booking_id or 'NONE'}", latencies)
+            else:
+                await request(reader, writer, f"LOOKUP {booking_id or 'NONE'}", latencies)
+            sent += 1
+    finally:
+        writer.close()
+
+async def run(host, port, num_clients, num_requests):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b"SHOWS\n")
+    shows = (await reader.readline()).decode().split()[1:]
+    writer.close()
+    if not shows:
+        raise SystemExit("server has no shows")
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, shows[i % len(shows)].replace("/", " "), num_requests, latencies, i)
+        for i in range(num_clients)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"{num_clients} clients x {num_requests} requests in {elapsed:.2f}s")
+    print(f"throughput: {len(latencies) / elapsed:,.0f} requests/s")
+    print(f"latency p50: {percentile(latencies, 0.50) * 1e3:.2f} ms")
+    print(f"latency p99: {percentile(latencies, 0.99) * 1e3:.2f} ms")
+
+async def wait_for_server(host, port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--start-server", action="store_true",
+                        help="run booking_server.py in a subprocess for the test")
+    args = parser.parse_args()
+
+    server = None
+    if args.start_server:
+        server = subprocess.Popen([
+            sys.executable, "booking_server.py", "--host", args.host, "--port", str(args.port),
+            "--show", "1", "19:00", "Feature", "26", "50",
+            "--show", "2", "19:00", "Feature", "26", "50",
+        ])
+    try:
+        asyncio.run(wait_for_server(args.host, args.port))
+        asyncio.run(run(args.host, args.port, args.clients, args.requests))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
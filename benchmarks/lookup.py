@@ -0,0 +1,40 @@
+"""Compare booking lookup by seating_map scan against the Theater booking index"""
+import timeit
+
+from theater_booking import Theater, find_default_seats
+
+def scan_lookup(seating_map, booking_id):
+    """The original check_booking lookup: walk every seat in the hall"""
+    booked_seats = []
+    for row_idx, row in enumerate(seating_map):
+        for col_idx, seat in enumerate(row):
+            if seat == booking_id:
+                booked_seats.append((row_idx, col_idx))
+    return booked_seats
+
+def index_lookup(theater, booking_id):
+    booking = theater.find_booking(booking_id)
+    return booking.seats if booking else []
+
+def build_full_theater(rows=26, seats_per_row=50, party_size=4):
+    theater = Theater("Bench", rows, seats_per_row)
+    while theater.get_available_seats():
+        seats = find_default_seats(theater.seating_map, min(party_size, theater.get_available_seats()))
+        theater.confirm_booking(theater.generate_booking_id(), seats)
+    return theater
+
+def main(number=2000):
+    theater = build_full_theater()
+    booking_ids = list(theater.bookings)
+    # Worst case for the scan: the last booking sits in the back row
+    booking_id = booking_ids[-1]
+    assert scan_lookup(theater.seating_map, booking_id) == index_lookup(theater, booking_id)
+
+    scan = timeit.timeit(lambda: scan_lookup(theater.seating_map, booking_id), number=number)
+    index = timeit.timeit(lambda: index_lookup(theater, booking_id), number=number)
+    print(f"{len(booking_ids)} bookings in a {theater.rows}x{theater.seats_per_row} hall")
+    print(f"scan : {scan / number * 1e6:9.2f} us/lookup")
+    print(f"index: {index / number * 1e6:9.2f} us/lookup ({scan / index:.0f}x faster)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Measure memory held per screening with the compact seat-state store"""
+import tracemalloc
+
+from theater_booking import Theater, find_default_seats
+
+def list_of_lists(rows, seats_per_row):
+    """The original seating_map layout, for comparison"""
+    return [[None for _ in range(seats_per_row)] for _ in range(rows)]
+
+def measure(factory, count):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    shows = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(shows)
+
+def half_sold_theater(i, rows=26, seats_per_row=50):
+    theater = Theater(f"Show {i}", rows, seats_per_row)
+    while theater.get_available_seats() > rows * seats_per_row // 2:
+        seats = find_default_seats(theater.seating_map, 4)
+        theater.confirm_booking(theater.generate_booking_id(), seats)
+    return theater
+
+def main(count=200):
+    empty = measure(lambda i: Theater(f"Show {i}", 26, 50), count)
+    lists = measure(lambda i: list_of_lists(26, 50), count)
+    half = measure(half_sold_theater, count // 4)
+    print(f"empty 26x50 Theater     : {empty / 1024:8.1f} KiB")
+    print(f"empty list-of-lists map : {lists / 1024:8.1f} KiB")
+    print(f"half-sold 26x50 Theater : {half / 1024:8.1f} KiB (including booking index)")
+
+if __name__ == "__main__":
+    main()
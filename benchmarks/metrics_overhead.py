@@ -0,0 +1,49 @@
+"""Cost of the metrics layer on the hot paths: never enabled, enabled, tracing, disabled again"""
+import random
+import timeit
+
+import metrics
+import theater_booking
+from theater_booking import Theater
+
+def half_sold_theater(rng):
+    theater = Theater("Bench", 26, 50)
+    while theater.get_available_seats() > 650:
+        theater.book_batch([rng.randint(1, 8)])
+    return theater
+
+def per_call(statement, number):
+    # Best of five runs, calling through the module/class as the engine does
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e6
+
+def measure(theater, booking_id, seats):
+    return {
+        "find_default_seats": per_call(
+            lambda: theater_booking.find_default_seats(theater.seating_map, 4), 20000),
+        "find_booking": per_call(lambda: theater.find_booking(booking_id), 200000),
+        "render_seating_map": per_call(
+            lambda: theater_booking.render_seating_map(theater.seating_map, seats), 5000),
+    }
+
+def main():
+    theater = half_sold_theater(random.Random(17))
+    booking = next(iter(theater.bookings.values()))
+    args = (theater, booking.booking_id, booking.seats)
+
+    baseline = measure(*args)
+    metrics.enable()
+    enabled = measure(*args)
+    metrics.enable(tracing=True)
+    tracing = measure(*args)
+    metrics.disable()
+    disabled = measure(*args)
+
+    print(f"{'us per call':20s} {'never on':>9s} {'enabled':>16s} {'tracing':>16s} {'disabled':>16s}")
+    for name, base in baseline.items():
+        cells = [f"{base:9.2f}"]
+        for results in (enabled, tracing, disabled):
+            cells.append(f"{results[name]:8.2f} ({(results[name] / base - 1) * 100:+4.0f}%)")
+        print(f"{name:20s} " + " ".join(cells))
+
+if __name__ == "__main__":
+    main()
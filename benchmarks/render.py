@@ -0,0 +1,53 @@
+"""Render a half-sold 26x50 hall with large selections: per-row prints versus one buffer"""
+import io
+import random
+import timeit
+from contextlib import redirect_stdout
+
+from theater_booking import Theater, render_seating_map, row_mask
+
+def per_row_display(seating_map, selected_seats=None):
+    """The original renderer: list membership per seat and one print per row"""
+    seats_per_row = len(seating_map[0])
+    total_width = 2 * seats_per_row
+    print("\n" + " ".join("SCREEN").center(total_width + 2))
+    print("-" * (total_width + 2))
+    for row_idx in range(len(seating_map) - 1, -1, -1):
+        row = seating_map[row_idx]
+        seats = []
+        for col_idx in range(len(row)):
+            if selected_seats and (row_idx, col_idx) in selected_seats:
+                seats.append(" #")
+            elif row[col_idx] is not None:
+                seats.append(" o")
+            else:
+                seats.append(" •")
+        print(f"{chr(65 + row_idx)} {''.join(seats)}")
+    first_line = second_line = "  "
+    for num in range(1, seats_per_row + 1):
+        first_line += f" {num}" if num < 10 else f" {num // 10}"
+        second_line += "  " if num < 10 else f" {num % 10}"
+    print(first_line.rstrip())
+    print(second_line.rstrip())
+
+def main(number=200):
+    rng = random.Random(11)
+    theater = Theater("Bench", 26, 50)
+    for row in range(26):
+        for col in range(50):
+            if rng.random() < 0.5:
+                theater.seating_map[row][col] = "TAKEN"
+    free = [(row, col) for row in range(26) for col in range(50)
+            if not row_mask(theater.seating_map, row) >> col & 1]
+
+    for size in (0, 50, 300):
+        selected = rng.sample(free, size)
+        sink = io.StringIO()
+        with redirect_stdout(sink):
+            old = timeit.timeit(lambda: per_row_display(theater.seating_map, selected), number=number)
+        new = timeit.timeit(lambda: render_seating_map(theater.seating_map, selected), number=number)
+        print(f"{size:3d} selected: per-row {old / number * 1e6:8.1f} us, "
+              f"buffered {new / number * 1e6:7.1f} us ({old / new:.0f}x)")
+
+if __name__ == "__main__":
+    main()
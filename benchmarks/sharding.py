@@ -0,0 +1,77 @@
+"""Throughput of a book/lookup/availability mix against the number of shard worker processes.
+
+    python3 -m benchmarks.sharding --workers 1,2,4,8
+
+Scaling needs free cores: with fewer cores than workers the extra processes
+only add pipe round trips.
+"""
+import argparse
+import os
+import random
+import time
+
+from sharded_venue import WORKER_CALLS, ShardedVenue
+from venue import Venue
+
+def make_shows(count):
+    return [(str(screen), f"{hour}:00", "Feature", 26, 50)
+            for screen in range(1, count // 4 + 1) for hour in (13, 16, 19, 22)]
+
+def make_batches(shows, requests, batch_size, seed=18):
+    """70% bookings of 1-4 seats, 20% lookups of earlier bookings (by the
+    ids the sequence will produce), 10% availability checks"""
+    rng = random.Random(seed)
+    batches, batch = [], []
+    for _ in range(requests):
+        screen, showtime = rng.choice(shows)[:2]
+        roll = rng.random()
+        if roll < 0.7:
+            batch.append(("book", screen, showtime, rng.randint(1, 4)))
+        elif roll < 0.9:
+            batch.append(("lookup", f"HKG{rng.randint(1, 1000):04d}"))
+        else:
+            batch.append(("avail", screen, showtime))
+        if len(batch) == batch_size:
+            batches.append(batch)
+            batch = []
+    if batch:
+        batches.append(batch)
+    return batches
+
+def run_in_process(shows, batches):
+    venue = Venue()
+    venue.load_shows(shows)
+    start = time.perf_counter()
+    for batch in batches:
+        for name, *args in batch:
+            WORKER_CALLS[name](venue, *args)
+    return time.perf_counter() - start
+
+def run_sharded(shows, batches, workers):
+    with ShardedVenue(workers) as venue:
+        venue.load_shows(shows)
+        start = time.perf_counter()
+        for batch in batches:
+            venue.execute(batch)
+        return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--shows", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=40000)
+    parser.add_argument("--batch", type=int, default=500, help="calls per router batch")
+    args = parser.parse_args()
+
+    shows = make_shows(args.shows)
+    batches = make_batches(shows, args.requests, args.batch)
+    print(f"{len(shows)} shows, {args.requests} requests in batches of {args.batch}, "
+          f"{os.cpu_count()} CPUs")
+    elapsed = run_in_process(shows, batches)
+    print(f"in-process Venue : {args.requests / elapsed:10,.0f} requests/s")
+    for workers in map(int, args.workers.split(",")):
+        elapsed = run_sharded(shows, batches, workers)
+        print(f"{workers:2d} worker(s)     : {args.requests / elapsed:10,.0f} requests/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Time opening a day's shows from a mmap snapshot versus pickle and JSON.
+
+Each format is loaded and then asked for get_available_seats on every show
+plus one rendered seat map, the typical first thing a dashboard does.
+"""
+import json
+import os
+import pickle
+import random
+import tempfile
+import time
+from unittest.mock import patch
+
+from seat_snapshot import open_snapshot, write_snapshot
+from theater_booking import Theater, display_seating_map
+from venue import Venue
+
+def build_day(shows=500, seed=3):
+    rng = random.Random(seed)
+    venue = Venue()
+    venue.load_shows((f"{i % 20 + 1}", f"{i // 20:02d}:00", f"Movie {i % 20}", 26, 50)
+                     for i in range(shows))
+    for theater in venue.shows.values():
+        theater.book_batch([rng.randint(1, 6) for _ in range(rng.randint(0, 300))])
+    return venue
+
+def to_json_state(theater):
+    return {"movie_name": theater.movie_name, "rows": theater.rows,
+            "seats_per_row": theater.seats_per_row, "show_key": theater.show_key,
+            "seats": [list(row) for row in theater.seating_map]}
+
+def from_json_state(state):
+    theater = Theater(state["movie_name"], state["rows"], state["seats_per_row"])
+    for row_idx, row in enumerate(state["seats"]):
+        for col_idx, booking_id in enumerate(row):
+            if booking_id is not None:
+                theater.seating_map[row_idx][col_idx] = booking_id
+    return theater
+
+def timed(load):
+    start = time.perf_counter()
+    shows = load()
+    total = sum(show.get_available_seats() for show in shows)
+    with patch("builtins.print"):
+        display_seating_map(shows[len(shows) // 2].seating_map)
+    return time.perf_counter() - start, total
+
+def main():
+    venue = build_day()
+    theaters = list(venue.shows.values())
+    with tempfile.TemporaryDirectory() as directory:
+        snap_path = os.path.join(directory, "day.snap")
+        pickle_path = os.path.join(directory, "day.pickle")
+        json_path = os.path.join(directory, "day.json")
+        write_snapshot(snap_path, theaters)
+        with open(pickle_path, "wb") as f:
+            pickle.dump([[list(row) for row in t.seating_map] for t in theaters], f)
+        with open(json_path, "w") as f:
+            json.dump([to_json_state(t) for t in theaters], f)
+
+        def load_pickle():
+            with open(pickle_path, "rb") as f:
+                maps = pickle.load(f)
+            shows = []
+            for theater, seating_map in zip(theaters, maps):
+                show = Theater(theater.movie_name, theater.rows, theater.seats_per_row)
+                for row_idx, row in enumerate(seating_map):
+                    for col_idx, booking_id in enumerate(row):
+                        if booking_id is not None:
+                            show.seating_map[row_idx][col_idx] = booking_id
+                shows.append(show)
+            return shows
+
+        def load_json():
+            with open(json_path) as f:
+                return [from_json_state(state) for state in json.load(f)]
+
+        snapshot = None
+
+        def load_mmap():
+            nonlocal snapshot
+            snapshot = open_snapshot(snap_path)
+            return list(snapshot)
+
+        print(f"{len(theaters)} shows of 26x50")
+        for name, load, path in (("mmap", load_mmap, snap_path),
+                                 ("pickle", load_pickle, pickle_path),
+                                 ("json", load_json, json_path)):
+            elapsed, total = timed(load)
+            print(f"{name:6s}: {elapsed * 1e3:8.1f} ms  file {os.path.getsize(path) / 1e6:5.1f} MB"
+                  f"  ({total} seats available)")
+        snapshot.close()
+
+if __name__ == "__main__":
+    main()
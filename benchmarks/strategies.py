@@ -0,0 +1,47 @@
+"""Sell out a 26x50 hall with each allocation strategy: speed and fragmentation left behind"""
+import random
+import time
+
+from seat_strategies import BestBlockStrategy
+from theater_booking import DEFAULT_STRATEGY, Theater, free_runs
+
+def sell_out(strategy, seed, sold_fraction=0.95):
+    """Book random parties until the hall is sold_fraction full"""
+    rng = random.Random(seed)
+    theater = Theater("Bench", 26, 50, strategy=strategy)
+    capacity = theater.rows * theater.seats_per_row
+    timings = []
+    split_parties = 0
+    while theater.get_available_seats() > capacity * (1 - sold_fraction):
+        num_tickets = min(rng.choice([1, 2, 2, 2, 3, 4, 4, 5, 6, 8]), theater.get_available_seats())
+        start = time.perf_counter()
+        hold = theater.hold_seats(num_tickets, ttl=None)
+        timings.append(time.perf_counter() - start)
+        theater.confirm_hold(hold)
+        rows = {row for row, _ in hold.seats}
+        cols = [col for _, col in hold.seats]
+        if len(rows) > 1 or max(cols) - min(cols) + 1 != len(cols):
+            split_parties += 1
+    runs = [end - start for mask in theater.seating_map.row_masks
+            for start, end in free_runs(mask, theater.seats_per_row)]
+    return timings, split_parties, runs
+
+def main(seeds=5):
+    for strategy in (DEFAULT_STRATEGY, BestBlockStrategy()):
+        timings, splits, orphans, gaps, pairs_left = [], 0, 0, 0, 0
+        for seed in range(seeds):
+            times, split_parties, runs = sell_out(strategy, seed)
+            timings += times
+            splits += split_parties
+            orphans += runs.count(1)
+            gaps += len(runs)
+            pairs_left += sum(length // 2 for length in runs)
+        timings.sort()
+        print(f"{strategy.name:10s} p50 {timings[len(timings) // 2] * 1e6:7.1f} us, "
+              f"p99 {timings[int(len(timings) * 0.99)] * 1e6:7.1f} us, "
+              f"max {timings[-1] * 1e6:7.1f} us | per sell-out: "
+              f"{splits / seeds:5.1f} split parties, {gaps / seeds:5.1f} free gaps, "
+              f"{orphans / seeds:5.1f} orphan seats, {pairs_left / seeds:5.1f} pairs still sellable")
+
+if __name__ == "__main__":
+    main()
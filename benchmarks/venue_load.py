@@ -0,0 +1,19 @@
+"""Time loading a day's schedule of shows into a Venue"""
+import time
+
+from venue import Venue
+
+def day_schedule(screens=20, showtimes=25):
+    for screen in range(1, screens + 1):
+        for slot in range(showtimes):
+            yield f"Screen {screen}", f"{9 + slot // 2:02d}:{slot % 2 * 30:02d}", f"Movie {screen}", 26, 50
+
+def main():
+    venue = Venue()
+    start = time.perf_counter()
+    count = venue.load_shows(day_schedule())
+    elapsed = time.perf_counter() - start
+    print(f"loaded {count} 26x50 shows in {elapsed * 1e3:.1f} ms ({elapsed / count * 1e6:.1f} us/show)")
+
+if __name__ == "__main__":
+    main()
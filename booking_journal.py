@@ -0,0 +1,275 @@
+"""Write-ahead journal and snapshots for one Theater.
+
+Every write is appended to the current journal segment as one JSON line
+[booking_id-or-null, [[row, col], ...]]: a confirmed booking or hold, or a
+cancellation, is one record with all its seats, so a crash never leaves part
+of one on disk (a torn last line is skipped whole). Direct writes into a
+seat are records of one seat. Records are absolute, so replaying one twice
+is harmless. A background thread writes and fsyncs whatever has queued up
+every group_commit_interval seconds (group commit). Writers never wait for
+the disk unless they call commit().
+
+Every snapshot_every records the journal writes a snapshot: the booking index
+plus next_booking_id. It then starts a new segment and deletes the older
+ones, so recovery loads one snapshot and replays a bounded tail.
+
+Directory layout:
+    snapshot.json          latest snapshot, replaced atomically
+    journal-000007.log     segments at or after the snapshot's segment
+"""
+import json
+import os
+import threading
+
+from theater_booking import Theater
+
+SNAPSHOT_FILE = "snapshot.json"
+GROUP_COMMIT_INTERVAL = 0.005  # seconds between group commits
+SNAPSHOT_EVERY = 50000  # journal records between automatic snapshots
+
+def _segment_name(number):
+    return f"journal-{number:06d}.log"
+
+def _segment_numbers(directory):
+    numbers = []
+    for name in os.listdir(directory):
+        if name.startswith("journal-") and name.endswith(".log"):
+            numbers.append(int(name[len("journal-"):-len(".log")]))
+    return sorted(numbers)
+
+def _fsync_directory(directory):
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+class BookingJournal:
+    """Journals every seat change of a Theater into a directory"""
+    def __init__(self, theater, directory, segment=1,
+                 group_commit_interval=GROUP_COMMIT_INTERVAL, snapshot_every=SNAPSHOT_EVERY):
+        self.theater = theater
+        self.directory = directory
+        self.segment = segment
+        self.group_commit_interval = group_commit_interval
+        self.snapshot_every = snapshot_every
+        self.records_in_segment = 0
+        self._pending = []  # encoded records not yet written
+        self._appended = 0  # records appended so far
+        self._durable = 0  # records written and fsynced so far
+        self._lock = threading.Lock()  # guards the queue and counters, never held over I/O
+        self._synced = threading.Condition(self._lock)
+        self._io_lock = threading.Lock()  # guards the segment file; taken before _lock
+        path = os.path.join(directory, _segment_name(segment))
+        self._file = open(path, "ab")
+        # A crash or a failed write may have left part of a line in the segment
+        self._torn = _ends_mid_line(path)
+        self._error = None  # the last write error
+        self._failures = 0  # failed group commits so far
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+        theater.add_write_listener(self._record)
+
+    def _record(self, seats, booking_id):
+        line = json.dumps([booking_id, seats], separators=(",", ":")) + "\n"
+        with self._lock:
+            self._pending.append(line)
+            self._appended += 1
+
+    def commit(self):
+        """Block until every record appended so far is on disk. Raises the
+        OSError of a group commit that fails meanwhile (e.g. disk full); the
+        records stay queued and are retried."""
+        with self._lock:
+            target = self._appended
+            failures = self._failures
+            while self._durable < target and not self._closed:
+                self._synced.wait()
+                if self._failures != failures:
+                    raise self._error
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                self._synced.wait(self.group_commit_interval)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+                if self.records_in_segment >= self.snapshot_every:
+                    self.snapshot()
+            except OSError:
+                pass  # kept for commit() to raise; retried next round
+
+    def _take_pending(self):
+        """Swap out the queued records and the count they bring durability to.
+        Called with _io_lock held, so batches reach the file in queue order."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            return pending, self._appended
+
+    def _write_pending(self):
+        """Write and fsync the queued records; call with _io_lock held. On an
+        I/O error the records go back to the front of the queue, the error is
+        kept for commit() and raised."""
+        pending, target = self._take_pending()
+        data = "".join(pending).encode()
+        if self._torn:
+            data = b"\n" + data  # end the partial line, which replay skips
+        try:
+            self._file.write(data)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as error:
+            self._torn = True
+            with self._lock:
+                self._pending[:0] = pending
+                self._error = error
+                self._failures += 1
+                self._synced.notify_all()
+            raise
+        self._torn = False
+        self.records_in_segment += len(pending)
+        with self._lock:
+            self._durable = target
+            self._synced.notify_all()
+
+    def flush(self):
+        """Write and fsync queued records now (one group commit). Writers
+        only wait for the swap of the queue, never for the disk. Raises
+        OSError if the write fails; the records stay queued."""
+        with self._io_lock:
+            if self._file.closed or not self._pending:
+                return
+            self._write_pending()
+
+    def snapshot(self):
+        """Write a snapshot, start a new segment and drop the older segments"""
+        theater = self.theater
+        with self._io_lock:
+            if self._closed:
+                return
+            # Rotate first: anything written after this point lands in the new
+            # segment, and replaying it over the snapshot is idempotent
+            self._write_pending()
+            new_file = open(os.path.join(self.directory, _segment_name(self.segment + 1)), "ab")
+            self._file.close()
+            self._file = new_file
+            self.segment += 1
+            self.records_in_segment = 0
+            with self._lock:
+                state = _snapshot_state(theater, self.segment)
+        _write_snapshot(self.directory, state)
+        for number in _segment_numbers(self.directory):
+            if number < state["segment"]:
+                os.remove(os.path.join(self.directory, _segment_name(number)))
+
+    def close(self):
+        """Flush, then stop the journal. Raises OSError if the last flush
+        failed; the journal is closed either way."""
+        try:
+            self.flush()
+        finally:
+            with self._io_lock:
+                with self._lock:
+                    self._closed = True
+                    self._synced.notify_all()
+                try:
+                    self._file.close()
+                except OSError:
+                    pass  # unwritten data; flush() has raised its error
+            self._flusher.join()
+
+def _ends_mid_line(path):
+    with open(path, "rb") as f:
+        if not f.seek(0, os.SEEK_END):
+            return False
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+def _snapshot_state(theater, segment):
+    return {
+        "movie_name": theater.movie_name,
+        "rows": theater.rows,
+        "seats_per_row": theater.seats_per_row,
+        "next_booking_id": theater.next_booking_id,
+        "segment": segment,
+        "bookings": {
+            booking_id: {"seats": booking.seats[:], "created_at": booking.created_at}
+            for booking_id, booking in list(theater.bookings.items())
+        },
+    }
+
+def _write_snapshot(directory, state):
+    path = os.path.join(directory, SNAPSHOT_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+    _fsync_directory(directory)
+
+def _replay_segment(theater, path):
+    """Apply the records of one segment. Torn lines, from a crash or a failed
+    write, are skipped whole."""
+    with open(path, "rb") as f:
+        data = f.read()
+    seating_map = theater.seating_map
+    id_generator = theater.id_generator
+    highest_id = 0
+    for line in data.split(b"\n"):
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            if len(record) == 3:  # [row, col, booking_id] from older journals
+                record = [record[2], [record[:2]]]
+            booking_id, seats = record
+            seats = [(row, col) for row, col in seats]
+        except (ValueError, TypeError):
+            continue
+        for row, col in seats:
+            seating_map[row][col] = booking_id
+        handle = id_generator.decode(booking_id) if booking_id else None
+        if handle is not None:
+            highest_id = max(highest_id, handle)
+    if highest_id >= theater.next_booking_id:
+        theater.next_booking_id = highest_id + 1
+
+def open_journaled_theater(directory, movie_name=None, rows=None, seats_per_row=None, **options):
+    """Recover the Theater journaled in directory, or start a new one there.
+
+    Recovery loads the snapshot (if any) and replays only the segments written
+    after it. Returns (theater, journal); options are passed to BookingJournal.
+    """
+    os.makedirs(directory, exist_ok=True)
+    snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+    first_segment = 1
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path) as f:
+            state = json.load(f)
+        theater = Theater(state["movie_name"], state["rows"], state["seats_per_row"])
+        theater.next_booking_id = state["next_booking_id"]
+        for booking_id, entry in state["bookings"].items():
+            seats = [tuple(seat) for seat in entry["seats"]]
+            theater.confirm_booking(booking_id, seats)
+            theater.bookings[booking_id].created_at = entry["created_at"]
+        first_segment = state["segment"]
+    elif movie_name is None:
+        raise FileNotFoundError(f"No journal to recover in {directory}")
+    else:
+        theater = Theater(movie_name, rows, seats_per_row)
+        # An empty snapshot records the hall setup for later recoveries
+        _write_snapshot(directory, _snapshot_state(theater, first_segment))
+
+    segments = [number for number in _segment_numbers(directory) if number >= first_segment]
+    for number in segments:
+        _replay_segment(theater, os.path.join(directory, _segment_name(number)))
+    # Keep appending to the newest segment
+    segment = segments[-1] if segments else first_segment
+    journal = BookingJournal(theater, directory, segment, **options)
+    return theater, journal
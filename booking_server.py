@@ -0,0 +1,244 @@
+"""asyncio TCP front-end for the booking engine.
+
+One request per line, one response line per request. Shows are addressed
+by screen and showtime, seats use the usual labels (A1, B12, ...):
+
+    SHOWS                                  -> OK <screen>/<showtime> ...
+    AVAIL <screen> <showtime>              -> OK <seats available>
+    HOLD <screen> <showtime> <n> [seat]    -> OK <booking id> <seat,seat,...>
+    CONFIRM <booking id>                   -> OK <booking id> <seat,seat,...>
+    CANCEL <booking id>                    -> OK <booking id>  (releases a hold)
+    CANCEL <booking id> [seat,seat,...]    -> OK <booking id> <seat,seat,...>  (cancels a
+                                              booking, or only the listed seats of it)
+    BOOK <screen> <showtime> <n> [seat]    -> OK <booking id> <seat,seat,...>
+    LOOKUP <booking id>                    -> OK <screen> <showtime> <seat,seat,...>
+
+Failures answer "ERR <message>". Run: python3 booking_server.py --port 8765
+
+With --metrics-port the engine is instrumented (see metrics.py) and
+http://<host>:<metrics port>/metrics serves the Prometheus text export.
+"""
+import argparse
+import asyncio
+
+import metrics
+from theater_booking import format_seats, parse_seat_position
+from venue import Venue
+
+HOLD_SWEEP_INTERVAL = 5  # seconds between sweeps of expired holds
+
+def _show_args(venue, args):
+    if len(args) < 3:
+        raise ValueError("expected <screen> <showtime> <tickets> [seat]")
+    theater = venue.get_show(args[0], args[1])
+    if theater is None:
+        raise ValueError(f"no show {args[0]} {args[1]}")
+    try:
+        num_tickets = int(args[2])
+    except ValueError:
+        raise ValueError("tickets must be a number") from None
+    start_pos = None
+    if len(args) > 3:
+        start_pos = parse_seat_position(args[3], theater.rows, theater.seats_per_row)
+        if start_pos is None:
+            raise ValueError(f"invalid seat {args[3]}")
+    return num_tickets, start_pos
+
+def cmd_shows(venue, args):
+    return "OK " + " ".join(f"{screen}/{showtime}" for screen, showtime in venue.shows)
+
+def cmd_avail(venue, args):
+    if len(args) != 2:
+        raise ValueError("expected <screen> <showtime>")
+    theater = venue.get_show(args[0], args[1])
+    if theater is None:
+        raise ValueError(f"no show {args[0]} {args[1]}")
+    return f"OK {theater.get_available_seats()}"
+
+def cmd_hold(venue, args):
+    num_tickets, start_pos = _show_args(venue, args)
+    hold = venue.hold(args[0], args[1], num_tickets, start_pos)
+    if hold is None:
+        raise ValueError("cannot allocate seats")
+    return f"OK {hold.booking_id} {format_seats(hold.seats)}"
+
+def cmd_confirm(venue, args):
+    if len(args) != 1:
+        raise ValueError("expected <booking id>")
+    booking = venue.confirm(args[0])
+    if booking is None:
+        raise ValueError(f"no active hold {args[0]}")
+    return f"OK {booking.booking_id} {format_seats(booking.seats)}"
+
+def cmd_cancel(venue, args):
+    if len(args) not in (1, 2):
+        raise ValueError("expected <booking id> [seat,seat,...]")
+    booking_id = args[0]
+    if len(args) == 1 and venue.release(booking_id):
+        return f"OK {booking_id}"
+    theater = venue.find_show(booking_id)
+    if theater is None:
+        raise ValueError(f"no hold or booking {booking_id}")
+    seats = None
+    if len(args) == 2:
+        seats = [parse_seat_position(label, theater.rows, theater.seats_per_row)
+                 for label in args[1].split(",")]
+        if None in seats:
+            raise ValueError(f"invalid seats {args[1]}")
+    released = venue.cancel(booking_id, seats)
+    if released is None:
+        raise ValueError(f"seats not in booking {booking_id}")
+    return f"OK {booking_id} {format_seats(released)}"
+
+def cmd_book(venue, args):
+    num_tickets, start_pos = _show_args(venue, args)
+    result = venue.book(args[0], args[1], num_tickets, start_pos)
+    if result is None:
+        raise ValueError("cannot allocate seats")
+    booking_id, seats = result
+    return f"OK {booking_id} {format_seats(seats)}"
+
+def cmd_lookup(venue, args):
+    if len(args) != 1:
+        raise ValueError("expected <booking id>")
+    found = venue.find_booking(args[0])
+    if found is None:
+        raise ValueError(f"no booking {args[0]}")
+    theater, booking = found
+    screen, showtime = theater.show_key
+    return f"OK {screen} {showtime} {format_seats(booking.seats)}"
+
+COMMANDS = {
+    "SHOWS": cmd_shows,
+    "AVAIL": cmd_avail,
+    "HOLD": cmd_hold,
+    "CONFIRM": cmd_confirm,
+    "CANCEL": cmd_cancel,
+    "BOOK": cmd_book,
+    "LOOKUP": cmd_lookup,
+}
+
+def handle_command(venue, line):
+    """Run one protocol line against the venue and return the response line"""
+    parts = line.split()
+    if not parts:
+        return "ERR empty command"
+    command = COMMANDS.get(parts[0].upper())
+    if command is None:
+        return f"ERR unknown command {parts[0]}"
+    try:
+        return command(venue, parts[1:])
+    except ValueError as error:
+        return f"ERR {error}"
+
+class BookingServer:
+    """Serves the line protocol for one Venue. Every command runs to completion
+    on the event loop, so the engine sees one request at a time."""
+    def __init__(self, venue, host="127.0.0.1", port=8765, metrics_port=None):
+        self.venue = venue
+        self.host = host
+        self.port = port
+        self.metrics_port = metrics_port
+        self._server = None
+        self._metrics_server = None
+        self._enabled_metrics = False  # whether close() should disable metrics again
+        self._sweeper = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._handle_client, self.host, self.port, backlog=4096)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.metrics_port is not None:
+            self._enabled_metrics = not metrics.enabled()
+            metrics.enable()
+            self._metrics_server = await asyncio.start_server(
+                self._handle_metrics, self.host, self.metrics_port)
+            self.metrics_port = self._metrics_server.sockets[0].getsockname()[1]
+        self._sweeper = asyncio.create_task(self._sweep_holds())
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._sweeper.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+        if self._metrics_server is not None:
+            self._metrics_server.close()
+            await self._metrics_server.wait_closed()
+        if self._enabled_metrics:
+            metrics.disable()  # un-instrument the engine for the rest of the process
+            self._enabled_metrics = False
+
+    async def _sweep_holds(self):
+        while True:
+            await asyncio.sleep(HOLD_SWEEP_INTERVAL)
+            self.venue.release_expired_holds()
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = handle_command(self.venue, line.decode("utf-8", "replace"))
+                writer.write(response.encode() + b"\n")
+                # Only wait for the socket when its buffer is filling up
+                if writer.transport.get_write_buffer_size() > 65536:
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_metrics(self, reader, writer):
+        """Minimal HTTP/1.0 responder for a scraper: any GET returns the export"""
+        try:
+            request = await reader.readline()
+            while (await reader.readline()).strip():
+                pass  # skip the request headers
+            if request.startswith(b"GET "):
+                body = metrics.export_text().encode()
+                writer.write(b"HTTP/1.0 200 OK\r\n"
+                             b"Content-Type: text/plain; version=0.0.4\r\n"
+                             b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+            else:
+                writer.write(b"HTTP/1.0 405 Method Not Allowed\r\n\r\n")
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Rocket Cinemas booking server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--show", action="append", nargs=5,
+                        metavar=("SCREEN", "SHOWTIME", "TITLE", "ROWS", "SEATS"),
+                        help="add a show (repeatable); defaults to one 26x50 show")
+    parser.add_argument("--metrics-port", type=int,
+                        help="instrument the engine and serve /metrics on this port")
+    args = parser.parse_args()
+
+    venue = Venue()
+    shows = args.show or [("1", "19:00", "Feature", "26", "50")]
+    venue.load_shows((screen, showtime, title, int(rows), int(seats))
+                     for screen, showtime, title, rows, seats in shows)
+
+    async def run():
+        server = await BookingServer(venue, args.host, args.port, args.metrics_port).start()
+        print(f"Serving {len(venue.shows)} show(s) on {args.host}:{server.port}")
+        if server.metrics_port is not None:
+            print(f"Metrics on http://{args.host}:{server.metrics_port}/metrics")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Headless command mode: bulk-load presales or replay a day's transactions.
+
+Reads one command per line from files or stdin and writes one result line
+per command, without prompts or seat maps:
+
+    setup <title> <rows> <seats per row>   -> OK <title> <seats available>
+    book <n>                               -> OK <booking id> <seat,seat,...>
+    book-at <n> <seat>                     -> OK <booking id> <seat,seat,...>
+    lookup <booking id>                    -> OK <booking id> <seat,seat,...>
+    cancel <booking id> [seat,seat,...]    -> OK <booking id> <seat,seat,...>
+    map [booking id]                       -> the seating map (several lines),
+                                              with the booking's seats marked
+
+Blank lines and lines starting with # are skipped; failures answer
+"ERR <message>". Commands flow through generators (read_commands,
+run_commands, write_results) and results are written in batches, so a run
+holds one batch of output at a time however long the stream is.
+
+    python3 command_stream.py presales.txt > results.txt
+    python3 command_stream.py < commands.txt
+"""
+import argparse
+import sys
+import time
+from itertools import islice
+
+from theater_booking import (
+    MAX_ROWS, MAX_SEATS_PER_ROW, Theater, format_seats, parse_seat_position, render_seating_map
+)
+
+OUTPUT_BATCH = 4096  # result lines per write
+
+class CommandSession:
+    """The theater a command stream works on; setup replaces it"""
+    def __init__(self, theater=None):
+        self.theater = theater
+
+    def execute(self, parts):
+        """Run one command (a line split into words); returns the result text"""
+        command = COMMANDS.get(parts[0].lower())
+        if command is None:
+            return f"ERR unknown command {parts[0]}"
+        if self.theater is None and command is not cmd_setup:
+            return "ERR no theater, run setup first"
+        try:
+            return command(self, parts[1:])
+        except ValueError as error:
+            return f"ERR {error}"
+
+def _num_tickets(theater, text):
+    try:
+        num_tickets = int(text)
+    except ValueError:
+        raise ValueError("tickets must be a number") from None
+    if num_tickets <= 0:
+        raise ValueError("tickets must be positive")
+    if num_tickets > theater.get_available_seats():
+        raise ValueError(f"only {theater.get_available_seats()} seats available")
+    return num_tickets
+
+def _book(theater, num_tickets, start_pos=None):
+    hold = theater.hold_seats(num_tickets, start_pos, ttl=None)
+    if hold is None or theater.confirm_hold(hold) is None:
+        raise ValueError("cannot allocate seats")
+    return f"OK {hold.booking_id} {format_seats(hold.seats)}"
+
+def _booking(theater, booking_id):
+    booking = theater.find_booking(booking_id)
+    if booking is None:
+        raise ValueError(f"no booking {booking_id}")
+    return booking
+
+def cmd_setup(session, args):
+    if len(args) != 3:
+        raise ValueError("expected <title> <rows> <seats per row>")
+    try:
+        rows, seats_per_row = int(args[1]), int(args[2])
+    except ValueError:
+        raise ValueError("rows and seats per row must be numbers") from None
+    if not 1 <= rows <= MAX_ROWS:
+        raise ValueError(f"rows must be between 1 and {MAX_ROWS}")
+    if not 1 <= seats_per_row <= MAX_SEATS_PER_ROW:
+        raise ValueError(f"seats per row must be between 1 and {MAX_SEATS_PER_ROW}")
+    session.theater = Theater(args[0], rows, seats_per_row)
+    return f"OK {args[0]} {session.theater.get_available_seats()}"
+
+def cmd_book(session, args):
+    if len(args) != 1:
+        raise ValueError("expected <tickets>")
+    return _book(session.theater, _num_tickets(session.theater, args[0]))
+
+def cmd_book_at(session, args):
+    if len(args) != 2:
+        raise ValueError("expected <tickets> <seat>")
+    theater = session.theater
+    num_tickets = _num_tickets(theater, args[0])
+    start_pos = parse_seat_position(args[1], theater.rows, theater.seats_per_row)
+    if start_pos is None:
+        raise ValueError(f"invalid seat {args[1]}")
+    if theater.seating_map.blocked_masks[start_pos[0]] >> start_pos[1] & 1:
+        raise ValueError(f"seat {args[1]} is taken")
+    return _book(theater, num_tickets, start_pos)
+
+def cmd_lookup(session, args):
+    if len(args) != 1:
+        raise ValueError("expected <booking id>")
+    booking = _booking(session.theater, args[0])
+    return f"OK {booking.booking_id} {format_seats(booking.seats)}"
+
+def cmd_cancel(session, args):
+    if len(args) not in (1, 2):
+        raise ValueError("expected <booking id> [seat,seat,...]")
+    theater = session.theater
+    _booking(theater, args[0])
+    seats = None
+    if len(args) == 2:
+        seats = [parse_seat_position(label, theater.rows, theater.seats_per_row)
+                 for label in args[1].split(",")]
+        if None in seats:
+            raise ValueError(f"invalid seats {args[1]}")
+    released = theater.cancel_booking(args[0], seats)
+    if released is None:
+        raise ValueError(f"seats not in booking {args[0]}")
+    return f"OK {args[0]} {format_seats(released)}"
+
+def cmd_map(session, args):
+    if len(args) > 1:
+        raise ValueError("expected [booking id]")
+    theater = session.theater
+    seats = _booking(theater, args[0]).seats if args else None
+    return render_seating_map(theater.seating_map, seats).strip("\n")
+
+COMMANDS = {
+    "setup": cmd_setup,
+    "book": cmd_book,
+    "book-at": cmd_book_at,
+    "lookup": cmd_lookup,
+    "cancel": cmd_cancel,
+    "map": cmd_map,
+}
+
+def read_commands(lines):
+    """Yield each command line split into words, skipping blanks and # comments"""
+    for line in lines:
+        parts = line.split()
+        if parts and not parts[0].startswith("#"):
+            yield parts
+
+def run_commands(commands, session=None):
+    """Yield the result of each command, in order"""
+    execute = (session or CommandSession()).execute
+    for parts in commands:
+        yield execute(parts)
+
+def write_results(results, out, batch=OUTPUT_BATCH):
+    """Write results to out, batch lines per write.
+    Returns (results written, how many were errors)."""
+    written = errors = 0
+    while True:
+        chunk = list(islice(results, batch))
+        if not chunk:
+            return written, errors
+        out.write("\n".join(chunk) + "\n")
+        written += len(chunk)
+        errors += sum(1 for result in chunk if result.startswith("ERR"))
+
+def read_lines(paths):
+    """Lines of each file in turn ("-" or no paths: stdin), read lazily"""
+    if not paths:
+        yield from sys.stdin
+        return
+    for path in paths:
+        if path == "-":
+            yield from sys.stdin
+            continue
+        with open(path) as f:
+            yield from f
+
+def main():
+    parser = argparse.ArgumentParser(description="Run booking commands from files or stdin")
+    parser.add_argument("paths", nargs="*", metavar="FILE", help="command files (default stdin)")
+    parser.add_argument("--quiet", action="store_true", help="do not print the summary to stderr")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written, errors = write_results(run_commands(read_commands(read_lines(args.paths))), sys.stdout)
+    sys.stdout.flush()
+    if not args.quiet:
+        elapsed = time.perf_counter() - start
+        print(f"{written} commands, {errors} errors in {elapsed:.2f} s "
+              f"({written / elapsed if elapsed else 0:,.0f}/s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
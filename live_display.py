@@ -0,0 +1,117 @@
+"""Incremental seat-map updates for lobby displays and clerk screens.
+
+A display that already shows version v of a Theater's map only needs the
+seats that changed since v (Theater.changes_since). SeatMapBroadcaster turns
+those changes into either ANSI cursor updates for a terminal that shows the
+map rendered at origin_line, or a compact text delta message, and shares one
+encoded payload between all subscribers on the same version.
+"""
+from theater_booking import geometry_of, render_seating_map, row_mask
+
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+CELL_UPDATE_LIMIT = 8  # changed seats in a row before the whole row is redrawn
+
+def _seat_glyph(mask, col):
+    return "o" if mask >> col & 1 else "•"
+
+def map_line(rows, row_idx, origin_line=1):
+    """Screen line of a row in a map rendered from origin_line (the map
+    starts with a blank line, SCREEN and a rule, then the back row)"""
+    return origin_line + 3 + (rows - 1 - row_idx)
+
+def render_ansi_delta(seating_map, changes, origin_line=1):
+    """ANSI cursor updates turning the map as it was into the current map.
+    Rows with few changes get per-seat updates, busier rows are redrawn."""
+    geometry = geometry_of(seating_map)
+    rows, seats_per_row = geometry.rows, geometry.seats_per_row
+    parts = []
+    for row_idx in sorted(changes):
+        bits = changes[row_idx]
+        mask = row_mask(seating_map, row_idx)
+        line = map_line(rows, row_idx, origin_line)
+        if bits.bit_count() > CELL_UPDATE_LIMIT:
+            seats = "".join(" " + _seat_glyph(mask, col) for col in range(seats_per_row))
+            parts.append(f"\x1b[{line};1H{geometry.row_prefixes[row_idx]}{seats}\x1b[K")
+            continue
+        while bits:
+            col = (bits & -bits).bit_length() - 1
+            # Row text is "<padded label> " followed by " <glyph>" per seat
+            parts.append(f"\x1b[{line};{geometry.label_width + 2 * col + 3}H{_seat_glyph(mask, col)}")
+            bits &= bits - 1
+    if parts:
+        # Leave the cursor where the full frame leaves it, below the column
+        # numbers (one line per digit of the widest seat number)
+        footer_lines = geometry.footer.count("\n")
+        parts.append(f"\x1b[{map_line(rows, 0, origin_line) + 1 + footer_lines};1H")
+    return "".join(parts)
+
+def render_delta_message(seating_map, version, changes):
+    """Compact delta: "<version> A5=o A6=o C1=." (o booked or held, . free)"""
+    row_labels = geometry_of(seating_map).row_labels
+    parts = [str(version)]
+    for row_idx in sorted(changes):
+        bits = changes[row_idx]
+        mask = row_mask(seating_map, row_idx)
+        label = row_labels[row_idx]
+        while bits:
+            col = (bits & -bits).bit_length() - 1
+            parts.append(f"{label}{col + 1}={'o' if mask >> col & 1 else '.'}")
+            bits &= bits - 1
+    return " ".join(parts)
+
+class SeatMapBroadcaster:
+    """Serves map updates for one Theater to many subscribers.
+
+    update(version) returns (new_version, payload). The payload is a full
+    frame for new subscribers (version None) or ones too far behind the
+    change feed, and a delta otherwise. Payloads are cached per starting
+    version until the map changes again.
+    """
+    def __init__(self, theater, mode="ansi", origin_line=1):
+        if mode not in ("ansi", "message"):
+            raise ValueError(f"Unknown display mode: {mode}")
+        self.theater = theater
+        theater.track_changes()
+        self.mode = mode
+        self.origin_line = origin_line
+        self._cache_version = None
+        self._cache = {}  # starting version -> payload, valid for _cache_version
+
+    def full_frame(self):
+        text = render_seating_map(self.theater.seating_map)
+        if self.mode == "ansi":
+            return CLEAR_SCREEN + "\n" * (self.origin_line - 1) + text
+        return f"{self.theater.version} FULL\n{text}"
+
+    def update(self, version=None):
+        current = self.theater.version
+        if self._cache_version != current:
+            self._cache_version = current
+            self._cache = {}
+        payload = self._cache.get(version)
+        if payload is None:
+            changes = None if version is None else self.theater.changes_since(version)
+            if changes is None:
+                payload = self.full_frame()
+            elif self.mode == "ansi":
+                payload = render_ansi_delta(self.theater.seating_map, changes, self.origin_line)
+            else:
+                payload = render_delta_message(self.theater.seating_map, current, changes) if changes else ""
+            self._cache[version] = payload
+        return current, payload
+
+class LiveDisplay:
+    """One subscriber: remembers its version and writes only what changed"""
+    def __init__(self, broadcaster, out):
+        self.broadcaster = broadcaster
+        self.out = out
+        self.version = None
+
+    def refresh(self):
+        """Bring the display up to date; returns the number of characters written"""
+        self.version, payload = self.broadcaster.update(self.version)
+        if payload:
+            self.out.write(payload)
+            if self.broadcaster.mode == "message":
+                self.out.write("\n")
+        return len(payload)
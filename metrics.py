@@ -0,0 +1,302 @@
+"""Metrics for the booking hot paths: latency histograms, counters, tracing
+spans, a profiling window and a Prometheus text export.
+
+Nothing is measured until enable() is called. enable() puts timing wrappers
+over the functions in HOT_PATHS and disable() puts the originals back, so a
+disabled engine runs exactly the uninstrumented code. Code that took a
+direct reference to one of these functions before enable() (for example
+`from theater_booking import find_default_seats`) keeps calling the
+original; calls through the module or a Theater are measured.
+
+    import metrics
+    metrics.enable(tracing=True)
+    ...
+    print(metrics.export_text())      # Prometheus text exposition format
+    metrics.write_text("/var/lib/node_exporter/booking.prom")
+"""
+import bisect
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+import theater_booking
+from theater_booking import Theater
+
+# (operation, owner, attribute) of every measured function
+HOT_PATHS = (
+    ("allocate", theater_booking, "find_default_seats"),
+    ("allocate", Theater, "hold_seats"),
+    ("lookup", Theater, "find_booking"),
+    ("render", theater_booking, "render_seating_map"),
+    ("confirm", Theater, "confirm_hold"),
+    ("confirm", Theater, "confirm_booking"),
+    ("cancel", Theater, "cancel_booking"),
+)
+
+# Histogram bucket upper bounds in nanoseconds (1 us to 100 ms)
+BUCKET_BOUNDS_NS = (1_000, 2_000, 5_000, 10_000, 20_000, 50_000, 100_000, 200_000, 500_000,
+                    1_000_000, 2_000_000, 5_000_000, 10_000_000, 50_000_000, 100_000_000)
+SPAN_LIMIT = 10000  # most recent spans kept while tracing
+FOLD_BATCH = 1024  # observations queued before they are folded into a histogram
+EMPTY, ERROR = 1, 2
+
+class Histogram:
+    """Latency histogram of one operation, plus call, empty-result and error counts.
+
+    observe() only appends to deques, which is atomic, so instrumented calls
+    never wait on a lock; observations are folded into the buckets a batch
+    at a time and whenever the histogram is read.
+    """
+    def __init__(self):
+        self._buckets = [0] * (len(BUCKET_BOUNDS_NS) + 1)  # last bucket is +Inf
+        self._count = 0
+        self._total_ns = 0
+        self._empty = 0  # calls that returned nothing (no seats, unknown booking)
+        self._errors = 0
+        self._pending = deque()  # elapsed ns of unfolded observations
+        self._pending_flags = deque()  # EMPTY or ERROR for unfolded observations
+        self._lock = threading.Lock()
+
+    def observe(self, elapsed_ns, empty=False, error=False):
+        pending = self._pending
+        pending.append(elapsed_ns)
+        if empty or error:
+            self._pending_flags.append(ERROR if error else EMPTY)
+        if len(pending) >= FOLD_BATCH:
+            self.fold()
+
+    def fold(self):
+        """Move pending observations into the buckets and counters"""
+        with self._lock:
+            pending, pending_flags = self._pending, self._pending_flags
+            # popleft is safe against concurrent appends, unlike swapping deques
+            batch = sorted([pending.popleft() for _ in range(len(pending))])
+            flags = [pending_flags.popleft() for _ in range(len(pending_flags))]
+            previous = 0
+            for index, bound in enumerate(BUCKET_BOUNDS_NS):
+                position = bisect.bisect_right(batch, bound, previous)
+                self._buckets[index] += position - previous
+                previous = position
+            self._buckets[-1] += len(batch) - previous
+            self._count += len(batch)
+            self._total_ns += sum(batch)
+            self._empty += flags.count(EMPTY)
+            self._errors += flags.count(ERROR)
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._pending_flags.clear()
+            self._buckets = [0] * len(self._buckets)
+            self._count = self._total_ns = self._empty = self._errors = 0
+
+    @property
+    def buckets(self):
+        self.fold()
+        return list(self._buckets)
+
+    @property
+    def count(self):
+        self.fold()
+        return self._count
+
+    @property
+    def total_ns(self):
+        self.fold()
+        return self._total_ns
+
+    @property
+    def empty(self):
+        self.fold()
+        return self._empty
+
+    @property
+    def errors(self):
+        self.fold()
+        return self._errors
+
+    def percentile(self, fraction):
+        """Upper bound in seconds of the bucket holding the given fraction of
+        calls (None when it is the +Inf bucket)"""
+        buckets = self.buckets
+        target = fraction * sum(buckets)
+        seen = 0
+        for bound, count in zip(BUCKET_BOUNDS_NS + (None,), buckets):
+            seen += count
+            if count and seen >= target:
+                return None if bound is None else bound / 1e9
+        return 0.0
+
+class Span:
+    """One traced call"""
+    __slots__ = ("operation", "name", "thread", "start_ns", "duration_ns", "depth")
+
+    def __init__(self, operation, name, thread, start_ns, duration_ns, depth):
+        self.operation = operation
+        self.name = name
+        self.thread = thread
+        self.start_ns = start_ns
+        self.duration_ns = duration_ns
+        self.depth = depth  # number of traced calls this one is nested in
+
+    def __repr__(self):
+        return f"Span({self.name}, {self.duration_ns / 1e3:.1f} us, depth {self.depth})"
+
+histograms = {}  # operation -> Histogram
+_originals = {}  # (owner, attribute) -> original function while enabled
+_spans = deque(maxlen=SPAN_LIMIT)
+_local = threading.local()
+_tracing = False
+
+def enabled():
+    return bool(_originals)
+
+def enable(tracing=False):
+    """Start measuring the hot paths; with tracing, also record a Span per call"""
+    global _tracing
+    _tracing = tracing
+    if _originals:
+        return
+    for operation, owner, attribute in HOT_PATHS:
+        original = getattr(owner, attribute)
+        _originals[(owner, attribute)] = original
+        setattr(owner, attribute, _timed(operation, original))
+
+def disable():
+    """Stop measuring and restore the original functions; metrics are kept"""
+    global _tracing
+    _tracing = False
+    while _originals:
+        (owner, attribute), original = _originals.popitem()
+        setattr(owner, attribute, original)
+
+def reset():
+    """Forget every measurement and span"""
+    for histogram in histograms.values():
+        histogram.clear()
+    _spans.clear()
+
+def spans():
+    """Traced calls so far, oldest first"""
+    return list(_spans)
+
+def _histogram(operation):
+    histogram = histograms.get(operation)
+    if histogram is None:
+        histogram = histograms.setdefault(operation, Histogram())
+    return histogram
+
+def _timed(operation, func):
+    perf_counter_ns = time.perf_counter_ns
+    histogram = _histogram(operation)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _tracing:
+            return _traced_call(operation, histogram, func, args, kwargs)
+        start = perf_counter_ns()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            histogram.observe(perf_counter_ns() - start, error=True)
+            raise
+        histogram.observe(perf_counter_ns() - start, not result)
+        return result
+    return wrapper
+
+def _traced_call(operation, histogram, func, args, kwargs):
+    depth = getattr(_local, "depth", 0)
+    _local.depth = depth + 1
+    start = time.perf_counter_ns()
+    try:
+        result = func(*args, **kwargs)
+    except BaseException:
+        histogram.observe(time.perf_counter_ns() - start, error=True)
+        raise
+    finally:
+        _local.depth = depth
+    elapsed = time.perf_counter_ns() - start
+    histogram.observe(elapsed, not result)
+    _spans.append(Span(operation, func.__qualname__, threading.get_ident(), start, elapsed, depth))
+    return result
+
+def export_text():
+    """All metrics in the Prometheus text exposition format"""
+    lines = [
+        "# HELP booking_operation_seconds Latency of booking engine operations",
+        "# TYPE booking_operation_seconds histogram",
+    ]
+    for operation, histogram in sorted(histograms.items()):
+        histogram.fold()
+        label = f'operation="{operation}"'
+        cumulative = 0
+        for bound, count in zip(BUCKET_BOUNDS_NS, histogram._buckets):
+            cumulative += count
+            lines.append(f'booking_operation_seconds_bucket{{{label},le="{bound / 1e9:g}"}} {cumulative}')
+        lines.append(f'booking_operation_seconds_bucket{{{label},le="+Inf"}} {histogram._count}')
+        lines.append(f"booking_operation_seconds_sum{{{label}}} {histogram._total_ns / 1e9:.9f}")
+        lines.append(f"booking_operation_seconds_count{{{label}}} {histogram._count}")
+    for name, attribute, help_text in (
+            ("booking_operation_empty_total", "empty", "Calls that found no seats or no booking"),
+            ("booking_operation_errors_total", "errors", "Calls that raised")):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for operation, histogram in sorted(histograms.items()):
+            lines.append(f'{name}{{operation="{operation}"}} {getattr(histogram, attribute)}')
+    return "\n".join(lines) + "\n"
+
+def write_text(path):
+    """Atomically write export_text() to path, e.g. for node_exporter's textfile collector"""
+    with open(path + ".tmp", "w") as f:
+        f.write(export_text())
+    os.replace(path + ".tmp", path)
+
+class ProfileWindow:
+    """cProfile and tracemalloc sampling between start() and stop(), or for a
+    with block. cProfile only sees the thread that started the window."""
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.stats = None
+        self.snapshot = None
+        self._profiler = None
+        self._started_tracemalloc = False
+
+    def start(self):
+        self._profiler = cProfile.Profile()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._profiler.enable()
+        return self
+
+    def stop(self):
+        self._profiler.disable()
+        self.stats = pstats.Stats(self._profiler)
+        if self.trace_memory and tracemalloc.is_tracing():
+            self.snapshot = tracemalloc.take_snapshot()
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+        return self
+
+    def report(self, limit=15):
+        """Top functions by cumulative time and top allocation sites, as text"""
+        out = io.StringIO()
+        self.stats.stream = out
+        self.stats.sort_stats("cumulative").print_stats(limit)
+        if self.snapshot is not None:
+            out.write("Top allocations:\n")
+            for stat in self.snapshot.statistics("lineno")[:limit]:
+                out.write(f"  {stat}\n")
+        return out.getvalue()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
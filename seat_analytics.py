@@ -0,0 +1,122 @@
+"""Availability analytics across many shows, vectorized with NumPy.
+
+NumPy is optional for the booking engine and only needed here
+(pip install numpy). SeatAnalytics stacks the seat state of many Theaters
+into one boolean array of shape (shows, rows, seats) and answers dashboard
+questions for every show in a few array operations. Halls of different
+sizes are padded; padding seats are neither free nor counted as seats.
+Held seats count as taken, as they do for allocation.
+
+    analytics = SeatAnalytics(venue.shows.values())
+    analytics.fill_rates()         # per show
+    analytics.parties_that_fit(4)  # per show
+"""
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+class SeatAnalytics:
+    """Snapshot of many shows' occupancy; build a new one to refresh"""
+    def __init__(self, theaters):
+        if np is None:
+            raise ImportError("seat_analytics needs NumPy: pip install numpy")
+        theaters = list(theaters)
+        self.keys = [theater.show_key or theater.movie_name for theater in theaters]
+        rows = max((theater.rows for theater in theaters), default=0)
+        seats = max((theater.seats_per_row for theater in theaters), default=0)
+        row_bytes = (seats + 7) // 8
+        # One little-endian bitmask per (show, row), padding rows included
+        empty_row = bytes(row_bytes)
+        packed = b"".join(
+            b"".join(mask.to_bytes(row_bytes, "little") for mask in theater.seating_map.blocked_masks)
+            + empty_row * (rows - theater.rows)
+            for theater in theaters)
+        bits = np.unpackbits(np.frombuffer(packed, dtype=np.uint8), bitorder="little")
+        occupied = bits.reshape(len(theaters), rows, row_bytes * 8)[:, :, :seats].astype(bool)
+
+        shape = np.array([(theater.rows, theater.seats_per_row) for theater in theaters],
+                         dtype=np.int64).reshape(len(theaters), 2)
+        self.valid = ((np.arange(rows)[None, :, None] < shape[:, 0, None, None])
+                      & (np.arange(seats)[None, None, :] < shape[:, 1, None, None]))
+        self.occupied = occupied & self.valid
+        self.free = self.valid & ~occupied
+        self._runs = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def seats(self):
+        return self.valid.sum(axis=(1, 2))
+
+    def available(self):
+        """Free seats per show, as get_available_seats"""
+        return self.free.sum(axis=(1, 2))
+
+    def fill_rates(self):
+        """Fraction of seats taken per show"""
+        return self.occupied.sum(axis=(1, 2)) / np.maximum(self.seats(), 1)
+
+    def row_occupancy(self):
+        """(shows, rows) fraction taken; NaN for rows a hall does not have"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.occupied.sum(axis=2) / self.valid.sum(axis=2)
+
+    def column_occupancy(self):
+        """(shows, seats) fraction taken per seat column; NaN for padding"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.occupied.sum(axis=1) / self.valid.sum(axis=1)
+
+    def heatmap(self):
+        """(rows, seats) fraction of shows in which each seat is taken"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.occupied.sum(axis=0) / self.valid.sum(axis=0)
+
+    def _run_lengths(self):
+        """Length of the free run ending at each seat (0 where the seat is
+        taken). Every row gets a taken seat in front so one flat accumulate
+        covers all rows at once."""
+        if self._runs is None:
+            shows, rows, seats = self.free.shape
+            free = np.zeros((shows, rows, seats + 1), dtype=bool)
+            free[:, :, 1:] = self.free
+            free = free.ravel()
+            index = np.arange(free.size, dtype=np.int32)
+            # Multiplying by the masks is cheaper than np.where on this size
+            runs = np.maximum.accumulate(index * ~free)
+            np.subtract(index, runs, out=runs)
+            runs *= free
+            self._runs = runs.reshape(shows, rows, seats + 1)[:, :, 1:]
+        return self._runs
+
+    def longest_free_run(self):
+        """(shows, rows) length of the longest block of free seats"""
+        return self._run_lengths().max(axis=2, initial=0)
+
+    def parties_that_fit(self, party_size):
+        """Per show, how many parties of party_size could still sit together
+        (each in its own block of consecutive free seats in one row). With a
+        list of sizes, returns a (shows, sizes) array."""
+        runs = self._run_lengths()
+        # A run ends where the next seat is not free
+        ends = self.free.copy()
+        ends[:, :, :-1] &= ~self.free[:, :, 1:]
+        show_of_run = np.nonzero(ends)[0]
+        lengths = runs[ends]
+        counts = np.array([np.bincount(show_of_run, weights=lengths // size, minlength=len(self))
+                           for size in np.atleast_1d(party_size)], dtype=np.int64).T
+        return counts[:, 0] if np.ndim(party_size) == 0 else counts
+
+    def summary(self, party_sizes=(2, 4)):
+        """One dict per show for a dashboard"""
+        available = self.available()
+        fill = self.fill_rates()
+        longest = self.longest_free_run().max(axis=1, initial=0)
+        fits = self.parties_that_fit(list(party_sizes))
+        return [{
+            "show": key,
+            "available": int(available[i]),
+            "fill_rate": float(fill[i]),
+            "largest_block": int(longest[i]),
+            "parties_that_fit": {size: int(fits[i, j]) for j, size in enumerate(party_sizes)},
+        } for i, key in enumerate(self.keys)]
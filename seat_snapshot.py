@@ -0,0 +1,255 @@
+"""Fixed-layout binary snapshots of many shows, read in place through mmap.
+
+A snapshot file holds a day's shows. Opening one maps the file and parses
+only its directory, so get_available_seats, the seat masks and
+display_seating_map read straight from the mapped pages without building
+Python objects per seat. All integers are little-endian.
+
+    file header   8s H H I        magic, version, reserved, show count
+    directory     Q * count       byte offset of each show record
+    show record   I * 6           rows, seats_per_row, free_seats,
+                                  next_booking_id, slot_count, names_len
+                  names_len bytes movie\\0screen\\0showtime (utf-8)
+                  pad to 4 bytes
+                  rows * row_bytes   occupancy bitmask per row, bit c = seat c
+                                     booked (row_bytes = ceil(seats_per_row / 8))
+                  pad to 4 bytes
+                  u32 * rows * seats_per_row   booking slot per seat, 0 = free
+                  u32 * (slot_count + 1)       offsets into the booking id blob
+                  booking id blob (utf-8)
+
+Holds are not written: a snapshot records booked seats only.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+
+from theater_booking import Theater
+
+MAGIC = b"SEATSNAP"
+VERSION = 1
+FILE_HEADER = struct.Struct("<8sHHI")
+SHOW_HEADER = struct.Struct("<6I")
+OFFSET = struct.Struct("<Q")
+
+def _pad4(size):
+    return -size % 4
+
+def _u32_view(buffer):
+    """Zero-copy u32 view of little-endian data (copied on big-endian hosts)"""
+    if sys.byteorder == "little":
+        return buffer.cast("I")
+    values = array("I", bytes(buffer))
+    values.byteswap()
+    return values
+
+def _encode_show(theater):
+    seating_map = theater.seating_map
+    rows, seats_per_row = theater.rows, theater.seats_per_row
+    screen, showtime = theater.show_key or ("", "")
+    names = "\0".join((theater.movie_name, str(screen), str(showtime))).encode()
+    row_bytes = (seats_per_row + 7) // 8
+
+    free_seats = rows * seats_per_row - sum(mask.bit_count() for mask in seating_map.row_masks)
+    owners, booking_ids = seating_map.owner_table()
+    parts = [
+        SHOW_HEADER.pack(rows, seats_per_row, free_seats, theater.next_booking_id,
+                         len(booking_ids), len(names)),
+        names,
+        bytes(_pad4(len(names))),
+    ]
+    occupancy = b"".join(mask.to_bytes(row_bytes, "little") for mask in seating_map.row_masks)
+    parts += [occupancy, bytes(_pad4(len(occupancy)))]
+
+    blob = bytearray()
+    offsets = array("I", [0])
+    for booking_id in booking_ids:
+        if booking_id is not None:
+            blob += booking_id.encode()
+        offsets.append(len(blob))
+    if sys.byteorder != "little":
+        owners.byteswap()
+        offsets.byteswap()
+    parts += [owners.tobytes(), offsets.tobytes(), bytes(blob)]
+    record = b"".join(parts)
+    return record + bytes(_pad4(len(record)))
+
+def write_snapshot(path, theaters):
+    """Write the given Theaters to a snapshot file (atomically replaced)"""
+    records = [_encode_show(theater) for theater in theaters]
+    offset = FILE_HEADER.size + OFFSET.size * len(records)
+    directory = []
+    for record in records:
+        directory.append(OFFSET.pack(offset))
+        offset += len(record)
+    with open(path + ".tmp", "wb") as f:
+        f.write(FILE_HEADER.pack(MAGIC, VERSION, 0, len(records)))
+        f.writelines(directory)
+        f.writelines(records)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+class _MaskView(Sequence):
+    """Row occupancy masks decoded on access from the mapped bitmask bytes"""
+    def __init__(self, occupancy, rows, row_bytes):
+        self._occupancy = occupancy
+        self._rows = rows
+        self._row_bytes = row_bytes
+
+    def __len__(self):
+        return self._rows
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[r] for r in range(*row.indices(self._rows))]
+        if row < 0:
+            row += self._rows
+        if not 0 <= row < self._rows:
+            raise IndexError("row index out of range")
+        start = row * self._row_bytes
+        return int.from_bytes(self._occupancy[start:start + self._row_bytes], "little")
+
+class MappedRow(Sequence):
+    """Read-only row of a mapped show; seats read as booking ids or None"""
+    __slots__ = ("_show", "_offset")
+
+    def __init__(self, show, row_idx):
+        self._show = show
+        self._offset = row_idx * show.seats_per_row
+
+    def __len__(self):
+        return self._show.seats_per_row
+
+    def __getitem__(self, col):
+        if isinstance(col, slice):
+            return [self[c] for c in range(*col.indices(len(self)))]
+        if col < 0:
+            col += len(self)
+        if not 0 <= col < len(self):
+            raise IndexError("seat index out of range")
+        return self._show.booking_id_of(self._show._owners[self._offset + col])
+
+class MappedSeatMap(Sequence):
+    """Read-only seating map over a mapped show record"""
+    def __init__(self, show):
+        self._show = show
+        self.seats_per_row = show.seats_per_row
+        self.blocked_masks = show.row_masks
+
+    def __len__(self):
+        return self._show.rows
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[r] for r in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("row index out of range")
+        return MappedRow(self._show, row)
+
+class MappedShow:
+    """One show read in place from a snapshot; mirrors Theater's read API"""
+    def __init__(self, buffer, offset):
+        (self.rows, self.seats_per_row, self._free_seats, self.next_booking_id,
+         slot_count, names_len) = SHOW_HEADER.unpack_from(buffer, offset)
+        offset += SHOW_HEADER.size
+        movie_name, screen, showtime = bytes(buffer[offset:offset + names_len]).decode().split("\0")
+        self.movie_name = movie_name
+        self.show_key = (screen, showtime)
+        offset += names_len + _pad4(names_len)
+
+        row_bytes = (self.seats_per_row + 7) // 8
+        occupancy_size = self.rows * row_bytes
+        self.row_masks = _MaskView(buffer[offset:offset + occupancy_size], self.rows, row_bytes)
+        offset += occupancy_size + _pad4(occupancy_size)
+
+        seats = self.rows * self.seats_per_row
+        self._owners = _u32_view(buffer[offset:offset + 4 * seats])
+        offset += 4 * seats
+        self._slot_offsets = _u32_view(buffer[offset:offset + 4 * (slot_count + 1)])
+        offset += 4 * (slot_count + 1)
+        self._blob = buffer[offset:offset + self._slot_offsets[slot_count]]
+        self.seating_map = MappedSeatMap(self)
+
+    def release(self):
+        """Drop this show's views of the mapped file; the show is unusable after"""
+        for view in (self.row_masks._occupancy, self._owners, self._slot_offsets, self._blob):
+            if isinstance(view, memoryview):
+                view.release()
+
+    def get_available_seats(self):
+        return self._free_seats
+
+    def booking_id_of(self, slot):
+        if not slot:
+            return None
+        return bytes(self._blob[self._slot_offsets[slot]:self._slot_offsets[slot + 1]]).decode()
+
+    def to_theater(self):
+        """Build a mutable Theater with the same bookings"""
+        theater = Theater(self.movie_name, self.rows, self.seats_per_row)
+        theater.show_key = self.show_key
+        theater.next_booking_id = self.next_booking_id
+        seating_map = theater.seating_map
+        seats_per_row = self.seats_per_row
+        owners = self._owners
+        for i in range(len(owners)):
+            if owners[i]:
+                seating_map[i // seats_per_row][i % seats_per_row] = self.booking_id_of(owners[i])
+        return theater
+
+class MappedSnapshot(Sequence):
+    """All shows of a snapshot file, mapped read-only. Use as a context manager."""
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        self._shows = []
+        self._by_key = None
+        header = bytes(self._buffer[:FILE_HEADER.size])
+        if len(header) < FILE_HEADER.size or FILE_HEADER.unpack(header)[:2] != (MAGIC, VERSION):
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} seat snapshot")
+        count = FILE_HEADER.unpack(header)[3]
+        self._offsets = [OFFSET.unpack_from(self._buffer, FILE_HEADER.size + OFFSET.size * i)[0]
+                         for i in range(count)]
+        self._shows = [None] * count
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        show = self._shows[index]
+        if show is None:
+            show = self._shows[index] = MappedShow(self._buffer, self._offsets[index])
+        return show
+
+    def get_show(self, screen, showtime):
+        """Return the MappedShow for (screen, showtime), or None"""
+        if self._by_key is None:
+            self._by_key = {show.show_key: show for show in self}
+        return self._by_key.get((screen, showtime))
+
+    def close(self):
+        # Views into the map must go before the map can be closed
+        for show in self._shows:
+            if show is not None:
+                show.release()
+        self._shows = []
+        self._by_key = None
+        self._buffer.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def open_snapshot(path):
+    return MappedSnapshot(path)
@@ -0,0 +1,164 @@
+"""Scoring-based seat allocation.
+
+BestBlockStrategy considers every way to seat a party as one block in one
+row, or as two blocks in adjacent rows, and picks the lowest score:
+
+    centrality     per seat, its distance from the centre column plus
+                   row_weight per row away from the preferred row
+    contiguity     split_penalty when the party is split in two blocks
+    rows spanned   row_penalty when the party spans two rows
+    orphans        orphan_penalty per single free seat left stranded next
+                   to the party, which later parties can rarely use
+
+Candidates come from each row's free runs, memoized on the row mask. Single
+rows and then pairs of rows are searched nearest the preferred row first,
+and each search stops once nothing further away can beat the best score so
+far; the pair search also stops once it has scored budget split sizes.
+The budget counts work rather than time, so the same masks always get the
+same seats (find_batch_seats relies on that).
+Parties that need more than two rows, or chose a start position, get the
+default policy.
+"""
+import math
+from functools import lru_cache
+
+from theater_booking import ALLOCATION_CACHE_SIZE, allocate_seats, free_runs, longest_free_run
+
+ROW_WEIGHT = 1.0  # per seat and row away from the preferred row
+SPLIT_PENALTY = 8.0
+ROW_PENALTY = 8.0
+ORPHAN_PENALTY = 4.0
+SEARCH_BUDGET = 2000  # split sizes scored per allocation before settling for the best so far
+
+@lru_cache(maxsize=ALLOCATION_CACHE_SIZE)
+def row_runs(mask, seats_per_row):
+    """Free runs of a row as (start, end) pairs, memoized on the mask"""
+    return tuple(free_runs(mask, seats_per_row))
+
+def column_spread(first, last, centre):
+    """Sum of |col - centre| over columns first..last, in O(1)"""
+    split = min(last, max(first - 1, math.floor(centre)))  # last column left of centre
+    total = 0.0
+    if split >= first:
+        count = split - first + 1
+        total += count * centre - (first + split) * count / 2
+    if last > split:
+        count = last - split
+        total += (split + 1 + last) * count / 2 - count * centre
+    return total
+
+@lru_cache(maxsize=ALLOCATION_CACHE_SIZE)
+def best_row_block(mask, seats_per_row, size, orphan_penalty=ORPHAN_PENALTY):
+    """(cost, start) of the best block of size free seats in a row, or None.
+    Cost is the block's column spread plus the orphan penalties."""
+    centre = (seats_per_row - 1) / 2
+    ideal = math.floor(centre - (size - 1) / 2 + 0.5)
+    best = None
+    for run_start, run_end in row_runs(mask, seats_per_row):
+        last_start = run_end - size
+        if last_start < run_start:
+            continue
+        # The spread is convex in the start and the orphan penalties only hit
+        # the starts next to the run edges, so these candidates cover the best
+        for start in (run_start, last_start, ideal - 1, ideal, ideal + 1):
+            if not run_start <= start <= last_start:
+                continue
+            orphans = (start - run_start == 1) + (run_end - start - size == 1)
+            cost = column_spread(start, start + size - 1, centre) + orphans * orphan_penalty
+            if best is None or (cost, start) < best:
+                best = (cost, start)
+    return best
+
+@lru_cache(maxsize=None)
+def search_order(rows, preferred_row):
+    """Rows, and adjacent row pairs by their first row, nearest preferred_row first"""
+    singles = tuple(sorted(range(rows), key=lambda r: (abs(r - preferred_row), r)))
+    pairs = tuple(sorted(range(rows - 1), key=lambda r: (
+        min(abs(r - preferred_row), abs(r + 1 - preferred_row)), r)))
+    return singles, pairs
+
+class BestBlockStrategy:
+    """Allocation strategy that scores candidate seat sets (see module docs).
+    preferred_row defaults to the middle row of the hall."""
+    name = "best-block"
+
+    def __init__(self, preferred_row=None, row_weight=ROW_WEIGHT, split_penalty=SPLIT_PENALTY,
+                 row_penalty=ROW_PENALTY, orphan_penalty=ORPHAN_PENALTY, budget=SEARCH_BUDGET):
+        self.preferred_row = preferred_row
+        self.row_weight = row_weight
+        self.split_penalty = split_penalty
+        self.row_penalty = row_penalty
+        self.orphan_penalty = orphan_penalty
+        self.budget = budget
+
+    def allocate(self, masks, seats_per_row, num_tickets, start_pos=None, index=None):
+        if start_pos is not None or num_tickets > 2 * seats_per_row:
+            return allocate_seats(masks, seats_per_row, num_tickets, start_pos, index=index)
+        if num_tickets <= 0:
+            return []
+        budget = self.budget
+        rows = len(masks)
+        masks = list(masks)  # a stable copy while other sales go on
+        longest = [longest_free_run(mask, seats_per_row) for mask in masks]
+        preferred = (rows - 1) // 2 if self.preferred_row is None else min(self.preferred_row, rows - 1)
+        centre = (seats_per_row - 1) / 2
+        orphan_penalty = self.orphan_penalty
+        single_spread = None
+        if num_tickets <= seats_per_row:
+            first = max(0, min(seats_per_row - num_tickets, math.floor(centre - (num_tickets - 1) / 2 + 0.5)))
+            single_spread = column_spread(first, first + num_tickets - 1, centre)
+        split_cost = self.split_penalty + self.row_penalty
+        row_weight = self.row_weight
+
+        singles, pairs = search_order(rows, preferred)
+        best = None  # (score, row, start, other row or -1, other start, seats in row)
+        # One block in one row, nearest the preferred row first
+        if single_spread is not None:
+            for row in singles:
+                bound = single_spread + row_weight * abs(row - preferred) * num_tickets
+                if best is not None and best[0] <= bound:
+                    break  # no row further away can do better
+                if longest[row] < num_tickets:
+                    continue
+                cost, start = best_row_block(masks[row], seats_per_row, num_tickets, orphan_penalty)
+                candidate = (cost + row_weight * abs(row - preferred) * num_tickets,
+                             row, start, -1, 0, num_tickets)
+                if best is None or candidate < best:
+                    best = candidate
+
+        # Two blocks in adjacent rows, only while that can still beat the best
+        for row in pairs:
+            other = row + 1
+            distance, other_distance = abs(row - preferred), abs(other - preferred)
+            if best is not None and best[0] <= split_cost + row_weight * min(distance, other_distance) * num_tickets:
+                break
+            if budget <= 0:
+                break
+            # Each part must fit in one free block of its row
+            smallest, largest = max(1, num_tickets - longest[other]), min(longest[row], num_tickets - 1)
+            if smallest > largest:
+                continue
+            if best is not None and split_cost + row_weight * min(
+                    distance * smallest + other_distance * (num_tickets - smallest),
+                    distance * largest + other_distance * (num_tickets - largest)) >= best[0]:
+                continue
+            for size in range(smallest, largest + 1):
+                budget -= 1
+                rest = num_tickets - size
+                base = split_cost + row_weight * (distance * size + other_distance * rest)
+                if best is not None and base >= best[0]:
+                    continue
+                here = best_row_block(masks[row], seats_per_row, size, orphan_penalty)
+                there = best_row_block(masks[other], seats_per_row, rest, orphan_penalty)
+                candidate = (base + here[0] + there[0], row, here[1], other, there[1], size)
+                if best is None or candidate < best:
+                    best = candidate
+
+        if best is None:  # needs more than two rows, or out of time
+            return allocate_seats(masks, seats_per_row, num_tickets, index=index)
+        _, row, start, other, other_start, size = best
+        seats = [(row, col) for col in range(start, start + size)]
+        if other >= 0:
+            seats += [(other, col) for col in range(other_start, other_start + num_tickets - size)]
+        seats.sort()
+        return seats
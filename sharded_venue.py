@@ -0,0 +1,197 @@
+"""Shows partitioned across worker processes, so bookings use every core.
+
+Each worker process owns a plain Venue with the shows of its shard; a show
+lives on shard crc32("<screen>/<showtime>") % workers. The ShardedVenue in
+the calling process is the router: it forwards calls over one pipe per
+worker and batches them, sending every shard its part of a batch before
+waiting for any reply so the shards work in parallel.
+
+Booking ids stay globally unique without coordination: shard k of n issues
+ids k+1, k+1+n, k+1+2n, ..., so the number in an id also names its shard.
+
+    with ShardedVenue(workers=4) as venue:
+        venue.add_show("1", "19:00", "Feature", 26, 50)
+        booking_id, seats = venue.book("1", "19:00", 4)
+        venue.execute([("avail", "1", "19:00"), ("lookup", booking_id)])
+"""
+import multiprocessing
+import os
+import threading
+import zlib
+
+from theater_booking import BookingIdGenerator
+from venue import Venue
+
+def shard_of_show(screen, showtime, shards):
+    return zlib.crc32(f"{screen}/{showtime}".encode()) % shards
+
+def _call_add_show(venue, screen, showtime, movie_name, rows, seats_per_row):
+    venue.add_show(screen, showtime, movie_name, rows, seats_per_row)
+
+def _call_avail(venue, screen, showtime):
+    theater = venue.get_show(screen, showtime)
+    if theater is None:
+        raise KeyError(f"no show {screen} {showtime}")
+    return theater.get_available_seats()
+
+def _call_lookup(venue, booking_id):
+    """(show key, seats) for a booking, or None; Theaters stay in the worker"""
+    found = venue.find_booking(booking_id)
+    if found is None:
+        return None
+    theater, booking = found
+    return theater.show_key, booking.seats[:]
+
+def _call_shows(venue):
+    return list(venue.shows)
+
+# Calls a worker understands: name -> function(venue, *args)
+WORKER_CALLS = {
+    "add_show": _call_add_show,
+    "book": Venue.book,
+    "avail": _call_avail,
+    "lookup": _call_lookup,
+    "cancel": Venue.cancel,
+    "shows": _call_shows,
+}
+FAN_OUT_CALLS = {"shows"}  # sent to every shard; the results are merged and sorted
+
+def _worker(conn, id_prefix, shard, shards):
+    venue = Venue(id_prefix=id_prefix)
+    venue.id_generator = BookingIdGenerator(id_prefix, next_id=shard + 1, step=shards)
+    while True:
+        batch = conn.recv()
+        if batch is None:
+            break
+        results = []
+        for name, args in batch:
+            try:
+                results.append(WORKER_CALLS[name](venue, *args))
+            except (KeyError, ValueError, TypeError) as error:
+                results.append(error)  # raised again in the router
+        conn.send(results)
+    conn.close()
+
+class ShardedVenue:
+    """Router for shows spread over worker processes (see module docs).
+    Results come back as plain data: lookups give (show key, seats)."""
+    def __init__(self, workers=None, id_prefix="HKG"):
+        self.workers = workers or os.cpu_count() or 1
+        self.id_prefix = id_prefix
+        self._ids = BookingIdGenerator(id_prefix)  # decodes booking ids for routing
+        self._conns = []
+        self._processes = []
+        self._lock = threading.Lock()  # one batch in flight at a time
+        for shard in range(self.workers):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker, args=(child, id_prefix, shard, self.workers), daemon=True)
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+
+    def shard_of_show(self, screen, showtime):
+        return shard_of_show(screen, showtime, self.workers)
+
+    def shard_of_booking(self, booking_id):
+        """Shard that issued booking_id, or None if it is not one of ours"""
+        handle = self._ids.decode(booking_id)
+        if handle is None:
+            return None
+        return (handle - 1) % self.workers
+
+    def _shard_of_call(self, name, args):
+        if name in ("lookup", "cancel"):
+            return self.shard_of_booking(args[0])
+        return self.shard_of_show(args[0], args[1])
+
+    def execute(self, calls):
+        """Run a batch of (name, *args) calls, e.g. ("book", screen, showtime, 4)
+        or ("lookup", booking_id); returns the results in order. Each shard
+        gets one message with its calls; calls in FAN_OUT_CALLS go to every
+        shard. A call that fails in its worker has its exception as the
+        result."""
+        per_shard = {}
+        results = [None] * len(calls)
+        for index, (name, *args) in enumerate(calls):
+            if name not in WORKER_CALLS:
+                raise ValueError(f"unknown call {name}")
+            if name in FAN_OUT_CALLS:
+                shards = range(self.workers)
+                results[index] = []
+            else:
+                shards = (self._shard_of_call(name, args),)
+            for shard in shards:
+                if shard is not None:
+                    per_shard.setdefault(shard, ([], []))
+                    per_shard[shard][0].append(index)
+                    per_shard[shard][1].append((name, args))
+        with self._lock:
+            for shard, (_, batch) in per_shard.items():
+                self._conns[shard].send(batch)
+            for shard, (indexes, batch) in per_shard.items():
+                for index, (name, _), result in zip(indexes, batch, self._conns[shard].recv()):
+                    if name not in FAN_OUT_CALLS or isinstance(result, Exception):
+                        results[index] = result
+                    elif not isinstance(results[index], Exception):
+                        results[index] += result
+        for index, (name, *_) in enumerate(calls):
+            if name in FAN_OUT_CALLS and not isinstance(results[index], Exception):
+                results[index].sort()
+        return results
+
+    def _call(self, name, *args):
+        result = self.execute([(name, *args)])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def add_show(self, screen, showtime, movie_name, rows, seats_per_row):
+        self._call("add_show", screen, showtime, movie_name, rows, seats_per_row)
+
+    def load_shows(self, show_specs):
+        """Bulk-add shows, one batch for all shards; returns the number loaded"""
+        calls = [("add_show", *spec) for spec in show_specs]
+        for result in self.execute(calls):
+            if isinstance(result, Exception):
+                raise result
+        return len(calls)
+
+    def book(self, screen, showtime, num_tickets, start_pos=None):
+        """Returns (booking_id, seats), or None if the seats cannot be allocated"""
+        return self._call("book", screen, showtime, num_tickets, start_pos)
+
+    def get_available_seats(self, screen, showtime):
+        return self._call("avail", screen, showtime)
+
+    def find_booking(self, booking_id):
+        """Returns ((screen, showtime), seats), or None"""
+        if self.shard_of_booking(booking_id) is None:
+            return None
+        return self._call("lookup", booking_id)
+
+    def cancel(self, booking_id, seats=None):
+        """Returns the released seats, or None"""
+        if self.shard_of_booking(booking_id) is None:
+            return None
+        return self._call("cancel", booking_id, seats)
+
+    @property
+    def shows(self):
+        return self._call("shows")
+
+    def close(self):
+        with self._lock:
+            for conn in self._conns:
+                conn.send(None)
+                conn.close()
+            for process in self._processes:
+                process.join()
+            self._conns = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,172 @@
+import errno
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from booking_journal import open_journaled_theater, _segment_numbers
+from theater_booking import find_default_seats
+
+class TestBookingJournal(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def book(self, theater, num_tickets):
+        seats = find_default_seats(theater.seating_map, num_tickets)
+        return theater.confirm_booking(theater.generate_booking_id(), seats)
+
+    def test_recover_from_journal(self):
+        """Test that bookings and releases are replayed after a restart"""
+        theater, journal = open_journaled_theater(self.directory, "Movie", 5, 10)
+        first = self.book(theater, 3)
+        self.book(theater, 4)
+        theater.seating_map[0][4] = None
+        journal.commit()
+        journal.close()
+
+        recovered, journal = open_journaled_theater(self.directory)
+        self.assertEqual(recovered.movie_name, "Movie")
+        self.assertEqual(recovered.get_available_seats(), 44)
+        self.assertEqual(recovered.find_booking(first.booking_id).seats, [(0, 3), (0, 5)])
+        self.assertEqual(recovered.generate_booking_id(), "HKG0003")
+        journal.close()
+
+    def test_snapshot_bounds_replay(self):
+        """Test that a snapshot drops old segments and recovery uses it"""
+        theater, journal = open_journaled_theater(self.directory, "Movie", 5, 10)
+        for _ in range(5):
+            self.book(theater, 2)
+        journal.snapshot()
+        self.book(theater, 1)
+        journal.close()
+        self.assertEqual(_segment_numbers(self.directory), [2])
+
+        recovered, journal = open_journaled_theater(self.directory)
+        self.assertEqual(recovered.get_available_seats(), 39)
+        self.assertEqual(sorted(recovered.bookings), sorted(theater.bookings))
+        self.assertEqual(recovered.next_booking_id, 7)
+        journal.close()
+
+    def test_automatic_snapshot_and_torn_tail(self):
+        """Test periodic snapshots and recovery from a half-written record"""
+        theater, journal = open_journaled_theater(self.directory, "Movie", 5, 10, snapshot_every=4)
+        for _ in range(4):
+            self.book(theater, 2)
+            journal.commit()
+        journal.close()
+        self.assertTrue(os.path.exists(os.path.join(self.directory, "snapshot.json")))
+
+        segment = _segment_numbers(self.directory)[-1]
+        with open(os.path.join(self.directory, f"journal-{segment:06d}.log"), "ab") as f:
+            f.write(b'[4,0,"HKG0099"]\n[4,1,"HK')
+        recovered, journal = open_journaled_theater(self.directory)
+        self.assertEqual(recovered.get_available_seats(), 41)
+        self.assertEqual(recovered.seating_map[4][0], "HKG0099")
+        self.assertEqual(recovered.next_booking_id, 100)
+        journal.close()
+
+    def test_booking_recovered_whole_or_not_at_all(self):
+        """Test that a log cut inside a booking's record loses that booking
+        only, never some of its seats"""
+        theater, journal = open_journaled_theater(self.directory, "Movie", 5, 10)
+        first = self.book(theater, 2)
+        first_seats = first.seats[:]
+        second = self.book(theater, 4)
+        theater.cancel_booking(first.booking_id)
+        journal.commit()
+        journal.close()
+        path = os.path.join(self.directory, "journal-000001.log")
+        with open(path, "rb") as f:
+            lines = f.read().splitlines(keepends=True)
+        self.assertEqual(len(lines), 3)  # one record per booking and cancellation
+        self.assertEqual(json.loads(lines[1]), [second.booking_id, [list(seat) for seat in second.seats]])
+        for cut in range(1, len(lines[1]) - 1):  # all but the newline
+            with open(path, "wb") as f:
+                f.write(lines[0] + lines[1][:cut])
+            recovered, journal = open_journaled_theater(self.directory)
+            journal.close()
+            self.assertEqual({booking_id: booking.seats for booking_id, booking in recovered.bookings.items()},
+                             {first.booking_id: first_seats})
+
+    def test_write_errors_raise_and_retry(self):
+        """Test that a failing disk makes commit() raise instead of hang, and
+        that the queued records are written once the disk recovers"""
+        theater, journal = open_journaled_theater(self.directory, "Movie", 5, 10)
+        disk_full = [True]
+        real_fsync = os.fsync
+        def fsync(fd):
+            if disk_full[0]:
+                raise OSError(errno.ENOSPC, "No space left on device")
+            real_fsync(fd)
+        with patch("booking_journal.os.fsync", fsync):
+            first = self.book(theater, 3)
+            with self.assertRaises(OSError):
+                journal.commit()
+            with self.assertRaises(OSError):
+                journal.flush()
+            disk_full[0] = False
+            second = self.book(theater, 2)
+            journal.commit()
+            disk_full[0] = True
+            self.book(theater, 1)
+            with self.assertRaises(OSError):
+                journal.close()
+        recovered, journal = open_journaled_theater(self.directory)
+        # The last booking may or may not have reached the disk; the others did
+        self.assertLessEqual({first.booking_id, second.booking_id}, set(recovered.bookings))
+        self.assertEqual(recovered.find_booking(first.booking_id).seats, first.seats)
+        journal.close()
+
+    def test_close_during_snapshot(self):
+        """Test that closing while snapshots are due never breaks the flusher"""
+        errors = []
+        hook, threading.excepthook = threading.excepthook, errors.append
+        try:
+            for attempt in range(20):
+                directory = os.path.join(self.directory, str(attempt))
+                os.mkdir(directory)
+                theater, journal = open_journaled_theater(directory, "Movie", 5, 10, snapshot_every=3)
+                for _ in range(4):
+                    self.book(theater, 1)
+                journal.close()
+                journal.snapshot()  # a no-op once closed
+        finally:
+            threading.excepthook = hook
+        self.assertEqual(errors, [])
+
+    def test_writers_do_not_wait_for_fsync(self):
+        """Test that seat writes go through while a group commit is on disk"""
+        theater, journal = open_journaled_theater(self.directory, "Movie", 5, 10)
+        syncing, finish_sync = threading.Event(), threading.Event()
+        def slow_fsync(fd):
+            syncing.set()
+            finish_sync.wait(5)
+        with patch("booking_journal.os.fsync", slow_fsync):
+            self.book(theater, 2)
+            flusher = threading.Thread(target=journal.flush)
+            flusher.start()
+            self.assertTrue(syncing.wait(5))
+            writer = threading.Thread(target=self.book, args=(theater, 3))
+            writer.start()
+            writer.join(1)
+            self.assertFalse(writer.is_alive())
+            finish_sync.set()
+            flusher.join()
+        journal.commit()
+        journal.close()
+        recovered, journal = open_journaled_theater(self.directory)
+        self.assertEqual(recovered.get_available_seats(), 45)
+        journal.close()
+
+    def test_missing_journal(self):
+        """Test that recovering an empty directory without a setup fails"""
+        with self.assertRaises(FileNotFoundError):
+            open_journaled_theater(self.directory)
+
+if __name__ == '__main__':
+    unittest.main()
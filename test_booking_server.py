@@ -0,0 +1,93 @@
+import asyncio
+import unittest
+import metrics
+from booking_server import BookingServer, handle_command
+from venue import Venue
+
+class TestBookingServer(unittest.TestCase):
+    def setUp(self):
+        self.venue = Venue()
+        self.venue.add_show("1", "19:00", "Movie", 5, 10)
+
+    def test_hold_confirm_lookup(self):
+        """Test the hold, confirm and lookup commands"""
+        self.assertEqual(handle_command(self.venue, "AVAIL 1 19:00"), "OK 50")
+        self.assertEqual(handle_command(self.venue, "HOLD 1 19:00 3"), "OK HKG0001 A4,A5,A6")
+        self.assertEqual(handle_command(self.venue, "AVAIL 1 19:00"), "OK 47")
+        self.assertEqual(handle_command(self.venue, "CONFIRM HKG0001"), "OK HKG0001 A4,A5,A6")
+        self.assertEqual(handle_command(self.venue, "LOOKUP HKG0001"), "OK 1 19:00 A4,A5,A6")
+        self.assertEqual(handle_command(self.venue, "CONFIRM HKG0001"), "ERR no active hold HKG0001")
+
+    def test_book_and_cancel_hold(self):
+        """Test booking from a position and cancelling a hold"""
+        self.assertEqual(handle_command(self.venue, "BOOK 1 19:00 2 C9"), "OK HKG0001 C9,C10")
+        self.assertEqual(handle_command(self.venue, "hold 1 19:00 1"), "OK HKG0002 A5")
+        self.assertEqual(handle_command(self.venue, "CANCEL HKG0002"), "OK HKG0002")
+        self.assertEqual(handle_command(self.venue, "AVAIL 1 19:00"), "OK 48")
+
+    def test_cancel_booking(self):
+        """Test cancelling some seats of a booking and then the rest"""
+        handle_command(self.venue, "BOOK 1 19:00 3")
+        self.assertEqual(handle_command(self.venue, "CANCEL HKG0001 A6,A4"), "OK HKG0001 A4,A6")
+        self.assertEqual(handle_command(self.venue, "LOOKUP HKG0001"), "OK 1 19:00 A5")
+        self.assertEqual(handle_command(self.venue, "CANCEL HKG0001 A4"), "ERR seats not in booking HKG0001")
+        self.assertEqual(handle_command(self.venue, "CANCEL HKG0001 Q4"), "ERR invalid seats Q4")
+        self.assertEqual(handle_command(self.venue, "CANCEL HKG0001"), "OK HKG0001 A5")
+        self.assertEqual(handle_command(self.venue, "CANCEL HKG0001"), "ERR no hold or booking HKG0001")
+        self.assertEqual(handle_command(self.venue, "AVAIL 1 19:00"), "OK 50")
+
+    def test_errors(self):
+        """Test that bad requests answer ERR"""
+        self.assertEqual(handle_command(self.venue, ""), "ERR empty command")
+        self.assertEqual(handle_command(self.venue, "FLY"), "ERR unknown command FLY")
+        self.assertEqual(handle_command(self.venue, "AVAIL 2 19:00"), "ERR no show 2 19:00")
+        self.assertEqual(handle_command(self.venue, "BOOK 1 19:00 x"), "ERR tickets must be a number")
+        self.assertEqual(handle_command(self.venue, "BOOK 1 19:00 2 Z1"), "ERR invalid seat Z1")
+        self.assertEqual(handle_command(self.venue, "BOOK 1 19:00 51"), "ERR cannot allocate seats")
+        self.assertEqual(handle_command(self.venue, "LOOKUP HKG9999"), "ERR no booking HKG9999")
+
+    def test_tcp_round_trip(self):
+        """Test several concurrent clients over TCP"""
+        async def scenario():
+            server = await BookingServer(self.venue, port=0).start()
+
+            async def one_client():
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+                writer.write(b"BOOK 1 19:00 2\n")
+                response = await reader.readline()
+                writer.close()
+                return response.decode().split()
+
+            responses = await asyncio.gather(*(one_client() for _ in range(20)))
+            await server.close()
+            return responses
+
+        responses = asyncio.run(scenario())
+        self.assertTrue(all(response[0] == "OK" for response in responses))
+        self.assertEqual(len({response[1] for response in responses}), 20)
+        self.assertEqual(self.venue.get_show("1", "19:00").get_available_seats(), 10)
+
+    def test_metrics_endpoint(self):
+        """Test that --metrics-port serves the Prometheus export over HTTP"""
+        async def scenario():
+            server = await BookingServer(self.venue, port=0, metrics_port=0).start()
+            try:
+                handle_command(self.venue, "BOOK 1 19:00 2")
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.metrics_port)
+                writer.write(b"GET /metrics HTTP/1.0\r\nHost: localhost\r\n\r\n")
+                response = await reader.read()
+                writer.close()
+            finally:
+                await server.close()
+                enabled = metrics.enabled()
+                metrics.reset()
+            return response.decode(), enabled
+
+        response, enabled = asyncio.run(scenario())
+        self.assertFalse(enabled)  # close() restored the uninstrumented engine
+        self.assertTrue(response.startswith("HTTP/1.0 200 OK"))
+        self.assertIn('booking_operation_seconds_count{operation="allocate"} 1', response)
+        self.assertIn('booking_operation_seconds_count{operation="confirm"} 1', response)
+
+if __name__ == '__main__':
+    unittest.main()
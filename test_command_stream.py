@@ -0,0 +1,90 @@
+import io
+import unittest
+from command_stream import CommandSession, read_commands, run_commands, write_results
+
+def run(text, session=None):
+    out = io.StringIO()
+    counts = write_results(run_commands(read_commands(io.StringIO(text)), session), out, batch=2)
+    return out.getvalue().splitlines(), counts
+
+class TestCommandStream(unittest.TestCase):
+    def test_book_lookup_cancel(self):
+        """Test a presale script end to end"""
+        lines, counts = run(
+            "# presales\n"
+            "setup Dune 3 5\n"
+            "\n"
+            "book 4\n"
+            "book-at 2 C3\n"
+            "lookup HKG0001\n"
+            "cancel HKG0001 A2,A5\n"
+            "cancel HKG0002\n"
+            "lookup HKG0002\n")
+        self.assertEqual(lines, [
+            "OK Dune 15",
+            "OK HKG0001 A2,A3,A4,A5",
+            "OK HKG0002 C3,C4",
+            "OK HKG0001 A2,A3,A4,A5",
+            "OK HKG0001 A2,A5",
+            "OK HKG0002 C3,C4",
+            "ERR no booking HKG0002",
+        ])
+        self.assertEqual(counts, (7, 1))
+
+    def test_errors(self):
+        """Test that bad commands answer ERR and the stream carries on"""
+        lines, counts = run(
+            "book 2\n"
+            "setup Dune 703 5\n"
+            "setup Dune 2 5\n"
+            "book 11\n"
+            "book two\n"
+            "book-at 2 Z1\n"
+            "book 5\n"
+            "book-at 1 A3\n"
+            "cancel HKG0001 B1\n"
+            "refund HKG0001\n")
+        self.assertEqual(lines, [
+            "ERR no theater, run setup first",
+            "ERR rows must be between 1 and 702",
+            "OK Dune 10",
+            "ERR only 10 seats available",
+            "ERR tickets must be a number",
+            "ERR invalid seat Z1",
+            "OK HKG0001 A1,A2,A3,A4,A5",
+            "ERR seat A3 is taken",
+            "ERR seats not in booking HKG0001",
+            "ERR unknown command refund",
+        ])
+        self.assertEqual(counts, (10, 8))
+
+    def test_map_only_when_asked(self):
+        """Test that the map command renders the seats of a booking"""
+        session = CommandSession()
+        lines, _ = run("setup Dune 2 3\nbook 2\nmap HKG0001\n", session)
+        self.assertEqual(lines[2:], [
+            "S C R E E N",
+            "--------",
+            "B  • • •",
+            "A  • # #",
+            "   1 2 3",
+        ])
+        # The session keeps its theater between streams
+        lines, _ = run("lookup HKG0001\n", session)
+        self.assertEqual(lines, ["OK HKG0001 A2,A3"])
+
+    def test_streams_lazily(self):
+        """Test that commands are read only as results are consumed"""
+        consumed = []
+        def lines():
+            yield "setup Dune 26 50\n"
+            for _ in range(10**9):
+                consumed.append(1)
+                yield "book 1\n"
+        results = run_commands(read_commands(lines()))
+        for _ in range(5):
+            next(results)
+        self.assertEqual(len(consumed), 4)
+
+if __name__ == '__main__':
+    unittest.main()
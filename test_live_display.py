@@ -0,0 +1,135 @@
+import io
+import re
+import threading
+import unittest
+from live_display import LiveDisplay, SeatMapBroadcaster, render_delta_message
+from theater_booking import Theater
+
+ANSI = re.compile(r"\x1b\[(?:(\d+);(\d+)H|H|2J|K)")
+
+def apply_ansi(screen, text):
+    """Tiny terminal emulator: apply text with cursor moves to a list of lines"""
+    line, col = 0, 0
+    pos = 0
+    for match in ANSI.finditer(text):
+        for char in text[pos:match.start()]:
+            line, col = _put(screen, line, col, char)
+        pos = match.end()
+        code = match.group(0)
+        if code == "\x1b[2J":
+            screen.clear()
+        elif code == "\x1b[K":
+            while len(screen) <= line:
+                screen.append("")
+            screen[line] = screen[line][:col]
+        elif code == "\x1b[H":
+            line, col = 0, 0
+        else:
+            line, col = int(match.group(1)) - 1, int(match.group(2)) - 1
+    for char in text[pos:]:
+        line, col = _put(screen, line, col, char)
+    return screen
+
+def _put(screen, line, col, char):
+    while len(screen) <= line:
+        screen.append("")
+    if char == "\n":
+        return line + 1, 0
+    current = screen[line].ljust(col)
+    screen[line] = current[:col] + char + current[col + 1:]
+    return line, col + 1
+
+class TestLiveDisplay(unittest.TestCase):
+    def setUp(self):
+        self.theater = Theater("Test Movie", 5, 12)
+
+    def book(self, num_tickets):
+        hold = self.theater.hold_seats(num_tickets)
+        self.theater.confirm_hold(hold)
+
+    def test_change_feed_versions(self):
+        """Test that the feed reports changed seats since a version"""
+        # Nothing is logged until something watches the show
+        self.theater.seating_map[0][0] = "TAKEN"
+        self.assertIsNone(self.theater.seating_map.feed._log)
+        self.theater.track_changes()
+        start = self.theater.version
+        self.theater.seating_map[1][2] = "TAKEN"
+        self.theater.seating_map[1][3] = "TAKEN"
+        self.theater.seating_map[1][3] = "OTHER"  # same display state: no change
+        self.assertEqual(self.theater.version, start + 2)
+        self.assertEqual(self.theater.changes_since(start), {1: 0b1100})
+        self.assertEqual(self.theater.changes_since(start + 2), {})
+        self.assertIsNone(self.theater.changes_since(start + 5))
+
+    def test_feed_forgets_old_versions(self):
+        """Test that subscribers too far behind get None (full redraw)"""
+        self.theater.track_changes()
+        for _ in range(3000):
+            self.theater.seating_map[0][0] = "TAKEN"
+            self.theater.seating_map[0][0] = None
+        self.assertIsNone(self.theater.changes_since(0))
+        self.assertEqual(self.theater.changes_since(self.theater.version - 10), {0: 1})
+
+    def test_feed_read_while_seats_change(self):
+        """Test that subscribers can read the feed while another thread sells"""
+        errors = []
+        def sell():
+            seats = self.theater.seating_map[2]
+            for i in range(30000):
+                seats[i % 12] = "TAKEN" if i % 24 < 12 else None
+        seller = threading.Thread(target=sell)
+        seller.start()
+        broadcaster = SeatMapBroadcaster(self.theater, mode="message")
+        while seller.is_alive():
+            try:
+                changes = self.theater.changes_since(self.theater.version - 2000)
+                self.assertTrue(changes is None or set(changes) <= {2})
+                broadcaster.update(self.theater.version - 50)
+            except RuntimeError as error:
+                errors.append(error)
+                break
+        seller.join()
+        self.assertEqual(errors, [])
+
+    def test_ansi_deltas_reproduce_full_frames(self):
+        """Test that applying ANSI deltas gives the same screen as a redraw"""
+        self.check_ansi_deltas((3, 1, 14, 2))
+
+    def test_ansi_deltas_on_large_halls(self):
+        """Test the deltas with two-letter row labels and three-digit seat numbers"""
+        self.theater = Theater("Arena", 30, 105)
+        for row in range(28):
+            for col in range(105):
+                self.theater.seating_map[row][col] = "FULL"
+        self.check_ansi_deltas((3, 120, 2))
+
+    def check_ansi_deltas(self, party_sizes):
+        broadcaster = SeatMapBroadcaster(self.theater, origin_line=3)
+        out = io.StringIO()
+        display = LiveDisplay(broadcaster, out)
+        display.refresh()
+        screen = apply_ansi([], out.getvalue())
+        for num_tickets in party_sizes:
+            self.book(num_tickets)
+            out.seek(0)
+            out.truncate()
+            written = display.refresh()
+            self.assertLess(written, len(broadcaster.full_frame()))
+            apply_ansi(screen, out.getvalue())
+            self.assertEqual(screen, apply_ansi([], broadcaster.full_frame()))
+        self.assertEqual(display.refresh(), 0)
+
+    def test_payload_shared_between_subscribers(self):
+        """Test that subscribers on the same version share one payload"""
+        broadcaster = SeatMapBroadcaster(self.theater, mode="message")
+        version, _ = broadcaster.update()
+        self.book(2)
+        new_version, first = broadcaster.update(version)
+        _, second = broadcaster.update(version)
+        self.assertIs(first, second)
+        self.assertEqual(first, f"{new_version} A6=o A7=o")
+        self.assertEqual(render_delta_message(self.theater.seating_map, new_version, {}), str(new_version))
+
+if __name__ == '__main__':
+    unittest.main()
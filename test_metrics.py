@@ -0,0 +1,116 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+import metrics
+import theater_booking
+from theater_booking import Theater, display_seating_map
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.theater = Theater("Test Movie", 5, 10)
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+
+    def test_disabled_runs_original_functions(self):
+        """Test that enable wraps the hot paths and disable restores them"""
+        original = theater_booking.find_default_seats
+        original_lookup = Theater.find_booking
+        metrics.enable()
+        self.assertTrue(metrics.enabled())
+        self.assertIsNot(theater_booking.find_default_seats, original)
+        metrics.disable()
+        self.assertFalse(metrics.enabled())
+        self.assertIs(theater_booking.find_default_seats, original)
+        self.assertIs(Theater.find_booking, original_lookup)
+        self.theater.find_booking("HKG0001")
+        self.assertEqual(metrics.histograms["lookup"].count, 0)
+
+    def test_histograms_and_counters(self):
+        """Test that each operation is counted, with misses as empty results"""
+        metrics.enable()
+        hold = self.theater.hold_seats(3)
+        self.theater.confirm_hold(hold)
+        self.theater.find_booking(hold.booking_id)
+        self.theater.find_booking("HKG9999")
+        self.assertIsNone(self.theater.hold_seats(60))
+        with redirect_stdout(io.StringIO()):
+            display_seating_map(self.theater.seating_map)
+
+        self.assertEqual(metrics.histograms["allocate"].count, 2)
+        self.assertEqual(metrics.histograms["allocate"].empty, 1)
+        self.assertEqual(metrics.histograms["confirm"].count, 1)
+        self.assertEqual(metrics.histograms["lookup"].count, 2)
+        self.assertEqual(metrics.histograms["lookup"].empty, 1)
+        self.assertEqual(metrics.histograms["render"].count, 1)
+        lookup = metrics.histograms["lookup"]
+        self.assertEqual(sum(lookup.buckets), 2)
+        self.assertGreater(lookup.total_ns, 0)
+        self.assertIsNotNone(lookup.percentile(0.5))
+
+    def test_histogram_folding(self):
+        """Test that batched observations land in the right buckets"""
+        histogram = metrics.Histogram()
+        for elapsed_ns in (500, 1000, 1001, 3000, 10**9):
+            histogram.observe(elapsed_ns)
+        for _ in range(metrics.FOLD_BATCH):
+            histogram.observe(1500, empty=True)
+        self.assertEqual(histogram.buckets[:3], [2, 1 + metrics.FOLD_BATCH, 1])
+        self.assertEqual(histogram.buckets[-1], 1)
+        self.assertEqual(histogram.count, 5 + metrics.FOLD_BATCH)
+        self.assertEqual(histogram.empty, metrics.FOLD_BATCH)
+        self.assertEqual(histogram.percentile(0.5), 2e-6)
+        self.assertIsNone(histogram.percentile(1.0))
+
+    def test_errors_are_counted(self):
+        """Test that a call that raises is still timed and counted"""
+        metrics.enable()
+        with self.assertRaises(TypeError):
+            self.theater.cancel_booking()
+        self.assertEqual(metrics.histograms["cancel"].errors, 1)
+
+    def test_prometheus_export(self):
+        """Test the text exposition format"""
+        metrics.enable()
+        self.theater.find_booking("HKG9999")
+        text = metrics.export_text()
+        self.assertIn("# TYPE booking_operation_seconds histogram\n", text)
+        self.assertIn('booking_operation_seconds_bucket{operation="lookup",le="+Inf"} 1\n', text)
+        self.assertIn('booking_operation_seconds_count{operation="lookup"} 1\n', text)
+        self.assertIn('booking_operation_empty_total{operation="lookup"} 1\n', text)
+        # Buckets are cumulative
+        counts = [int(line.rsplit(" ", 1)[1]) for line in text.splitlines()
+                  if line.startswith('booking_operation_seconds_bucket{operation="lookup"')]
+        self.assertEqual(counts, sorted(counts))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "booking.prom")
+            metrics.write_text(path)
+            with open(path) as f:
+                self.assertEqual(f.read(), text)
+
+    def test_tracing_spans(self):
+        """Test that tracing records one span per call"""
+        metrics.enable(tracing=True)
+        self.theater.book_batch([2])
+        names = [span.name for span in metrics.spans()]
+        self.assertEqual(names, ["Theater.confirm_hold"])
+        self.theater.hold_seats(1)
+        span = metrics.spans()[-1]
+        self.assertEqual((span.operation, span.depth), ("allocate", 0))
+        self.assertGreater(span.duration_ns, 0)
+
+    def test_profile_window(self):
+        """Test that a profiling window reports functions and allocations"""
+        with metrics.ProfileWindow() as window:
+            for _ in range(20):
+                theater_booking.find_default_seats(self.theater.seating_map, 4)
+        report = window.report()
+        self.assertIn("find_default_seats", report)
+        self.assertIn("Top allocations:", report)
+
+if __name__ == '__main__':
+    unittest.main()
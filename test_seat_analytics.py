@@ -0,0 +1,75 @@
+import random
+import unittest
+from seat_analytics import SeatAnalytics, np
+from theater_booking import Theater, free_runs
+
+def random_theater(rng, rows, seats_per_row):
+    theater = Theater("Test Movie", rows, seats_per_row)
+    while theater.get_available_seats() > rows * seats_per_row // 2:
+        theater.book_batch([rng.randint(1, 4)])
+    # Cancel a few seats to leave holes
+    for booking_id in rng.sample(list(theater.bookings), 3):
+        booking = theater.bookings[booking_id]
+        theater.cancel_booking(booking_id, booking.seats[:1])
+    return theater
+
+@unittest.skipUnless(np, "NumPy is not installed")
+class TestSeatAnalytics(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        # Halls of different sizes, so padding is exercised
+        self.theaters = [random_theater(rng, 5, 10), random_theater(rng, 8, 13), Theater("Empty", 3, 4)]
+        self.analytics = SeatAnalytics(self.theaters)
+
+    def runs(self, theater):
+        return [[end - start for start, end in free_runs(mask, theater.seats_per_row)]
+                for mask in theater.seating_map.blocked_masks]
+
+    def test_available_and_fill_rates(self):
+        """Test the per-show totals against get_available_seats"""
+        self.assertEqual(self.analytics.available().tolist(),
+                         [theater.get_available_seats() for theater in self.theaters])
+        for rate, theater in zip(self.analytics.fill_rates(), self.theaters):
+            seats = theater.rows * theater.seats_per_row
+            self.assertAlmostEqual(rate, 1 - theater.get_available_seats() / seats)
+
+    def test_heatmaps(self):
+        """Test row and column occupancy, with NaN where a hall has no seats"""
+        rows = self.analytics.row_occupancy()
+        columns = self.analytics.column_occupancy()
+        theater = self.theaters[1]
+        for row in range(theater.rows):
+            taken = sum(seat is not None for seat in theater.seating_map[row])
+            self.assertAlmostEqual(rows[1, row], taken / theater.seats_per_row)
+        for col in range(theater.seats_per_row):
+            taken = sum(theater.seating_map[row][col] is not None for row in range(theater.rows))
+            self.assertAlmostEqual(columns[1, col], taken / theater.rows)
+        self.assertTrue(np.isnan(rows[0, 6]))
+        self.assertTrue(np.isnan(columns[2, 4]))
+        self.assertEqual(self.analytics.heatmap().shape, (8, 13))
+
+    def test_free_runs(self):
+        """Test the longest run and party counts against free_runs"""
+        longest = self.analytics.longest_free_run()
+        fits = self.analytics.parties_that_fit([1, 2, 3, 5])
+        for index, theater in enumerate(self.theaters):
+            runs = self.runs(theater)
+            self.assertEqual(longest[index, :theater.rows].tolist(), [max(r, default=0) for r in runs])
+            self.assertEqual(longest[index, theater.rows:].tolist(), [0] * (8 - theater.rows))
+            for column, size in enumerate([1, 2, 3, 5]):
+                expected = sum(length // size for r in runs for length in r)
+                self.assertEqual(fits[index, column], expected)
+        self.assertEqual(self.analytics.parties_that_fit(4)[2], 3)
+
+    def test_summary_refresh(self):
+        """Test that a new snapshot sees bookings made since the last one"""
+        theater = self.theaters[2]
+        self.assertEqual(self.analytics.summary()[2]["available"], 12)
+        theater.book_batch([4])
+        summary = SeatAnalytics(self.theaters).summary(party_sizes=(4,))[2]
+        self.assertEqual(summary, {"show": "Empty", "available": 8, "fill_rate": 1 / 3,
+                                   "largest_block": 4, "parties_that_fit": {4: 2}})
+        self.assertEqual(len(SeatAnalytics([])), 0)
+
+if __name__ == '__main__':
+    unittest.main()
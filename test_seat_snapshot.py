@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from seat_snapshot import open_snapshot, write_snapshot
+from theater_booking import display_seating_map, find_default_seats
+from venue import Venue
+
+class TestSeatSnapshot(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "day.snap")
+        self.venue = Venue()
+        self.venue.load_shows([
+            ("1", "10:00", "Movie A", 5, 10),
+            ("2", "10:00", "Movie B", 3, 13),
+        ])
+        self.first_id, _ = self.venue.book("1", "10:00", 3)
+        self.second_id, _ = self.venue.book("2", "10:00", 15)
+        self.venue.hold("1", "10:00", 2)  # holds are not persisted
+        write_snapshot(self.path, self.venue.shows.values())
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_read_in_place(self):
+        """Test that mapped shows answer the Theater read API"""
+        with open_snapshot(self.path) as snapshot:
+            self.assertEqual(len(snapshot), 2)
+            show = snapshot.get_show("2", "10:00")
+            self.assertEqual(show.movie_name, "Movie B")
+            self.assertEqual(show.get_available_seats(), 24)
+            self.assertEqual(show.seating_map[1][6], self.second_id)
+            self.assertIsNone(show.seating_map[1][5])
+            self.assertEqual(show.seating_map.blocked_masks[1], 0b11 << 6)
+            self.assertEqual(snapshot[0].get_available_seats(), 47)
+            self.assertEqual(find_default_seats(snapshot[0].seating_map, 2), [(0, 6), (0, 7)])
+            self.assertIsNone(snapshot.get_show("3", "10:00"))
+
+    def test_display_matches_theater(self):
+        """Test that a mapped show renders like the Theater it came from"""
+        theater = self.venue.get_show("2", "10:00")
+        with patch('builtins.print') as original:
+            display_seating_map(theater.seating_map)
+        with open_snapshot(self.path) as snapshot, patch('builtins.print') as mapped:
+            display_seating_map(snapshot.get_show("2", "10:00").seating_map)
+        self.assertEqual(mapped.call_args_list, original.call_args_list)
+
+    def test_round_trip_to_theater(self):
+        """Test converting a mapped show back into a Theater"""
+        with open_snapshot(self.path) as snapshot:
+            theater = snapshot[0].to_theater()
+        self.assertEqual(theater.show_key, ("1", "10:00"))
+        self.assertEqual(theater.find_booking(self.first_id).seats, [(0, 3), (0, 4), (0, 5)])
+        self.assertEqual(theater.next_booking_id, 4)
+
+    def test_rejects_other_files(self):
+        """Test that a file without the snapshot header is refused"""
+        with open(self.path, "wb") as f:
+            f.write(b"not a snapshot at all")
+        with self.assertRaises(ValueError):
+            open_snapshot(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import random
+import unittest
+from seat_strategies import SEARCH_BUDGET, BestBlockStrategy, best_row_block, column_spread
+from theater_booking import DEFAULT_STRATEGY, Theater, find_batch_seats, find_default_seats
+
+def seats_are_free(theater, seats):
+    return all(theater.seating_map[row][col] is None for row, col in seats)
+
+class TestBestBlockStrategy(unittest.TestCase):
+    def setUp(self):
+        self.strategy = BestBlockStrategy()
+        self.theater = Theater("Test Movie", 5, 10, strategy=self.strategy)
+
+    def allocate(self, num_tickets, start_pos=None):
+        return self.strategy.allocate(self.theater.seating_map.blocked_masks, 10, num_tickets, start_pos)
+
+    def test_column_spread(self):
+        """Test the O(1) spread against a plain sum"""
+        for first in range(12):
+            for last in range(first, 12):
+                for centre in (0, 3.5, 4, 5.5, 11):
+                    expected = sum(abs(col - centre) for col in range(first, last + 1))
+                    self.assertAlmostEqual(column_spread(first, last, centre), expected)
+
+    def test_centred_block_in_preferred_row(self):
+        """Test that an empty hall seats a party in the middle of the middle row"""
+        self.assertEqual(self.allocate(3), [(2, 3), (2, 4), (2, 5)])
+        self.assertEqual(self.allocate(4), [(2, 3), (2, 4), (2, 5), (2, 6)])
+        self.assertEqual(BestBlockStrategy(preferred_row=0).allocate([0] * 5, 10, 2), [(0, 4), (0, 5)])
+
+    def test_avoids_orphan_seats(self):
+        """Test that a block is not placed to strand a single free seat"""
+        # Free run is columns 2..6; the centred pair 4-5 would strand column 6
+        mask = 0b1110000011
+        cost, start = best_row_block(mask, 10, 2)
+        self.assertEqual(start, 5)
+        cost, start = best_row_block(mask, 10, 5)
+        self.assertEqual(start, 2)
+        self.assertIsNone(best_row_block(mask, 10, 6))
+
+    def test_splits_over_adjacent_rows(self):
+        """Test that a party too big for any row gets two adjacent rows"""
+        seats = self.allocate(14)
+        self.assertEqual(len(seats), 14)
+        rows = sorted({row for row, _ in seats})
+        self.assertIn(rows, ([1, 2], [2, 3]))
+
+    def test_start_position_and_large_parties_use_default(self):
+        """Test the fallbacks to the default policy"""
+        masks = self.theater.seating_map.blocked_masks
+        self.assertEqual(self.allocate(3, (0, 0)), find_default_seats(self.theater.seating_map, 3, (0, 0)))
+        self.assertEqual(self.allocate(25), DEFAULT_STRATEGY.allocate(masks, 10, 25))
+        self.assertEqual(self.allocate(0), [])
+
+    def test_theater_uses_strategy(self):
+        """Test that holds and batches go through the Theater's strategy"""
+        hold = self.theater.hold_seats(2)
+        self.assertEqual(hold.seats, [(2, 4), (2, 5)])
+        bookings = self.theater.book_batch([2, 2])
+        self.assertEqual([len(booking) for booking in bookings], [2, 2])
+        self.assertEqual(self.theater.get_available_seats(), 44)
+
+    def test_random_halls(self):
+        """Property test: valid free seats whenever the hall has room, even with no budget"""
+        rng = random.Random(15)
+        for budget in (SEARCH_BUDGET, 0):
+            strategy = BestBlockStrategy(budget=budget)
+            for _ in range(200):
+                rows, seats_per_row = rng.randint(1, 8), rng.randint(1, 20)
+                theater = Theater("Random", rows, seats_per_row)
+                for row in range(rows):
+                    for col in range(seats_per_row):
+                        if rng.random() < 0.5:
+                            theater.seating_map[row][col] = "TAKEN"
+                num_tickets = rng.randint(1, rows * seats_per_row)
+                seats = strategy.allocate(theater.seating_map.blocked_masks, seats_per_row, num_tickets)
+                if num_tickets <= theater.get_available_seats():
+                    self.assertEqual(len(set(seats)), num_tickets)
+                    self.assertTrue(seats_are_free(theater, seats))
+                    self.assertEqual(seats, sorted(seats))
+                else:
+                    self.assertEqual(seats, [])
+
+    def test_budget_is_deterministic(self):
+        """Test that a budget cut-off still gives batches the seats of
+        sequential bookings"""
+        rng = random.Random(16)
+        for budget in (1, 5, SEARCH_BUDGET):
+            strategy = BestBlockStrategy(budget=budget)
+            for _ in range(30):
+                rows, seats_per_row = rng.randint(2, 10), rng.randint(4, 16)
+                taken = [(row, col) for row in range(rows) for col in range(seats_per_row)
+                         if rng.random() < 0.4]
+                parties = [rng.randint(1, 2 * seats_per_row) for _ in range(6)]
+                batch, sequential = (Theater("Random", rows, seats_per_row, strategy=strategy)
+                                     for _ in range(2))
+                for theater in (batch, sequential):
+                    for row, col in taken:
+                        theater.seating_map[row][col] = "TAKEN"
+                expected = []
+                for num_tickets in parties:
+                    hold = sequential.hold_seats(num_tickets, ttl=None)
+                    expected.append(sequential.confirm_hold(hold).seats if hold else [])
+                self.assertEqual(find_batch_seats(batch.seating_map, parties, strategy), expected)
+
+if __name__ == '__main__':
+    unittest.main()
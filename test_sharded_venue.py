@@ -0,0 +1,61 @@
+import unittest
+from sharded_venue import ShardedVenue, shard_of_show
+
+class TestShardedVenue(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.venue = ShardedVenue(workers=3)
+        cls.shows = [(str(screen), showtime, "Movie", 5, 10)
+                     for screen in range(1, 5) for showtime in ("10:00", "19:00")]
+        cls.venue.load_shows(cls.shows)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.venue.close()
+
+    def test_shows_are_partitioned(self):
+        """Test that every show lives on exactly one shard"""
+        self.assertEqual(self.venue.shows, sorted((screen, time) for screen, time, *_ in self.shows))
+        shards = {shard_of_show(screen, time, 3) for screen, time, *_ in self.shows}
+        self.assertGreater(len(shards), 1)
+        with self.assertRaises(ValueError):
+            self.venue.add_show("1", "10:00", "Movie", 5, 10)
+        # A batch can ask for the shows too; every shard answers
+        results = self.venue.execute([("shows",), ("avail", "1", "10:00"), ("shows",)])
+        self.assertEqual(results, [self.venue.shows, 50, self.venue.shows])
+
+    def test_book_lookup_cancel(self):
+        """Test that calls are routed to the show's shard and by booking id"""
+        booking_id, seats = self.venue.book("2", "19:00", 3)
+        self.assertEqual(self.venue.shard_of_booking(booking_id), self.venue.shard_of_show("2", "19:00"))
+        self.assertEqual(self.venue.find_booking(booking_id), (("2", "19:00"), seats))
+        self.assertEqual(self.venue.get_available_seats("2", "19:00"), 47)
+        self.assertEqual(self.venue.cancel(booking_id), seats)
+        self.assertIsNone(self.venue.find_booking(booking_id))
+        self.assertIsNone(self.venue.find_booking("XYZ1"))
+        self.assertEqual(self.venue.get_available_seats("2", "19:00"), 50)
+
+    def test_batches_keep_order_and_ids_unique(self):
+        """Test a mixed batch over every shard"""
+        calls = [("book", screen, time, 2) for screen, time, *_ in self.shows] * 2
+        results = self.venue.execute(calls)
+        booking_ids = [booking_id for booking_id, _ in results]
+        self.assertEqual(len(set(booking_ids)), len(calls))
+        lookups = self.venue.execute([("lookup", booking_id) for booking_id in booking_ids])
+        self.assertEqual([show for show, _ in lookups], [call[1:3] for call in calls])
+        for booking_id in booking_ids:
+            self.venue.cancel(booking_id)
+
+    def test_errors_come_back_from_workers(self):
+        """Test that a failing call raises in the router, and batches return the error"""
+        with self.assertRaises(KeyError):
+            self.venue.get_available_seats("9", "10:00")
+        results = self.venue.execute([("avail", "9", "10:00"), ("avail", "1", "10:00")])
+        self.assertIsInstance(results[0], KeyError)
+        self.assertEqual(results[1], 50)
+        self.assertIsNone(self.venue.book("1", "10:00", 51))
+        with self.assertRaises(ValueError):
+            self.venue.execute([("drop_tables",)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,32 @@
+import io
+import random
+import threading
 import unittest
 from theater_booking import (
-    Theater, find_default_seats, parse_seat_position, 
-    get_theater_setup, book_tickets, check_booking
+    Theater, BookingIdGenerator, find_default_seats, parse_seat_position, 
+    get_theater_setup, book_tickets, check_booking,
+    find_consecutive_seats, free_runs, find_batch_seats, find_seats_from_middle,
+    allocation_cache_info, clear_allocation_caches, parse_row_label, row_label, longest_free_run,
+    display_seating_map, render_seating_map, write_seating_map
 )
 
+def reference_find_consecutive_seats(seating_map, current_row, num_tickets):
+    """The original nested-loop search, kept as an oracle for property tests"""
+    seats_per_row = len(seating_map[0])
+    middle = (seats_per_row - 1) // 2
+    best_seats = []
+    for start in range(max(0, middle - num_tickets), seats_per_row - num_tickets + 1):
+        consecutive_seats = []
+        for col in range(start, start + num_tickets):
+            if col >= seats_per_row or seating_map[current_row][col] is not None:
+                consecutive_seats = []
+                break
+            consecutive_seats.append((current_row, col))
+        if len(consecutive_seats) == num_tickets:
+            if not best_seats or abs(middle - start) < abs(middle - best_seats[0][1]):
+                best_seats = consecutive_seats
+    return best_seats
+
 class TestTheaterBooking(unittest.TestCase):
     def setUp(self):
         # This runs before each test
@@ -34,6 +57,18 @@ class TestTheaterBooking(unittest.TestCase):
         second_row = [(1, 4), (1, 5)]
         self.assertEqual(seats, first_row + second_row)
 
+    def test_row_labels(self):
+        """Test A-Z, AA-ZZ, AAA... row labels and parsing them back"""
+        self.assertEqual([row_label(row) for row in (0, 25, 26, 51, 701, 702)],
+                         ["A", "Z", "AA", "AZ", "ZZ", "AAA"])
+        for row in range(2000):
+            self.assertEqual(parse_row_label(row_label(row)), row)
+        self.assertEqual(parse_seat_position("AB12", 30, 20), (27, 11))
+        self.assertEqual(parse_seat_position("ab12", 30, 20), (27, 11))
+        self.assertIsNone(parse_seat_position("AE1", 30, 20))
+        self.assertIsNone(parse_seat_position("A1B", 30, 20))
+        self.assertIsNone(parse_seat_position("12", 30, 20))
+
     def test_parse_seat_position(self):
         """Test seat position parsing"""
         self.assertEqual(parse_seat_position("A1", 5, 10), (0, 0))
@@ -86,12 +121,12 @@ class TestTheaterBooking(unittest.TestCase):
             self.assertEqual(rows, 5)
             self.assertEqual(seats, 10)
         
-        with patch('builtins.input', side_effect=["Movie 27 10", "Movie 5 10"]), \
+        with patch('builtins.input', side_effect=["Movie 703 10", "Movie 5 10"]), \
              patch('builtins.print'):  # Suppress print statements
             title, rows, seats = get_theater_setup()
             self.assertEqual(rows, 5)
         
-        with patch('builtins.input', side_effect=["Movie 5 51", "Movie 5 10"]), \
+        with patch('builtins.input', side_effect=["Movie 5 1000", "Movie 5 10"]), \
              patch('builtins.print'):  # Suppress print statements
             title, rows, seats = get_theater_setup()
             self.assertEqual(seats, 10)
@@ -150,6 +185,16 @@ class TestTheaterBooking(unittest.TestCase):
         expected = [(1, 6), (1, 7), (1, 8), (1, 9)]  # B7,B8,B9,B10
         self.assertEqual(sorted(seats), sorted(expected))
 
+    def test_start_position_outside_hall(self):
+        """Test that a start position off the hall is refused, not booked"""
+        for start_pos in ((0, 10), (0, 15), (5, 0), (-1, 3), (2, -1)):
+            with self.assertRaises(ValueError):
+                self.theater.hold_seats(3, start_pos)
+            with self.assertRaises(ValueError):
+                find_default_seats(self.theater.seating_map, 3, start_pos)
+        self.assertEqual(self.theater.get_available_seats(), 50)
+        self.assertEqual(self.theater.seating_map.blocked_masks, [0] * 5)
+
     def test_find_default_seats_consecutive_priority(self):
         """Test that consecutive seats are prioritized"""
         # Fill seats A8 and A9
@@ -233,5 +278,507 @@ class TestTheaterBooking(unittest.TestCase):
             check_booking(self.theater)
             mock_print.assert_any_call("No booking found with id: INVALID")
 
+    def test_booking_index_confirm(self):
+        """Test that confirmed bookings are indexed with sorted seats"""
+        booking_id = self.theater.generate_booking_id()
+        booking = self.theater.confirm_booking(booking_id, [(1, 5), (0, 4), (0, 3)])
+        self.assertIs(self.theater.find_booking(booking_id), booking)
+        self.assertEqual(booking.seats, [(0, 3), (0, 4), (1, 5)])
+        self.assertIsNone(self.theater.find_booking("HKG9999"))
+
+    def test_booking_index_tracks_direct_writes(self):
+        """Test that writes straight into seating_map keep the index in sync"""
+        self.theater.seating_map[2][2] = "TAKEN"
+        self.theater.seating_map[2][3] = "TAKEN"
+        self.assertEqual(self.theater.find_booking("TAKEN").seats, [(2, 2), (2, 3)])
+
+        # Releasing and overwriting seats moves them out of the old booking
+        self.theater.seating_map[2][2] = None
+        self.theater.seating_map[2][3] = "OTHER"
+        self.assertIsNone(self.theater.find_booking("TAKEN"))
+        self.assertEqual(self.theater.find_booking("OTHER").seats, [(2, 3)])
+
+    def test_free_seat_counters(self):
+        """Test that row and total free-seat counters follow seat changes"""
+        seating_map = self.theater.seating_map
+        self.assertTrue(seating_map.is_row_empty(0))
+        for col in range(10):
+            seating_map[0][col] = "FULL"
+        seating_map[1][4] = "ONE"
+        self.assertTrue(seating_map.is_row_full(0))
+        self.assertFalse(seating_map.is_row_empty(1))
+        self.assertEqual(self.theater.get_row_available_seats(1), 9)
+        self.assertEqual(self.theater.get_available_seats(), 39)
+
+        # Overwriting a taken seat does not change the counts; releasing does
+        seating_map[1][4] = "OTHER"
+        self.assertEqual(self.theater.get_available_seats(), 39)
+        seating_map[0][0] = None
+        self.assertFalse(seating_map.is_row_full(0))
+        self.assertEqual(self.theater.get_available_seats(), 40)
+        self.assertEqual(self.theater.get_available_seats(),
+                         sum(row.count(None) for row in seating_map))
+
+    def test_feasibility_index(self):
+        """Test the per-row index against a scan through random churn"""
+        theater = Theater("Churn", 7, 9)
+        rng = random.Random(3)
+        for _ in range(300):
+            if theater.bookings and rng.random() < 0.4:
+                theater.cancel_booking(rng.choice(list(theater.bookings)))
+            elif rng.random() < 0.2:
+                theater.hold_seats(rng.randint(1, 5), ttl=None)
+            else:
+                theater.book_batch([rng.randint(1, 6)])
+            index = theater.seating_map.index
+            masks = theater.seating_map.blocked_masks
+            for row in range(7):
+                runs = [end - start for mask in masks[row:] for start, end in free_runs(mask, 9)]
+                self.assertEqual(index.free_from(row), sum(runs))
+                self.assertEqual(index.longest_from(row), max(runs, default=0))
+                open_rows = [r for r in range(row, 7) if masks[r] != 511]
+                self.assertEqual(index.next_open_row(row), open_rows[0] if open_rows else None)
+                self.assertEqual(index.can_seat_together(3, row),
+                                 any(longest_free_run(masks[r], 9) >= 3 for r in range(row, 7)))
+        self.assertEqual(index.free_from(0), theater.get_available_seats())
+
+    def test_hopeless_requests_rejected(self):
+        """Test that requests the hall cannot seat fail before any search"""
+        for row in range(4):
+            for col in range(10):
+                self.theater.seating_map[row][col] = "FULL"
+        self.theater.seating_map[0][0] = None
+        next_id = self.theater.next_booking_id
+        self.assertFalse(self.theater.can_seat(12))
+        self.assertTrue(self.theater.can_seat(10, start_row=4, together=True))
+        self.assertFalse(self.theater.can_seat(11, together=True))
+        self.assertIsNone(self.theater.hold_seats(12))
+        self.assertIsNone(self.theater.hold_seats(11, start_pos=(1, 0)))
+        self.assertEqual(self.theater.next_booking_id, next_id)  # no id used up
+        self.assertEqual(len(self.theater.hold_seats(11, start_pos=(0, 0)).seats), 11)
+
+    def test_cancel_booking(self):
+        """Test that cancelling frees the seats, counters and index at once"""
+        first = self.theater.book_batch([4])[0]
+        second = self.theater.book_batch([2])[0]
+        released = self.theater.cancel_booking(first.booking_id)
+        self.assertEqual(released, [(0, 3), (0, 4), (0, 5), (0, 6)])
+        self.assertIsNone(self.theater.find_booking(first.booking_id))
+        self.assertEqual(self.theater.get_available_seats(), 48)
+        self.assertEqual(self.theater.get_row_available_seats(0), 8)
+        self.assertEqual(self.theater.seating_map[0][3:7], [None] * 4)
+        # The allocator sees the freed middle straight away
+        self.assertEqual(find_default_seats(self.theater.seating_map, 3), [(0, 4), (0, 5), (0, 6)])
+        self.assertIsNone(self.theater.cancel_booking(first.booking_id))
+        self.assertEqual(self.theater.find_booking(second.booking_id).seats, [(0, 7), (0, 8)])
+
+    def test_partial_cancel(self):
+        """Test cancelling some seats of a booking keeps the rest"""
+        booking = self.theater.book_batch([5])[0]
+        self.assertEqual(self.theater.cancel_booking(booking.booking_id, [(0, 6), (0, 3)]),
+                         [(0, 3), (0, 6)])
+        self.assertEqual(booking.seats, [(0, 2), (0, 4), (0, 5)])
+        self.assertEqual(self.theater.get_available_seats(), 47)
+        # Seats the booking does not own are refused as a whole
+        self.assertIsNone(self.theater.cancel_booking(booking.booking_id, [(0, 4), (1, 1)]))
+        self.assertIsNone(self.theater.cancel_booking(booking.booking_id, []))
+        self.assertEqual(len(booking), 3)
+
+    def test_compact_seating_map(self):
+        """Test that the compact seat store behaves like a list of rows"""
+        seating_map = self.theater.seating_map
+        seating_map[1][2] = "HKG0001"
+        seating_map[1][-1] = "HKG0002"
+        self.assertEqual(len(seating_map), 5)
+        self.assertEqual(len(seating_map[1]), 10)
+        self.assertEqual(seating_map[1][2], "HKG0001")
+        self.assertEqual(seating_map[1][9], "HKG0002")
+        self.assertEqual(seating_map[1], [None, None, "HKG0001"] + [None] * 6 + ["HKG0002"])
+        self.assertEqual(seating_map.row_masks[1], (1 << 2) | (1 << 9))
+        with self.assertRaises(IndexError):
+            seating_map[1][10]
+
+        seating_map[1][2] = None
+        self.assertEqual(seating_map.row_masks[1], 1 << 9)
+        seating_map[1][3] = "HKG0003"
+        self.assertEqual(self.theater.find_booking("HKG0003").seats, [(1, 3)])
+        # Booking ids are stored as their integer handles, other values in
+        # slots that are reused once freed
+        self.assertEqual(seating_map._owners[13], 3)
+        self.assertEqual(seating_map._slots, {})
+        seating_map[2][0] = "TAKEN"
+        seating_map[2][0] = None
+        seating_map[2][1] = "HKG01"
+        self.assertEqual(len(seating_map._slot_ids), 2)
+        self.assertEqual(seating_map[2][1], "HKG01")
+        table, values = seating_map.owner_table()
+        self.assertEqual(values, [None, "HKG0003", "HKG0002", "HKG01"])
+        self.assertEqual(table[19], 2)
+
+    def test_booking_id_codec(self):
+        """Test that booking ids and handles convert both ways, past 9999"""
+        ids = BookingIdGenerator(next_id=9999)
+        self.assertEqual([ids.generate(), ids.generate()], ["HKG9999", "HKG10000"])
+        for handle in (1, 42, 9999, 10000, 3_000_000):
+            self.assertEqual(ids.decode(ids.encode(handle)), handle)
+        for booking_id in ("HKG0000", "HKG01", "HKG010000", "HKG１２３４", "HKG12a4", "ABC0001", "HKG"):
+            self.assertIsNone(ids.decode(booking_id))
+        # Ids past 9999 live in the seat map and book as usual
+        self.theater.next_booking_id = 12345
+        booking = self.theater.book_batch([2])[0]
+        self.assertEqual(booking.booking_id, "HKG12345")
+        self.assertEqual(self.theater.seating_map[0][4:6], ["HKG12345"] * 2)
+        self.assertEqual(self.theater.cancel_booking("HKG12345"), [(0, 4), (0, 5)])
+
+
+def reference_find_default_seats(seating_map, num_tickets, start_pos=None):
+    """The original allocator over a plain list-of-lists map, kept as an oracle"""
+    seats_per_row = len(seating_map[0])
+    middle = (seats_per_row - 1) // 2
+
+    def fill_out_from(row, start_col, wanted):
+        seats = []
+        col = start_col
+        while col < seats_per_row and len(seats) < wanted:
+            if seating_map[row][col] is None:
+                seats.append((row, col))
+            col += 1
+        col = start_col - 1
+        while col >= 0 and len(seats) < wanted:
+            if seating_map[row][col] is None:
+                seats.append((row, col))
+            col -= 1
+        return seats
+
+    def centered(row, wanted):
+        left = middle - ((wanted - 1) // 2)
+        right = left + wanted - 1
+        if left < 0:
+            left, right = 0, min(seats_per_row - 1, wanted - 1)
+        elif right >= seats_per_row:
+            right = seats_per_row - 1
+            left = max(0, right - wanted + 1)
+        return [(row, col) for col in range(left, right + 1)
+                if seating_map[row][col] is None][:wanted]
+
+    seats = []
+    if start_pos:
+        current_row = start_pos[0]
+        seats = fill_out_from(current_row, start_pos[1], num_tickets)
+        if len(seats) < num_tickets:
+            current_row += 1
+    else:
+        current_row = 0
+    while current_row < len(seating_map) and len(seats) < num_tickets:
+        remaining = num_tickets - len(seats)
+        if all(seat is None for seat in seating_map[current_row]):
+            new_seats = centered(current_row, remaining)
+        else:
+            new_seats = reference_find_consecutive_seats(seating_map, current_row, remaining)
+            if not new_seats:
+                new_seats = fill_out_from(current_row, middle, remaining)
+        seats.extend(new_seats)
+        current_row += 1
+    seats.sort()
+    return seats if len(seats) == num_tickets else []
+
+def random_theater(rng, rows=None, seats_per_row=None):
+    """A Theater plus an equal plain-list map with random seats taken"""
+    rows = rows or rng.randint(1, 8)
+    seats_per_row = seats_per_row or rng.randint(1, 20)
+    density = rng.random()
+    theater = Theater("Random", rows, seats_per_row)
+    plain_map = [[None] * seats_per_row for _ in range(rows)]
+    for row in range(rows):
+        for col in range(seats_per_row):
+            if rng.random() < density:
+                theater.seating_map[row][col] = "TAKEN"
+                plain_map[row][col] = "TAKEN"
+    return theater, plain_map
+
+class TestAllocatorAgainstReference(unittest.TestCase):
+    def test_find_default_seats_matches_reference(self):
+        """Property test: same seats as the original allocator on random maps"""
+        rng = random.Random(8)
+        for _ in range(2000):
+            theater, plain_map = random_theater(rng)
+            num_tickets = rng.randint(1, theater.rows * theater.seats_per_row)
+            start_pos = None
+            if rng.random() < 0.5:
+                start_pos = (rng.randrange(theater.rows), rng.randrange(theater.seats_per_row))
+            expected = reference_find_default_seats(plain_map, num_tickets, start_pos)
+            self.assertEqual(find_default_seats(theater.seating_map, num_tickets, start_pos), expected)
+
+    def test_large_halls_match_reference(self):
+        """Property test: the index-backed allocator on halls beyond 26x50"""
+        rng = random.Random(9)
+        for _ in range(20):
+            theater, plain_map = random_theater(rng, rng.randint(27, 120), rng.randint(51, 130))
+            for _ in range(5):
+                num_tickets = rng.randint(1, 300)
+                start_pos = (rng.randrange(theater.rows), rng.randrange(theater.seats_per_row))
+                for pos in (None, start_pos):
+                    expected = reference_find_default_seats(plain_map, num_tickets, pos)
+                    self.assertEqual(find_default_seats(theater.seating_map, num_tickets, pos), expected)
+
+    def test_batch_matches_sequential_bookings(self):
+        """Property test: a batch gives each party the seats of booking them in turn"""
+        rng = random.Random(88)
+        for _ in range(300):
+            theater, plain_map = random_theater(rng)
+            parties = [rng.randint(0, 8) for _ in range(rng.randint(1, 15))]
+            results = find_batch_seats(theater.seating_map, parties)
+            for num_tickets, seats in zip(parties, results):
+                expected = reference_find_default_seats(plain_map, num_tickets) if num_tickets else []
+                self.assertEqual(seats, expected)
+                for row, col in expected:
+                    plain_map[row][col] = "BATCH"
+            # Planning a batch does not touch the seating map
+            self.assertEqual(theater.get_available_seats(),
+                             sum(row.count(None) for row in theater.seating_map))
+
+    def test_allocation_after_cancellations(self):
+        """Property test: after booking and cancelling churn the allocator still
+        matches the original one on the resulting map"""
+        rng = random.Random(13)
+        for _ in range(100):
+            theater = Theater("Test Movie", rng.randint(1, 8), rng.randint(1, 20))
+            plain_map = [[None] * theater.seats_per_row for _ in range(theater.rows)]
+            for _ in range(20):
+                if theater.bookings and rng.random() < 0.4:
+                    booking = rng.choice(list(theater.bookings.values()))
+                    seats = rng.sample(booking.seats, rng.randint(1, len(booking)))
+                    for row, col in theater.cancel_booking(booking.booking_id, seats):
+                        plain_map[row][col] = None
+                else:
+                    num_tickets = rng.randint(1, 6)
+                    expected = reference_find_default_seats(plain_map, num_tickets)
+                    booked = theater.book_batch([num_tickets])[0]
+                    self.assertEqual(booked.seats if booked else [], expected)
+                    for row, col in expected:
+                        plain_map[row][col] = booked.booking_id
+            self.assertEqual([list(row) for row in theater.seating_map], plain_map)
+            self.assertEqual(theater.get_available_seats(), sum(row.count(None) for row in plain_map))
+
+    def test_book_batch(self):
+        """Test that book_batch confirms every party that fits"""
+        theater = Theater("Test Movie", 5, 10)
+        bookings = theater.book_batch([3, 60, 10, 0, 2])
+        self.assertEqual(bookings[0].seats, [(0, 3), (0, 4), (0, 5)])
+        self.assertIsNone(bookings[1])
+        self.assertEqual(len(bookings[2].seats), 10)
+        self.assertIsNone(bookings[3])
+        self.assertEqual(bookings[4].booking_id, "HKG0003")
+        self.assertEqual(theater.get_available_seats(), 35)
+
+class TestConsecutiveSeatSearch(unittest.TestCase):
+    def test_free_runs(self):
+        """Test that free runs are reported left to right"""
+        self.assertEqual(list(free_runs(0b0110010, 7)), [(0, 1), (2, 4), (6, 7)])
+        self.assertEqual(list(free_runs(0, 4)), [(0, 4)])
+        self.assertEqual(list(free_runs(0b1111, 4)), [])
+
+    def test_matches_reference_on_random_maps(self):
+        """Property test: same seats as the original search on random maps"""
+        rng = random.Random(20250403)
+        for _ in range(3000):
+            seats_per_row = rng.randint(1, 50)
+            density = rng.random()
+            theater = Theater("Random", 1, seats_per_row)
+            plain_map = [[None] * seats_per_row]
+            for col in range(seats_per_row):
+                if rng.random() < density:
+                    theater.seating_map[0][col] = "TAKEN"
+                    plain_map[0][col] = "TAKEN"
+            num_tickets = rng.randint(1, seats_per_row + 1)
+            expected = reference_find_consecutive_seats(plain_map, 0, num_tickets)
+            self.assertEqual(find_consecutive_seats(theater.seating_map, 0, num_tickets), expected)
+            self.assertEqual(find_consecutive_seats(plain_map, 0, num_tickets), expected)
+
+    def test_shared_hall_geometry(self):
+        """Test that same-size shows share one geometry and its tables"""
+        first, second = Theater("A", 3, 10), Theater("B", 3, 10)
+        self.assertIs(first.geometry, second.geometry)
+        self.assertIsNot(first.geometry, Theater("C", 4, 10).geometry)
+        geometry = first.geometry
+        self.assertEqual(geometry.center_out, (4, 5, 6, 7, 8, 9, 3, 2, 1, 0))
+        self.assertEqual([list(geometry.centered_windows[n]) for n in (1, 2, 3, 10)],
+                         [[4], [4, 5], [3, 4, 5], list(range(10))])
+        self.assertEqual(geometry.row_labels, ("A", "B", "C"))
+        rendered = render_seating_map(first.seating_map)
+        self.assertTrue(rendered.startswith(geometry.header + "C " + " •" * 10 + "\n"))
+        self.assertTrue(rendered.endswith(geometry.footer))
+        # Plain list maps are looked up by size
+        plain_map = [[None] * 10 for _ in range(3)]
+        self.assertEqual(find_seats_from_middle(plain_map, 0, 3), [(0, 4), (0, 5), (0, 6)])
+
+    def test_memoized_row_helpers(self):
+        """Test that repeated searches hit the cache and row changes do not go stale"""
+        clear_allocation_caches()
+        theater = Theater("Test Movie", 1, 10)
+        self.assertEqual(find_consecutive_seats(theater.seating_map, 0, 3), [(0, 4), (0, 5), (0, 6)])
+        self.assertEqual(find_consecutive_seats(theater.seating_map, 0, 3), [(0, 4), (0, 5), (0, 6)])
+        info = allocation_cache_info()["consecutive_start"]
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+        theater.seating_map[0][4] = "TAKEN"
+        self.assertEqual(find_consecutive_seats(theater.seating_map, 0, 3), [(0, 5), (0, 6), (0, 7)])
+        self.assertEqual(find_seats_from_middle(theater.seating_map, 0, 2), [(0, 5), (0, 6)])
+        self.assertEqual(allocation_cache_info()["consecutive_start"].misses, 2)
+        theater.seating_map[0][4] = None
+        self.assertEqual(find_consecutive_seats(theater.seating_map, 0, 3), [(0, 4), (0, 5), (0, 6)])
+        self.assertEqual(allocation_cache_info()["consecutive_start"].hits, 2)
+
+class TestSeatMapRendering(unittest.TestCase):
+    def test_render_seating_map(self):
+        """Test the rendered map layout, including two-line column numbers"""
+        theater = Theater("Test Movie", 2, 11)
+        theater.seating_map[0][0] = "TAKEN"
+        theater.seating_map[1][10] = "TAKEN"
+        expected = (
+            "\n"
+            "      S C R E E N       \n"
+            "------------------------\n"
+            "B  • # # • • • • • • • o\n"
+            "A  o • • • • • • • • • •\n"
+            "   1 2 3 4 5 6 7 8 9 1 1\n"
+            "                     0 1\n"
+        )
+        self.assertEqual(render_seating_map(theater.seating_map, [(1, 1), (1, 2)]), expected)
+
+    def test_render_large_hall(self):
+        """Test padded two-letter row labels and three-line column numbers"""
+        theater = Theater("Arena", 28, 101)
+        theater.seating_map[27][100] = "TAKEN"
+        lines = render_seating_map(theater.seating_map, [(0, 0)]).split("\n")
+        self.assertEqual(len(lines[2]), 3 + 2 * 101)
+        self.assertTrue(lines[3].startswith("AB  • •"))
+        self.assertTrue(lines[3].endswith("• o"))
+        self.assertTrue(lines[30].startswith("A   # •"))
+        # 98..101 read downwards, first digits on the first line
+        self.assertEqual(lines[31][-7:], "9 9 1 1")
+        self.assertEqual(lines[32][-7:], "8 9 0 0")
+        self.assertEqual(lines[33][-7:], "    0 1")
+        self.assertEqual(lines[31][:5], "    1")
+
+    def test_selection_wins_over_booked(self):
+        """Test that selected seats show as selected even when booked"""
+        theater = Theater("Test Movie", 1, 3)
+        theater.seating_map[0][1] = "TAKEN"
+        self.assertIn("A  • # •\n", render_seating_map(theater.seating_map, {(0, 1)}))
+        self.assertIn("A  • o •\n", render_seating_map(theater.seating_map))
+
+    def test_write_to_stream(self):
+        """Test rendering to any stream with a single print for stdout"""
+        from unittest.mock import patch
+        seating_map = Theater("Test Movie", 3, 5).seating_map
+        out = io.StringIO()
+        write_seating_map(seating_map, [(0, 2)], out)
+        self.assertEqual(out.getvalue(), render_seating_map(seating_map, [(0, 2)]))
+        with patch('builtins.print') as mock_print:
+            display_seating_map(seating_map)
+        self.assertEqual(mock_print.call_count, 1)
+
+class TestSeatHolds(unittest.TestCase):
+    def setUp(self):
+        self.theater = Theater("Test Movie", 5, 10)
+
+    def test_hold_blocks_other_allocations(self):
+        """Test that held seats are skipped by allocation and not available"""
+        hold = self.theater.hold_seats(3)
+        self.assertEqual(hold.seats, [(0, 3), (0, 4), (0, 5)])
+        self.assertEqual(self.theater.get_available_seats(), 47)
+        self.assertIsNone(self.theater.seating_map[0][4])
+        other = self.theater.hold_seats(3)
+        self.assertTrue(set(other.seats).isdisjoint(hold.seats))
+        with self.assertRaises(ValueError):
+            self.theater.seating_map[0][4] = "DIRECT"
+        self.assertIsNone(self.theater.confirm_booking("DIRECT", [(0, 4)]))
+
+    def test_confirm_and_release(self):
+        """Test that confirming books the held seats and releasing frees them"""
+        hold = self.theater.hold_seats(2)
+        booking = self.theater.confirm_hold(hold)
+        self.assertEqual(booking.seats, hold.seats)
+        self.assertIsNone(self.theater.find_hold(hold.booking_id))
+        self.assertEqual(self.theater.get_available_seats(), 48)
+
+        other = self.theater.hold_seats(4)
+        self.assertTrue(self.theater.release_hold(other))
+        self.assertFalse(self.theater.release_hold(other))
+        self.assertEqual(self.theater.get_available_seats(), 48)
+
+    def test_rehold_from_position(self):
+        """Test that moving a hold may reuse its own seats"""
+        hold = self.theater.hold_seats(3)
+        moved = self.theater.rehold_seats(hold, (0, 4))
+        self.assertEqual(moved.seats, [(0, 4), (0, 5), (0, 6)])
+        self.assertEqual(self.theater.get_available_seats(), 47)
+
+    def test_hopeless_rehold_keeps_hold(self):
+        """Test that a rehold too big for the rows left keeps the old seats"""
+        hold = self.theater.hold_seats(8)
+        for col in range(10):
+            self.theater.seating_map[4][col] = "FULL"
+        self.assertIsNone(self.theater.rehold_seats(hold, (4, 0)))
+        self.assertIs(self.theater.find_hold(hold.booking_id), hold)
+        self.assertEqual(self.theater.version, 11)  # nothing released and taken back
+        moved = self.theater.rehold_seats(hold, (3, 0))
+        self.assertEqual(moved.seats, [(3, col) for col in range(8)])
+
+    def test_rehold_outside_hall_keeps_hold(self):
+        """Test that a rehold to a seat off the hall fails before releasing"""
+        hold = self.theater.hold_seats(3)
+        for start_pos in ((0, 99), (-1, 0), (5, 2)):
+            with self.assertRaises(ValueError):
+                self.theater.rehold_seats(hold, start_pos)
+            self.assertIs(self.theater.find_hold(hold.booking_id), hold)
+        self.assertEqual(self.theater.get_available_seats(), 47)
+
+    def test_expired_holds(self):
+        """Test that expired holds are released, and confirm re-checks seats"""
+        hold = self.theater.hold_seats(3, ttl=0)
+        self.assertEqual(self.theater.release_expired_holds(), 1)
+        self.assertEqual(self.theater.get_available_seats(), 50)
+        # The seats are still free, so a late confirm succeeds
+        self.assertIsNotNone(self.theater.confirm_hold(hold))
+
+        late = self.theater.hold_seats(2, ttl=0)
+        self.theater.release_expired_holds()
+        self.theater.confirm_booking("OTHER", late.seats)
+        self.assertIsNone(self.theater.confirm_hold(late))
+
+    def test_concurrent_holds_never_double_book(self):
+        """Stress test: many threads selling one hall never share a seat"""
+        theater = Theater("Stress", 26, 50)
+        confirmed = []
+
+        def sell(seed):
+            rng = random.Random(seed)
+            while True:
+                hold = theater.hold_seats(rng.randint(1, 6))
+                if hold is None:
+                    if theater.get_available_seats() == 0:
+                        return
+                    continue
+                if rng.random() < 0.2:
+                    theater.release_hold(hold)
+                elif theater.confirm_hold(hold) is not None:
+                    confirmed.append(hold)
+
+        threads = [threading.Thread(target=sell, args=(seed,)) for seed in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        sold = [seat for hold in confirmed for seat in hold.seats]
+        self.assertEqual(len(sold), len(set(sold)))
+        self.assertEqual(len(sold), 26 * 50)
+        for hold in confirmed:
+            self.assertEqual(theater.find_booking(hold.booking_id).seats, hold.seats)
+            for row, col in hold.seats:
+                self.assertEqual(theater.seating_map[row][col], hold.booking_id)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,51 @@
+import unittest
+from venue import Venue
+
+class TestVenue(unittest.TestCase):
+    def setUp(self):
+        self.venue = Venue()
+        self.venue.load_shows([
+            ("Screen 1", "10:00", "Movie A", 5, 10),
+            ("Screen 1", "14:00", "Movie A", 5, 10),
+            ("Screen 2", "10:00", "Movie B", 8, 20),
+        ])
+
+    def test_load_shows(self):
+        """Test that shows are registered per (screen, showtime)"""
+        self.assertEqual(len(self.venue.shows), 3)
+        self.assertEqual(self.venue.get_show("Screen 2", "10:00").movie_name, "Movie B")
+        self.assertIsNone(self.venue.get_show("Screen 3", "10:00"))
+        with self.assertRaises(ValueError):
+            self.venue.add_show("Screen 1", "10:00", "Movie C", 5, 10)
+
+    def test_booking_ids_are_global(self):
+        """Test that booking ids do not collide across shows"""
+        first_id, first_seats = self.venue.book("Screen 1", "10:00", 3)
+        second_id, _ = self.venue.book("Screen 1", "14:00", 3)
+        third_id, _ = self.venue.book("Screen 2", "10:00", 2)
+        self.assertEqual([first_id, second_id, third_id], ["HKG0001", "HKG0002", "HKG0003"])
+        self.assertEqual(first_seats, [(0, 3), (0, 4), (0, 5)])
+        # Bookings confirm at once, so they leave nothing waiting to expire
+        self.assertEqual(self.venue.get_show("Screen 1", "10:00")._hold_expiry, [])
+
+    def test_lookup_routes_to_show(self):
+        """Test that lookups find the show holding a booking"""
+        booking_id, seats = self.venue.book("Screen 2", "10:00", 4)
+        theater, booking = self.venue.find_booking(booking_id)
+        self.assertIs(theater, self.venue.get_show("Screen 2", "10:00"))
+        self.assertEqual(booking.seats, seats)
+        self.assertIsNone(self.venue.find_booking("HKG9999"))
+        self.assertIsNone(self.venue.book("Screen 1", "10:00", 51))
+
+    def test_cancel(self):
+        """Test that cancelled bookings free seats and drop out of lookups"""
+        booking_id, seats = self.venue.book("Screen 1", "14:00", 4)
+        self.assertEqual(self.venue.cancel(booking_id, seats[:1]), seats[:1])
+        self.assertEqual(self.venue.find_booking(booking_id)[1].seats, seats[1:])
+        self.assertEqual(self.venue.cancel(booking_id), seats[1:])
+        self.assertIsNone(self.venue.find_booking(booking_id))
+        self.assertIsNone(self.venue.cancel(booking_id))
+        self.assertEqual(self.venue.get_available_seats()[("Screen 1", "14:00")], 50)
+
+if __name__ == '__main__':
+    unittest.main()
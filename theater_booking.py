@@ -1,64 +1,962 @@
+import bisect
+import heapq
 import string
+import sys
+import threading
+import time
+from array import array
+from collections import deque
+from collections.abc import Sequence
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import chain
 from typing import Optional
 
+class SeatRow(Sequence):
+    """Mutable view of one row of a SeatMap; reads and writes go to the compact store"""
+    __slots__ = ("_seat_map", "_row_idx", "_offset")
+
+    def __init__(self, seat_map, row_idx):
+        self._seat_map = seat_map
+        self._row_idx = row_idx
+        self._offset = row_idx * seat_map.seats_per_row
+
+    def __len__(self):
+        return self._seat_map.seats_per_row
+
+    def _col(self, col):
+        seats_per_row = self._seat_map.seats_per_row
+        if col < 0:
+            col += seats_per_row
+        if not 0 <= col < seats_per_row:
+            raise IndexError("seat index out of range")
+        return col
+
+    def __getitem__(self, col):
+        if isinstance(col, slice):
+            return [self[c] for c in range(*col.indices(len(self)))]
+        seat_map = self._seat_map
+        return seat_map._value_of(seat_map._owners[self._offset + self._col(col)])
+
+    def __setitem__(self, col, value):
+        if isinstance(col, slice):
+            cols = range(*col.indices(len(self)))
+            values = list(value)
+            if len(values) != len(cols):
+                raise ValueError("Seat rows cannot change size")
+            for c, v in zip(cols, values):
+                self[c] = v
+            return
+        self._seat_map._set_seat(self._row_idx, self._col(col), value)
+
+    def __iter__(self):
+        value_of = self._seat_map._value_of
+        owners = self._seat_map._owners
+        for i in range(self._offset, self._offset + len(self)):
+            yield value_of(owners[i])
+
+    def count(self, value):
+        if value is None:
+            return len(self) - self._seat_map.row_masks[self._row_idx].bit_count()
+        return super().count(value)
+
+    def __eq__(self, other):
+        if isinstance(other, (SeatRow, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+CHANGE_LOG_SIZE = 4096  # seat changes remembered for change-feed subscribers
+INTERNED_OWNER = 1 << 31  # owner codes with this bit set are interned slots, not handles
+
+class SeatChangeFeed:
+    """Versioned log of seat-state changes. Every change bumps version and,
+    once something watches the feed (track), records (version, row, column
+    mask); only the newest changes are kept. Shows nobody watches only count
+    versions, so they carry no log.
+
+    record() must be called with lock held (a SeatMap passes its own lock,
+    which its writers already hold); track() and changes_since() take it."""
+    def __init__(self, capacity=CHANGE_LOG_SIZE, lock=None):
+        self.version = 0
+        self.capacity = capacity
+        self._log = None  # created by track or the first changes_since
+        self._lock = lock or threading.Lock()
+
+    def track(self):
+        """Log changes from now on, so changes_since can report them"""
+        with self._lock:
+            self._start_log()
+
+    def _start_log(self):
+        if self._log is None:
+            self._log = deque(maxlen=self.capacity)
+
+    def record(self, row, bits):
+        self.version += 1
+        if self._log is not None:
+            self._log.append((self.version, row, bits))
+
+    def changes_since(self, version):
+        """Return {row: mask of seats changed} since version, or None when
+        the log no longer reaches back that far (redraw everything). The
+        first call starts the log if track has not."""
+        with self._lock:
+            if version == self.version:
+                return {}
+            self._start_log()
+            log = self._log
+            if version > self.version or not log or log[0][0] > version + 1:
+                return None
+            changed = {}
+            for entry_version, row, bits in reversed(log):
+                if entry_version <= version:
+                    break
+                changed[row] = changed.get(row, 0) | bits
+            return changed
+
+class FeasibilityIndex:
+    """Segment tree over rows of free-seat counts and longest free runs.
+
+    Answers "can n seats still be allocated from row r onward", "is there
+    a block of n consecutive free seats" and "which is the next row with a
+    free seat" in O(log rows). Hopeless requests are rejected before any
+    seat search, and the allocator skips full rows without scanning them,
+    which keeps it sublinear in the hall size. SeatMap marks a row dirty
+    whenever its occupancy changes, which costs a set insert; the next query
+    refreshes the dirty rows, O(log rows) each, so a booking that touches a
+    row seat by seat is indexed once.
+    """
+    def __init__(self, masks, seats_per_row):
+        self.rows = len(masks)
+        self.seats_per_row = seats_per_row
+        self._masks = masks  # the SeatMap's blocked_masks, read on refresh
+        size = 1
+        while size < len(masks):
+            size *= 2
+        self._size = size
+        self._free = [0] * (2 * size)  # node -> free seats in its rows
+        self._runs = [0] * (2 * size)  # node -> longest free run in its rows
+        self._dirty = set(range(len(masks)))
+        self._lock = threading.Lock()
+
+    def mark_dirty(self, row):
+        self._dirty.add(row)
+
+    def refresh(self):
+        """Bring the dirty rows up to date"""
+        with self._lock:
+            free, runs, dirty = self._free, self._runs, self._dirty
+            seats_per_row = self.seats_per_row
+            while dirty:
+                row = dirty.pop()  # pop before reading, so a later change re-marks it
+                mask = self._masks[row]
+                node = self._size + row
+                free[node] = seats_per_row - mask.bit_count()
+                runs[node] = longest_free_run(mask, seats_per_row)
+                node >>= 1
+                while node:
+                    left = 2 * node
+                    free[node] = free[left] + free[left + 1]
+                    runs[node] = runs[left] if runs[left] >= runs[left + 1] else runs[left + 1]
+                    node >>= 1
+
+    def free_from(self, row=0):
+        """Free seats in rows row.. (the rows a start position allocates from)"""
+        if self._dirty:
+            self.refresh()
+        free = self._free
+        left, right = self._size + row, 2 * self._size
+        total = 0
+        while left < right:
+            if left & 1:
+                total += free[left]
+                left += 1
+            if right & 1:
+                right -= 1
+                total += free[right]
+            left >>= 1
+            right >>= 1
+        return total
+
+    def longest_from(self, row=0):
+        """Longest block of consecutive free seats in one of rows row.."""
+        if self._dirty:
+            self.refresh()
+        runs = self._runs
+        left, right = self._size + row, 2 * self._size
+        longest = 0
+        while left < right:
+            if left & 1:
+                longest = max(longest, runs[left])
+                left += 1
+            if right & 1:
+                right -= 1
+                longest = max(longest, runs[right])
+            left >>= 1
+            right >>= 1
+        return longest
+
+    def _first(self, tree, row, need):
+        # First row >= row whose leaf is >= need; a node is >= need whenever
+        # one of its leaves is (sums of free seats, maxima of runs)
+        if row >= self.rows:
+            return None
+        if self._dirty:
+            self.refresh()
+        node = self._size + row
+        while tree[node] < need:
+            while node & 1:  # rightmost at this level: climb
+                node >>= 1
+            if not node:
+                return None
+            node += 1  # the next range to the right
+        while node < self._size:
+            node *= 2
+            if tree[node] < need:
+                node += 1
+        return node - self._size
+
+    def next_open_row(self, row=0):
+        """First row from row onward with a free seat, or None"""
+        return self._first(self._free, row, 1)
+
+    def can_seat(self, num_tickets, start_row=0):
+        """Whether num_tickets seats can be allocated from start_row onward.
+        Exact for the default policy, which takes every free seat it needs
+        in row order; necessary for any strategy."""
+        return 0 < num_tickets <= self.free_from(start_row)
+
+    def can_seat_together(self, num_tickets, start_row=0):
+        """Whether some row from start_row onward has num_tickets free seats side by side"""
+        return 0 < num_tickets <= self.longest_from(start_row)
+
+class SeatMap(Sequence):
+    """Compact seat-state store shaped like a list of rows.
+
+    Occupancy is one integer bitmask per row (bit c set = seat c taken) and
+    ownership is an array of owner codes, so a hall costs a few bytes per
+    seat instead of a Python object per seat. A booking id the id codec (a
+    BookingIdGenerator) can decode is stored as its integer handle and
+    encoded again when read; any other value is interned in a slot table.
+    Seats can also be held (see Theater.hold_seats); held seats read as None
+    but are not free. Free-seat counters exclude both and are kept up to
+    date on every change.
+
+    Each row has its own lock; writes through seating_map[row][col] take it.
+    Every change to what a seat displays as is logged in the change feed,
+    and every change to a row's occupancy updates the feasibility index.
+    """
+    def __init__(self, rows, seats_per_row, on_change=None, id_codec=None):
+        self.seats_per_row = seats_per_row
+        self.geometry = hall_geometry(rows, seats_per_row)  # shared with same-size halls
+        self.row_masks = [0] * rows
+        self.held_masks = [0] * rows
+        self.blocked_masks = [0] * rows  # row_masks | held_masks, what allocation sees
+        self.index = FeasibilityIndex(self.blocked_masks, seats_per_row)
+        self.row_free = [seats_per_row] * rows
+        self.free_seats = rows * seats_per_row
+        self.row_locks = tuple(threading.RLock() for _ in range(rows))
+        self._lock = threading.Lock()  # guards free_seats and the slot table
+        self._owners = array("I", [0]) * (rows * seats_per_row)  # 0 = free
+        self._id_codec = id_codec
+        self._last_handle = (None, None)  # (booking id, handle) last decoded
+        self._slot_ids = [None]  # slot -> interned value
+        self._slots = {}  # interned value -> slot
+        self._slot_refs = [0]  # seats held per slot, so slots can be reused
+        self._free_slots = []
+        self._rows = tuple(SeatRow(self, row_idx) for row_idx in range(rows))
+        self._on_change = on_change
+        self.feed = SeatChangeFeed(lock=self._lock)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, row):
+        return self._rows[row]
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def is_row_empty(self, row):
+        return self.row_free[row] == self.seats_per_row
+
+    def is_row_full(self, row):
+        return self.row_free[row] == 0
+
+    @contextmanager
+    def locked_rows(self, rows):
+        """Hold the locks of the given rows, always taken in row order"""
+        locks = [self.row_locks[row] for row in sorted(set(rows))]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def hold(self, seats):
+        """Atomically mark seats as held if every one of them is free"""
+        row_bits = seats_by_row(seats)
+        with self.locked_rows(row_bits):
+            for row, bits in row_bits.items():
+                if self.blocked_masks[row] & bits:
+                    return False
+            for row, bits in row_bits.items():
+                self.held_masks[row] |= bits
+                self.blocked_masks[row] |= bits
+                self.row_free[row] -= bits.bit_count()
+            with self._lock:
+                self.free_seats -= len(seats)
+                for row, bits in row_bits.items():
+                    self.index.mark_dirty(row)
+                    self.feed.record(row, bits)
+        return True
+
+    def unhold(self, seats):
+        """Release held seats back to free"""
+        row_bits = seats_by_row(seats)
+        with self.locked_rows(row_bits):
+            released = 0
+            with self._lock:
+                for row, bits in row_bits.items():
+                    bits &= self.held_masks[row]
+                    if not bits:
+                        continue
+                    self.held_masks[row] &= ~bits
+                    self.blocked_masks[row] &= ~bits
+                    self.row_free[row] += bits.bit_count()
+                    released += bits.bit_count()
+                    self.index.mark_dirty(row)
+                    self.feed.record(row, bits)
+                self.free_seats += released
+
+    def release(self, seats, booking_id):
+        """Free the given seats that booking_id has booked, in O(len(seats)).
+        Returns the seats released."""
+        row_bits = seats_by_row(seats)
+        seats_per_row = self.seats_per_row
+        with self.locked_rows(row_bits):
+            owner = self._owner_of(booking_id)
+            if not owner:
+                return []
+            owners = self._owners
+            released = [seat for seat in seats if owners[seat[0] * seats_per_row + seat[1]] == owner]
+            with self._lock:
+                for row, col in released:
+                    owners[row * seats_per_row + col] = 0
+                    if owner & INTERNED_OWNER:
+                        self._release_slot(owner ^ INTERNED_OWNER)
+                for row, bits in seats_by_row(released).items():
+                    self.row_masks[row] &= ~bits
+                    self.blocked_masks[row] &= ~bits
+                    self.row_free[row] += bits.bit_count()
+                    self.index.mark_dirty(row)
+                    self.feed.record(row, bits)
+                self.free_seats += len(released)
+            if self._on_change is not None:
+                # Last seat first, so the booking index drops seats off the end
+                for row, col in reversed(released):
+                    self._on_change(row, col, booking_id, None)
+        return released
+
+    def owner_table(self):
+        """Seat owners renumbered densely: (array of one slot per seat, 0 =
+        free; list of the value of each slot, None for slot 0)"""
+        slots = {0: 0}
+        values = [None]
+        table = array("I", self._owners)
+        for i, owner in enumerate(table):
+            slot = slots.get(owner)
+            if slot is None:
+                slot = slots[owner] = len(values)
+                values.append(self._value_of(owner))
+            table[i] = slot
+        return table, values
+
+    def _handle_of(self, value):
+        """Integer handle of a booking id the id codec can decode, else None"""
+        last_id, handle = self._last_handle  # one tuple, so threads see a matching pair
+        if value is last_id:
+            return handle
+        if self._id_codec is None or not isinstance(value, str):
+            return None
+        handle = self._id_codec.decode(value)
+        if handle is None or handle >= INTERNED_OWNER:
+            return None
+        self._last_handle = (value, handle)
+        return handle
+
+    def _value_of(self, owner):
+        if not owner:
+            return None
+        if owner & INTERNED_OWNER:
+            return self._slot_ids[owner ^ INTERNED_OWNER]
+        return self._id_codec.encode(owner)
+
+    def _owner_of(self, value):
+        """Owner code of value, or 0 if it owns no seat"""
+        if value is None:
+            return 0
+        handle = self._handle_of(value)
+        if handle is not None:
+            return handle
+        slot = self._slots.get(value)
+        return 0 if slot is None else slot | INTERNED_OWNER
+
+    def _acquire_owner(self, value):
+        handle = self._handle_of(value)
+        if handle is not None:
+            return handle
+        slot = self._slots.get(value)
+        if slot is None:
+            if self._free_slots:
+                slot = self._free_slots.pop()
+                self._slot_ids[slot] = value
+            else:
+                slot = len(self._slot_ids)
+                self._slot_ids.append(value)
+                self._slot_refs.append(0)
+            self._slots[value] = slot
+        self._slot_refs[slot] += 1
+        return slot | INTERNED_OWNER
+
+    def _release_slot(self, slot):
+        self._slot_refs[slot] -= 1
+        if not self._slot_refs[slot]:
+            del self._slots[self._slot_ids[slot]]
+            self._slot_ids[slot] = None
+            self._free_slots.append(slot)
+
+    def _set_seat(self, row, col, value):
+        with self.row_locks[row]:
+            if self.held_masks[row] >> col & 1:
+                raise ValueError("Seat is held by another sale")
+            i = row * self.seats_per_row + col
+            old_owner = self._owners[i]
+            old = self._value_of(old_owner)
+            if old == value:
+                return
+            with self._lock:
+                if value is None:
+                    self._owners[i] = 0
+                    self.row_masks[row] &= ~(1 << col)
+                    self.blocked_masks[row] &= ~(1 << col)
+                    self.row_free[row] += 1
+                    self.free_seats += 1
+                    self.index.mark_dirty(row)
+                    self.feed.record(row, 1 << col)
+                else:
+                    self._owners[i] = self._acquire_owner(value)
+                    if old is None:
+                        self.row_masks[row] |= 1 << col
+                        self.blocked_masks[row] |= 1 << col
+                        self.row_free[row] -= 1
+                        self.free_seats -= 1
+                        self.index.mark_dirty(row)
+                        self.feed.record(row, 1 << col)
+                if old_owner & INTERNED_OWNER:
+                    self._release_slot(old_owner ^ INTERNED_OWNER)
+            if self._on_change is not None:
+                self._on_change(row, col, old, value)
+
+def seats_by_row(seats):
+    """Group (row, col) seats into {row: column bitmask}"""
+    row_bits = {}
+    for row, col in seats:
+        row_bits[row] = row_bits.get(row, 0) | 1 << col
+    return row_bits
+
+def row_mask(seating_map, row):
+    """Occupancy bitmask of a row (bit c set = seat c booked or held).
+    Maps that keep masks (SeatMap, mapped snapshots) expose blocked_masks."""
+    masks = getattr(seating_map, "blocked_masks", None)
+    if masks is not None:
+        return masks[row]
+    mask = 0
+    for col, seat in enumerate(seating_map[row]):
+        if seat is not None:
+            mask |= 1 << col
+    return mask
+
+class Booking:
+    """Index entry for one booking: its seats (sorted) plus metadata"""
+    def __init__(self, booking_id):
+        self.booking_id = booking_id
+        self.seats = []
+        self.created_at = time.time()
+
+    def __len__(self):
+        return len(self.seats)
+
+class BookingIdGenerator:
+    """Hands out booking ids; Theaters sharing one get a common id namespace.
+    Generators with the same step and different starts never collide (see
+    sharded_venue.py).
+
+    An id is the prefix and an integer handle, zero-padded to four digits and
+    growing past them (HKG0001, HKG9999, HKG10000, ...). encode and decode
+    convert between the two, so seat maps store handles instead of strings."""
+    def __init__(self, prefix="HKG", next_id=1, step=1):
+        self.prefix = prefix
+        self.next_id = next_id
+        self.step = step
+        self._lock = threading.Lock()
+
+    def generate(self):
+        with self._lock:
+            handle = self.next_id
+            self.next_id += self.step
+        return self.encode(handle)
+
+    def encode(self, handle):
+        return f"{self.prefix}{handle:04d}"
+
+    def decode(self, booking_id):
+        """Handle of a booking id with this prefix, or None if booking_id is not
+        exactly what encode would give for some positive handle"""
+        if not booking_id.startswith(self.prefix):
+            return None
+        digits = booking_id[len(self.prefix):]
+        if not (digits.isascii() and digits.isdigit()) or len(digits) < 4:
+            return None
+        if len(digits) > 4 and digits[0] == "0":
+            return None
+        return int(digits) or None
+
+HOLD_TTL = 300  # seconds a seat hold lasts before it can be released
+MAX_HOLD_ATTEMPTS = 100  # retries when another sale takes the offered seats first
+
+class SeatHold:
+    """Seats set aside for a booking until it is confirmed, released or expires"""
+    def __init__(self, booking_id, seats, expires_at):
+        self.booking_id = booking_id
+        self.seats = seats
+        self.expires_at = expires_at  # time.monotonic() deadline, or None
+
+    def expired(self, now=None):
+        if self.expires_at is None:
+            return False
+        return (time.monotonic() if now is None else now) >= self.expires_at
+
 class Theater:
-    def __init__(self, movie_name, rows, seats_per_row):
+    def __init__(self, movie_name, rows, seats_per_row, id_generator=None, strategy=None):
         self.movie_name = movie_name
         self.rows = rows
         self.seats_per_row = seats_per_row
-        self.seating_map = [[None for _ in range(seats_per_row)] for _ in range(rows)]
-        self.next_booking_id = 1
+        self.bookings = {}  # booking_id -> Booking, kept in sync with seating_map
+        self.id_generator = id_generator or BookingIdGenerator()
+        self.seating_map = SeatMap(rows, seats_per_row, self._index_seat_change, self.id_generator)
+        self.show_key = None  # (screen, showtime) once registered with a Venue
+        self.strategy = strategy or DEFAULT_STRATEGY  # see DefaultStrategy
+        self._booking_listeners = []
+        self._write_listeners = []
+        self._batch = threading.local()  # seats changed by this thread's current write
+        self._holds = {}  # booking_id -> SeatHold
+        self._hold_expiry = []  # heap of (expires_at, seq, SeatHold)
+        self._hold_seq = 0
+        self._holds_lock = threading.Lock()
+
+    @property
+    def next_booking_id(self):
+        return self.id_generator.next_id
+
+    @next_booking_id.setter
+    def next_booking_id(self, value):
+        self.id_generator.next_id = value
+
+    @property
+    def geometry(self):
+        """The HallGeometry shared by every show of this hall size"""
+        return self.seating_map.geometry
+
+    @property
+    def version(self):
+        """Change-feed version; bumps on every change to a seat's state"""
+        return self.seating_map.feed.version
+
+    def track_changes(self):
+        """Start the change log that changes_since reads; displays call this
+        when they subscribe, and shows without one keep no log"""
+        self.seating_map.feed.track()
+
+    def changes_since(self, version):
+        """{row: mask of changed seats} since version, or None if too old"""
+        return self.seating_map.feed.changes_since(version)
+
+    def add_booking_listener(self, callback):
+        """Call callback(theater, booking_id, booked) when a booking gains its
+        first seat (booked=True) or loses its last one (booked=False)"""
+        self._booking_listeners.append(callback)
+
+    def add_write_listener(self, callback):
+        """Call callback(seats, booking_id) once per write: a confirmed booking
+        or hold, a cancellation (booking_id None), or a direct write into one
+        seat. It runs with the seats' rows still locked, after the booking
+        index has been updated, so callbacks see writes to a seat in order."""
+        self._write_listeners.append(callback)
+
+    @contextmanager
+    def _write_batch(self, booking_id):
+        """Report the seat changes made in this block to write listeners as one
+        write of booking_id. Call with the rows to be written locked."""
+        if not self._write_listeners or getattr(self._batch, "seats", None) is not None:
+            yield
+            return
+        self._batch.seats = seats = []
+        try:
+            yield
+        finally:
+            self._batch.seats = None
+            if seats:
+                seats.sort()
+                for callback in self._write_listeners:
+                    callback(seats, booking_id)
         
     def get_available_seats(self):
-        return sum(row.count(None) for row in self.seating_map)
+        return self.seating_map.free_seats
+
+    def get_row_available_seats(self, row):
+        return self.seating_map.row_free[row]
+
+    def can_seat(self, num_tickets, start_row=0, together=False):
+        """O(log rows) check that num_tickets can still be allocated from
+        start_row onward, or with together=True, side by side in one row"""
+        index = self.seating_map.index
+        if together:
+            return index.can_seat_together(num_tickets, start_row)
+        if not start_row:
+            return 0 < num_tickets <= self.seating_map.free_seats  # no index refresh needed
+        return index.can_seat(num_tickets, start_row)
         
     def generate_booking_id(self):
-        booking_id = f"HKG{self.next_booking_id:04d}"
-        self.next_booking_id += 1
-        return booking_id
+        return self.id_generator.generate()
 
-def display_seating_map(seating_map, selected_seats=None):
-    seats_per_row = len(seating_map[0])
+    def confirm_booking(self, booking_id, seats):
+        """Write booking_id into the given seats and return its index entry.
+        Returns None, writing nothing, if any seat is already booked or held."""
+        seating_map = self.seating_map
+        with seating_map.locked_rows(row for row, _ in seats):
+            for row, col in seats:
+                if row_mask(seating_map, row) >> col & 1:
+                    return None
+            with self._write_batch(booking_id):
+                for row, col in seats:
+                    seating_map[row][col] = booking_id
+        return self.bookings.get(booking_id)
+
+    def hold_seats(self, num_tickets, start_pos=None, booking_id=None, ttl=HOLD_TTL):
+        """Allocate seats with the Theater's strategy and hold them for booking_id.
+
+        Safe to call from many threads at once: concurrent holds never share
+        a seat. Returns a SeatHold, or None if the seats cannot be allocated;
+        requests the hall has too few free seats for (from the start
+        position's row onward) are turned down before any search. Raises
+        ValueError if start_pos is not a seat of the hall.
+        """
+        check_start_pos(start_pos, self.rows, self.seats_per_row)
+        self.release_expired_holds()
+        if not self.can_seat(num_tickets, start_pos[0] if start_pos else 0):
+            return None
+        if booking_id is None:
+            booking_id = self.generate_booking_id()
+        for _ in range(MAX_HOLD_ATTEMPTS):
+            seats = self.strategy.allocate(self.seating_map.blocked_masks, self.seats_per_row,
+                                           num_tickets, start_pos, index=self.seating_map.index)
+            if not seats:
+                return None
+            # Another sale may have taken some of these seats since the search
+            if self.seating_map.hold(seats):
+                return self._register_hold(SeatHold(booking_id, seats, None), ttl)
+        return None
+
+    def book_batch(self, party_sizes):
+        """Book a queue of parties (e.g. pending orders at sale open) using one
+        find_batch_seats pass. Returns a Booking, or None, per party."""
+        results = []
+        batch = find_batch_seats(self.seating_map, party_sizes, self.strategy)
+        for num_tickets, seats in zip(party_sizes, batch):
+            if not seats:
+                results.append(None)
+                continue
+            booking_id = self.generate_booking_id()
+            if self.seating_map.hold(seats):
+                hold = self._register_hold(SeatHold(booking_id, seats, None), None)
+            else:
+                # Another sale took some planned seats meanwhile; search again
+                hold = self.hold_seats(num_tickets, booking_id=booking_id, ttl=None)
+            results.append(self.confirm_hold(hold) if hold is not None else None)
+        return results
+
+    def rehold_seats(self, hold, start_pos, ttl=HOLD_TTL):
+        """Swap a hold for the same number of seats allocated from start_pos.
+        Returns the new SeatHold, or None if that fails, in which case the
+        old hold is kept if its seats could be taken back. Raises ValueError,
+        keeping the hold, if start_pos is not a seat of the hall."""
+        check_start_pos(start_pos, self.rows, self.seats_per_row)
+        start_row = start_pos[0] if start_pos else 0
+        own_seats = sum(1 for row, _ in hold.seats if row >= start_row)
+        if self.seating_map.index.free_from(start_row) + own_seats < len(hold.seats):
+            return None  # hopeless even with the old seats back; keep the hold
+        self.release_hold(hold)
+        new_hold = self.hold_seats(len(hold.seats), start_pos, hold.booking_id, ttl)
+        if new_hold is None and self.seating_map.hold(hold.seats):
+            self._register_hold(hold, ttl)
+        return new_hold
+
+    def confirm_hold(self, hold):
+        """Turn a hold into a booking. An expired hold still succeeds if its
+        seats are free. Returns the Booking, or None if the seats were lost."""
+        with self._holds_lock:
+            active = self._holds.get(hold.booking_id) is hold
+            if active:
+                del self._holds[hold.booking_id]
+        if not active and not self.seating_map.hold(hold.seats):
+            return None
+        seating_map = self.seating_map
+        with seating_map.locked_rows(row for row, _ in hold.seats):
+            seating_map.unhold(hold.seats)
+            with self._write_batch(hold.booking_id):
+                for row, col in hold.seats:
+                    seating_map[row][col] = hold.booking_id
+        return self.bookings.get(hold.booking_id)
+
+    def release_hold(self, hold):
+        """Give the held seats back; does nothing if the hold is no longer active"""
+        with self._holds_lock:
+            if self._holds.get(hold.booking_id) is not hold:
+                return False
+            del self._holds[hold.booking_id]
+        self.seating_map.unhold(hold.seats)
+        return True
+
+    def find_hold(self, booking_id):
+        """Return the active SeatHold for booking_id, or None"""
+        return self._holds.get(booking_id)
+
+    def release_expired_holds(self):
+        """Release every hold past its expiry; returns how many were released"""
+        expiry = self._hold_expiry
+        now = time.monotonic()
+        released = 0
+        while expiry and expiry[0][0] <= now:
+            with self._holds_lock:
+                if not expiry or expiry[0][0] > now:
+                    break
+                expires_at, _, hold = heapq.heappop(expiry)
+                # Skip holds already confirmed, released or re-registered
+                if self._holds.get(hold.booking_id) is not hold or hold.expires_at != expires_at:
+                    continue
+                del self._holds[hold.booking_id]
+            self.seating_map.unhold(hold.seats)
+            released += 1
+        return released
+
+    def _register_hold(self, hold, ttl):
+        hold.expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._holds_lock:
+            self._holds[hold.booking_id] = hold
+            if hold.expires_at is not None:
+                self._hold_seq += 1
+                heapq.heappush(self._hold_expiry, (hold.expires_at, self._hold_seq, hold))
+        return hold
+
+    def find_booking(self, booking_id):
+        """Return the Booking for booking_id, or None (O(1))"""
+        return self.bookings.get(booking_id)
+
+    def cancel_booking(self, booking_id, seats=None):
+        """Cancel a booking, or only the given seats of it (a partial refund).
+
+        The seats are freed in O(seats released) and the free-seat counters
+        and row masks are updated in place, so the next allocation sees them.
+        Returns the sorted released seats, or None if booking_id does not
+        exist or does not own every seat given.
+        """
+        booking = self.bookings.get(booking_id)
+        if booking is None:
+            return None
+        if seats is None:
+            seats = booking.seats[:]
+        else:
+            seats = sorted(set(seats))
+            owned = set(booking.seats)
+            if not seats or any(seat not in owned for seat in seats):
+                return None
+        seating_map = self.seating_map
+        with seating_map.locked_rows(row for row, _ in seats), self._write_batch(None):
+            return seating_map.release(seats, booking_id)
+
+    def _index_seat_change(self, row, col, old, new):
+        # Keep the booking index in sync with every write into seating_map,
+        # including releases (new is None) and direct writes by callers
+        if old is not None:
+            booking = self.bookings[old]
+            seats = booking.seats
+            del seats[bisect.bisect_left(seats, (row, col))]
+            if not booking.seats:
+                del self.bookings[old]
+                for callback in self._booking_listeners:
+                    callback(self, old, False)
+        if new is not None:
+            booking = self.bookings.get(new)
+            if booking is None:
+                booking = self.bookings[new] = Booking(new)
+                for callback in self._booking_listeners:
+                    callback(self, new, True)
+            bisect.insort(booking.seats, (row, col))
+        if self._write_listeners:
+            batch = getattr(self._batch, "seats", None)
+            if batch is not None:
+                batch.append((row, col))
+            else:
+                for callback in self._write_listeners:
+                    callback([(row, col)], new)
+
+@lru_cache(maxsize=None)
+def row_label(row_idx):
+    """Row letters shown on the map and used in seat positions: A-Z, then
+    AA-AZ, BA-BZ, ... ZZ, AAA, like spreadsheet columns ("A" is row 0)"""
+    label = ""
+    row_idx += 1
+    while row_idx:
+        row_idx, letter = divmod(row_idx - 1, 26)
+        label = chr(65 + letter) + label
+    return label
+
+def parse_row_label(label):
+    """Row index of a row label ("A" -> 0, "AA" -> 26), or None"""
+    if not label or not label.isascii() or not label.isalpha():
+        return None
+    row = 0
+    for letter in label.upper():
+        row = row * 26 + ord(letter) - 64
+    return row - 1
+
+def row_label_width(rows):
+    """Width of the longest row label in a hall, which all labels are padded to"""
+    return len(row_label(rows - 1)) if rows else 1
+
+# Rendered text of 8 consecutive seats for every occupancy byte, seat 1 first
+SEAT_CHUNKS = tuple("".join(" o" if byte >> bit & 1 else " •" for bit in range(8))
+                    for byte in range(256))
+
+def _map_frame(seats_per_row, label_width=1):
+    """Static header and footer text of a seat map"""
     # Calculate width based on actual dots display (2 spaces per seat)
     total_width = 2 * seats_per_row  # Each seat takes 2 spaces (" •")
     
     # Center the word "SCREEN" with spaces between letters
-    print("\n" + " ".join("SCREEN").center(total_width + 2))
-    # Match exactly: 2 for "A ", then 2 per seat for " •"
-    print("-" * (total_width + 2))  # Total width plus row letter and space
+    header = "\n" + " ".join("SCREEN").center(total_width + label_width + 1) + "\n"
+    # Match exactly: the row label and a space, then 2 per seat for " •"
+    header += "-" * (total_width + label_width + 1) + "\n"
     
-    # Display seats
-    for row_idx in range(len(seating_map)-1, -1, -1):
-        row = seating_map[row_idx]
-        row_letter = chr(65 + row_idx)
-        seats = []
-        for col_idx in range(len(row)):
-            if selected_seats and (row_idx, col_idx) in selected_seats:
-                seats.append(" #")  # Selected seats
-            elif row[col_idx] is not None:
-                seats.append(" o")  # Booked seats
-            else:
-                seats.append(" •")  # Available seats
-        print(f"{row_letter} {''.join(seats)}")
+    # Column numbers aligned with seats, one line per digit: a number's
+    # first digit on the first line, its second on the second, and so on
+    digits = len(str(seats_per_row))
+    lines = [[" " * (label_width + 1)] for _ in range(digits)]  # space for the row label
+    for i in range(seats_per_row):
+        num = str(i + 1)
+        for line, parts in enumerate(lines):
+            parts.append(f" {num[line]}" if line < len(num) else "  ")
     
-    # Print column numbers aligned with seats
-    first_line = "  "  # Space for row letter and first space
-    second_line = "  "  # Space for row letter and first space
-    has_double_digits = False
+    footer = "".join("".join(parts).rstrip() + "\n" for parts in lines)
+    return header, footer
+
+class HallGeometry:
+    """Layout tables of one hall size, built once by hall_geometry and shared
+    by every show of that size; read-only.
+
+    center_out is the column order the allocator fills a row in (the middle,
+    rightwards, then leftwards from just before the middle) and
+    centered_windows[n] the columns of the block of n seats centred in a
+    row. row_labels, row_prefixes (padded label and a space), header and
+    footer are the pieces of the rendered map.
+    """
+    __slots__ = ("rows", "seats_per_row", "middle", "full_mask", "center_out", "centered_windows",
+                 "row_labels", "label_width", "row_prefixes", "header", "footer")
+
+    def __init__(self, rows, seats_per_row):
+        self.rows = rows
+        self.seats_per_row = seats_per_row
+        self.middle = middle = (seats_per_row - 1) // 2
+        self.full_mask = (1 << seats_per_row) - 1
+        self.center_out = tuple(range(middle, seats_per_row)) + tuple(range(middle - 1, -1, -1))
+        self.centered_windows = tuple(_centered_window(seats_per_row, middle, num_tickets)
+                                      for num_tickets in range(seats_per_row + 1))
+        self.row_labels = tuple(row_label(row_idx) for row_idx in range(rows))
+        self.label_width = row_label_width(rows)
+        self.row_prefixes = tuple(f"{label:<{self.label_width}} " for label in self.row_labels)
+        self.header, self.footer = _map_frame(seats_per_row, self.label_width)
+
+    def __repr__(self):
+        return f"HallGeometry({self.rows}, {self.seats_per_row})"
+
+def _centered_window(seats_per_row, middle, num_tickets):
+    left = middle - ((num_tickets - 1) // 2)
+    right = left + num_tickets - 1
     
-    for i in range(seats_per_row):
-        num = i + 1
-        if num < 10:
-            first_line += f" {num}"  # Single digits on first line
-            second_line += "  "  # Skip second line for single digits
-        else:
-            has_double_digits = True
-            first_line += f" {num//10}"  # Tens on first line
-            second_line += f" {num%10}"  # Ones on second line
+    # Adjust if we go out of bounds
+    if left < 0:
+        left = 0
+        right = min(seats_per_row - 1, num_tickets - 1)
+    elif right >= seats_per_row:
+        right = seats_per_row - 1
+        left = max(0, right - num_tickets + 1)
+    return range(left, right + 1)
+
+@lru_cache(maxsize=None)
+def hall_geometry(rows, seats_per_row):
+    """The shared HallGeometry of halls with rows x seats_per_row seats"""
+    return HallGeometry(rows, seats_per_row)
+
+def geometry_of(seating_map):
+    """HallGeometry of a seat map; SeatMaps carry theirs, other maps
+    (plain lists, mapped snapshots) are looked up by size"""
+    geometry = getattr(seating_map, "geometry", None)
+    if geometry is None:
+        geometry = hall_geometry(len(seating_map), len(seating_map[0]))
+    return geometry
+
+@lru_cache(maxsize=4096)
+def _row_text(mask, seats_per_row):
+    """Seat glyphs of a row with the given occupancy mask"""
+    return "".join([SEAT_CHUNKS[mask >> shift & 255]
+                    for shift in range(0, seats_per_row, 8)])[:2 * seats_per_row]
+
+def render_seating_map(seating_map, selected_seats=None):
+    """Return the seat map display as one string"""
+    geometry = geometry_of(seating_map)
+    seats_per_row = geometry.seats_per_row
+    row_prefixes = geometry.row_prefixes
+    selected = seats_by_row(selected_seats) if selected_seats else {}
+    parts = [geometry.header]
+    
+    for row_idx in range(len(seating_map)-1, -1, -1):
+        seats = _row_text(row_mask(seating_map, row_idx), seats_per_row)
+        selected_mask = selected.get(row_idx, 0)
+        if selected_mask:
+            glyphs = list(seats)
+            while selected_mask:
+                col = (selected_mask & -selected_mask).bit_length() - 1
+                if col < seats_per_row:
+                    glyphs[2 * col + 1] = "#"
+                selected_mask &= selected_mask - 1
+            seats = "".join(glyphs)
+        parts.append(f"{row_prefixes[row_idx]}{seats}\n")
     
-    print(first_line.rstrip())
-    if has_double_digits:
-        print(second_line.rstrip())
+    parts.append(geometry.footer)
+    return "".join(parts)
+
+def write_seating_map(seating_map, selected_seats=None, out=None):
+    """Render the seat map and write it to out (default stdout) in one call"""
+    (out or sys.stdout).write(render_seating_map(seating_map, selected_seats))
+
+def display_seating_map(seating_map, selected_seats=None):
+    print(render_seating_map(seating_map, selected_seats), end="")
 
 def parse_seat_position(position, rows, seats_per_row):
     if not position:
@@ -66,134 +964,193 @@ def parse_seat_position(position, rows, seats_per_row):
     if len(position) < 2:
         return None
     
-    row = ord(position[0].upper()) - ord('A')
+    # Row letters, then the seat number: "C5", "AB12"
+    letters = len(position) - len(position.lstrip(string.ascii_letters))
+    row = parse_row_label(position[:letters])
     try:
-        col = int(position[1:]) - 1
+        col = int(position[letters:]) - 1
     except ValueError:
         return None
         
-    if 0 <= row < rows and 0 <= col < seats_per_row:
+    if row is not None and 0 <= row < rows and 0 <= col < seats_per_row:
         return (row, col)
     return None
 
-def find_consecutive_seats(seating_map, current_row, num_tickets):
-    """Find best consecutive sequence of seats in a row"""
-    seats_per_row = len(seating_map[0])
-    middle = (seats_per_row - 1) // 2
-    best_seats = []
+def format_seat(row, col):
+    """Seat label such as "A1", the inverse of parse_seat_position"""
+    return f"{row_label(row)}{col + 1}"
+
+def format_seats(seats):
+    """Comma-separated seat labels, such as A4,A5,A6"""
+    return ",".join(format_seat(row, col) for row, col in seats)
+
+def free_runs(mask, seats_per_row):
+    """Yield (start, end) column ranges of free seats in a row, left to right"""
+    free = ~mask & ((1 << seats_per_row) - 1)
+    while free:
+        start = (free & -free).bit_length() - 1
+        run = free >> start
+        length = (run ^ (run + 1)).bit_length() - 1  # trailing ones of run
+        yield start, start + length
+        free = (run >> length) << (start + length)
+
+# The per-row allocation helpers below are pure functions of a row's
+# occupancy mask, so they are memoized on (mask, seats_per_row or hall
+# geometry, tickets[, start column]). A row that changes has a new mask and simply misses; no
+# entry can go stale. List results are cached as tuples.
+ALLOCATION_CACHE_SIZE = 8192  # cached answers per helper
+
+@lru_cache(maxsize=ALLOCATION_CACHE_SIZE)
+def longest_free_run(mask, seats_per_row):
+    """Length of the longest block of free seats in a row"""
+    return max((end - start for start, end in free_runs(mask, seats_per_row)), default=0)
+
+@lru_cache(maxsize=ALLOCATION_CACHE_SIZE)
+def consecutive_start(mask, geometry, num_tickets):
+    """Start column of the best block of num_tickets free seats in a row
+    with the given occupancy mask, or None"""
+    middle = geometry.middle
+    # Windows may only start from middle - num_tickets onwards; among equally
+    # close windows the leftmost wins
+    lowest_start = max(0, middle - num_tickets)
+    best_start = None
     
-    # Try sequences starting from each position around middle
-    for start in range(max(0, middle - num_tickets), seats_per_row - num_tickets + 1):
-        consecutive_seats = []
-        for col in range(start, start + num_tickets):
-            if col >= seats_per_row or seating_map[current_row][col] is not None:
-                consecutive_seats = []
-                break
-            consecutive_seats.append((current_row, col))
-        
-        if len(consecutive_seats) == num_tickets:
-            # If it's closer to middle than current best, use it
-            if not best_seats or abs(middle - start) < abs(middle - best_seats[0][1]):
-                best_seats = consecutive_seats
+    # One pass over the free runs: the best start inside a run is the middle
+    # clamped into the run's range of valid starts
+    for run_start, run_end in free_runs(mask, geometry.seats_per_row):
+        if best_start is not None and run_start - middle >= abs(middle - best_start):
+            break  # every later run starts further from the middle
+        first = max(run_start, lowest_start)
+        last = run_end - num_tickets
+        if first > last:
+            continue
+        start = min(max(middle, first), last)
+        if best_start is None or abs(middle - start) < abs(middle - best_start):
+            best_start = start
     
-    return best_seats
+    return best_start
+
+@lru_cache(maxsize=ALLOCATION_CACHE_SIZE)
+def middle_out_columns(mask, geometry, num_tickets, start_col=None):
+    """Up to num_tickets free columns: rightwards from start_col (default the
+    middle), then leftwards from just before it"""
+    if start_col is None or start_col == geometry.middle:
+        order = geometry.center_out
+    else:
+        order = chain(range(start_col, geometry.seats_per_row), range(start_col - 1, -1, -1))
+    if num_tickets <= 0:
+        return ()
+    cols = []
+    for col in order:
+        if not mask >> col & 1:
+            cols.append(col)
+            if len(cols) == num_tickets:
+                break
+    return tuple(cols)
+
+@lru_cache(maxsize=ALLOCATION_CACHE_SIZE)
+def centered_columns(mask, geometry, num_tickets):
+    """Free columns of the block of num_tickets centred in the row"""
+    window = geometry.centered_windows[min(num_tickets, geometry.seats_per_row)]
+    return tuple(col for col in window if not mask >> col & 1)
+
+_ALLOCATION_CACHES = (longest_free_run, consecutive_start, middle_out_columns, centered_columns)
+
+def allocation_cache_info():
+    """Hit/miss statistics of the memoized per-row helpers, by helper name"""
+    return {helper.__name__: helper.cache_info() for helper in _ALLOCATION_CACHES}
+
+def clear_allocation_caches():
+    for helper in _ALLOCATION_CACHES:
+        helper.cache_clear()
+
+def find_consecutive_seats(seating_map, current_row, num_tickets):
+    """Find best consecutive sequence of seats in a row"""
+    start = consecutive_start(row_mask(seating_map, current_row), geometry_of(seating_map), num_tickets)
+    if start is None:
+        return []
+    return [(current_row, col) for col in range(start, start + num_tickets)]
 
 def find_seats_from_middle(seating_map, current_row, num_tickets):
     """Find seats by filling from middle outwards"""
-    seats_per_row = len(seating_map[0])
-    middle = (seats_per_row - 1) // 2
-    seats = []
-    
-    # Fill right side first
-    col = middle
-    while col < seats_per_row and len(seats) < num_tickets:
-        if seating_map[current_row][col] is None:
-            seats.append((current_row, col))
-        col += 1
-    
-    # Then fill left side if needed
-    col = middle - 1
-    while col >= 0 and len(seats) < num_tickets:
-        if seating_map[current_row][col] is None:
-            seats.append((current_row, col))
-        col -= 1
-    
-    return seats
+    mask = row_mask(seating_map, current_row)
+    cols = middle_out_columns(mask, geometry_of(seating_map), num_tickets)
+    return [(current_row, col) for col in cols]
 
 def find_seats_in_empty_row(seating_map, current_row, num_tickets):
     """Find centered seats in an empty row"""
-    seats_per_row = len(seating_map[0])
-    middle = (seats_per_row - 1) // 2
-    seats = []
-    
-    left = middle - ((num_tickets - 1) // 2)
-    right = left + num_tickets - 1
-    
-    # Adjust if we go out of bounds
-    if left < 0:
-        left = 0
-        right = min(seats_per_row - 1, num_tickets - 1)
-    elif right >= seats_per_row:
-        right = seats_per_row - 1
-        left = max(0, right - num_tickets + 1)
-    
-    # Try filling the row
-    for col in range(left, right + 1):
-        if col >= 0 and col < seats_per_row and len(seats) < num_tickets:
-            if seating_map[current_row][col] is None:
-                seats.append((current_row, col))
-    
-    return seats
+    mask = row_mask(seating_map, current_row)
+    cols = centered_columns(mask, geometry_of(seating_map), num_tickets)
+    return [(current_row, col) for col in cols]
 
 def find_seats_from_position(seating_map, start_pos, num_tickets):
     """Find seats starting from a specific position"""
     current_row, start_col = start_pos
-    seats_per_row = len(seating_map[0])
-    seats = []
-    
-    # Fill right from start position
-    col = start_col
-    while col < seats_per_row and len(seats) < num_tickets:
-        if seating_map[current_row][col] is None:
-            seats.append((current_row, col))
-        col += 1
-    
-    # Fill left if needed
-    col = start_col - 1
-    while col >= 0 and len(seats) < num_tickets:
-        if seating_map[current_row][col] is None:
-            seats.append((current_row, col))
-        col -= 1
-    
-    return seats
+    mask = row_mask(seating_map, current_row)
+    cols = middle_out_columns(mask, geometry_of(seating_map), num_tickets, start_col)
+    return [(current_row, col) for col in cols]
 
-def find_default_seats(seating_map, num_tickets, start_pos=None):
-    """Main function to find best available seats"""
-    rows = len(seating_map)
+def occupancy_masks(seating_map):
+    """Occupancy bitmasks of every row (booked or held seats set)"""
+    masks = getattr(seating_map, "blocked_masks", None)
+    if masks is not None:
+        return masks
+    return [row_mask(seating_map, row) for row in range(len(seating_map))]
+
+def check_start_pos(start_pos, rows, seats_per_row):
+    """Raise ValueError unless start_pos is None or a seat of the hall"""
+    if start_pos is None:
+        return
+    row, col = start_pos
+    if not (0 <= row < rows and 0 <= col < seats_per_row):
+        raise ValueError(f"Start position {start_pos} is outside the hall")
+
+def allocate_seats(masks, seats_per_row, num_tickets, start_pos=None, first_row=0, index=None):
+    """find_default_seats over a list of row occupancy masks. Rows before
+    first_row are skipped, which callers may use for rows known to be full.
+    With the FeasibilityIndex of the masks, full rows are skipped in
+    O(log rows) each and a request that cannot fit fails before the search.
+    Raises ValueError if start_pos is not a seat of the hall."""
+    rows = len(masks)
+    check_start_pos(start_pos, rows, seats_per_row)
+    geometry = hall_geometry(rows, seats_per_row)
+    full = geometry.full_mask
     seats = []
     
     if start_pos:
-        current_row, _ = start_pos
-        seats = find_seats_from_position(seating_map, start_pos, num_tickets)
+        current_row, start_col = start_pos
+        cols = middle_out_columns(masks[current_row], geometry, num_tickets, start_col)
+        seats = [(current_row, col) for col in cols]
         if len(seats) < num_tickets:
             current_row += 1
     else:
-        current_row = 0
+        current_row = first_row
+    if index is not None and index.free_from(current_row) < num_tickets - len(seats):
+        return []
     
     # Continue with remaining rows if needed
     while current_row < rows and len(seats) < num_tickets:
+        if index is not None:
+            current_row = index.next_open_row(current_row)
+            if current_row is None:
+                break
+        mask = masks[current_row]
+        if mask == full:
+            current_row += 1
+            continue
         remaining_tickets = num_tickets - len(seats)
-        is_empty_row = all(seat is None for seat in seating_map[current_row])
         
-        if is_empty_row:
-            new_seats = find_seats_in_empty_row(seating_map, current_row, remaining_tickets)
+        if not mask:
+            cols = centered_columns(mask, geometry, remaining_tickets)
         else:
             # Try consecutive seats first
-            new_seats = find_consecutive_seats(seating_map, current_row, remaining_tickets)
-            if not new_seats:
-                new_seats = find_seats_from_middle(seating_map, current_row, remaining_tickets)
+            start = consecutive_start(mask, geometry, remaining_tickets)
+            if start is not None:
+                cols = range(start, start + remaining_tickets)
+            else:
+                cols = middle_out_columns(mask, geometry, remaining_tickets)
         
-        seats.extend(new_seats)
+        seats.extend((current_row, col) for col in cols)
         current_row += 1
     
     # Sort seats within each row
@@ -201,6 +1158,61 @@ def find_default_seats(seating_map, num_tickets, start_pos=None):
     
     return seats if len(seats) == num_tickets else []
 
+def find_default_seats(seating_map, num_tickets, start_pos=None):
+    """Main function to find best available seats"""
+    return allocate_seats(occupancy_masks(seating_map), len(seating_map[0]), num_tickets, start_pos,
+                          index=seating_map.index if isinstance(seating_map, SeatMap) else None)
+
+class DefaultStrategy:
+    """The original allocation policy, as in find_default_seats.
+
+    An allocation strategy is any object with a name and
+    allocate(masks, seats_per_row, num_tickets, start_pos=None, index=None)
+    returning the sorted seats for one party, or [] if it cannot be seated.
+    masks are the row occupancy bitmasks (bit c set = seat c taken) and are
+    read only; index, when given, is their FeasibilityIndex. Allocation from
+    a start position uses only that row and the rows behind it.
+    Theater.hold_seats, rehold_seats and book_batch use Theater.strategy.
+    """
+    name = "default"
+
+    def allocate(self, masks, seats_per_row, num_tickets, start_pos=None, index=None):
+        return allocate_seats(masks, seats_per_row, num_tickets, start_pos, index=index)
+
+DEFAULT_STRATEGY = DefaultStrategy()
+
+def find_batch_seats(seating_map, party_sizes, strategy=DEFAULT_STRATEGY):
+    """Allocate seats for a queue of parties in one pass over the seating state.
+
+    Gives each party exactly the seats the strategy would if the parties were
+    booked one after another, without writing to seating_map. Returns one
+    seat list per party ([] when a party cannot be seated).
+    """
+    seats_per_row = len(seating_map[0])
+    full = (1 << seats_per_row) - 1
+    masks = list(occupancy_masks(seating_map))
+    free_seats = len(masks) * seats_per_row - sum(mask.bit_count() for mask in masks)
+    first_open_row = 0
+    results = []
+    
+    for num_tickets in party_sizes:
+        if num_tickets <= 0 or num_tickets > free_seats:
+            results.append([])
+            continue
+        if strategy is DEFAULT_STRATEGY:
+            # Rows in front of the first open row stay full for the whole batch
+            while masks[first_open_row] == full:
+                first_open_row += 1
+            seats = allocate_seats(masks, seats_per_row, num_tickets, first_row=first_open_row)
+        else:
+            seats = strategy.allocate(masks, seats_per_row, num_tickets)
+        for row, col in seats:
+            masks[row] |= 1 << col
+        free_seats -= len(seats)
+        results.append(seats)
+    
+    return results
+
 def validate_ticket_quantity(tickets_input: str, available_seats: int) -> Optional[int]:
     """
     Validate the ticket quantity input.
@@ -256,12 +1268,17 @@ def book_tickets(theater):
         return
     
     booking_id = theater.generate_booking_id()
-    selected_seats = find_default_seats(theater.seating_map, num_tickets)
+    # Hold the offered seats so other terminals cannot sell them meanwhile
+    hold = theater.hold_seats(num_tickets, booking_id=booking_id)
+    if hold is None:
+        print("Sorry, these seats were just taken. Please try again.")
+        print()
+        return
     
     while True:
         print(f"Booking id: {booking_id}")
         print("Selected seats:")
-        display_seating_map(theater.seating_map, selected_seats)
+        display_seating_map(theater.seating_map, hold.seats)
         
         print("Enter blank to accept seat selection, or enter a new seating position")
         print("> ", end="")
@@ -275,16 +1292,18 @@ def book_tickets(theater):
         if start_pos is None:
             continue
             
-        new_seats = find_default_seats(theater.seating_map, num_tickets, start_pos)
-        if not new_seats:
+        new_hold = theater.rehold_seats(hold, start_pos)
+        if new_hold is None:
             print("Cannot allocate seats from that position. Please try again.")
             continue
             
-        selected_seats = new_seats
+        hold = new_hold
     
     # Confirm booking
-    for row, col in selected_seats:
-        theater.seating_map[row][col] = booking_id
+    if theater.confirm_hold(hold) is None:
+        print("Sorry, the hold on these seats expired and they were taken. Please try again.")
+        print()
+        return
     
     print(f"Successfully reserved {num_tickets} {theater.movie_name} tickets.")
     print(f"Booking id: {booking_id} confirmed")
@@ -301,23 +1320,21 @@ def check_booking(theater):
         if not booking_id:
             return
             
-        # Find all seats with this booking ID
-        booked_seats = []
-        for row_idx, row in enumerate(theater.seating_map):
-            for col_idx, seat in enumerate(row):
-                if seat == booking_id:
-                    booked_seats.append((row_idx, col_idx))
+        booking = theater.find_booking(booking_id)
         
-        if not booked_seats:
+        if booking is None:
             print(f"No booking found with id: {booking_id}")
             print()
             continue  # Changed from return to continue to keep loop going
         
         print(f"Booking id: {booking_id}:")
         print("Selected seats:")
-        display_seating_map(theater.seating_map, booked_seats)
+        display_seating_map(theater.seating_map, booking.seats)
         print()
 
+MAX_ROWS = 702  # rows A-Z, then AA-ZZ
+MAX_SEATS_PER_ROW = 999
+
 def get_theater_setup():
     while True:
         try:
@@ -336,12 +1353,12 @@ def get_theater_setup():
             rows = int(setup[1])
             seats_per_row = int(setup[2])
             
-            if not (1 <= rows <= 26):
-                print("Error: Number of rows must be between 1 and 26")
+            if not (1 <= rows <= MAX_ROWS):
+                print(f"Error: Number of rows must be between 1 and {MAX_ROWS}")
                 continue
                 
-            if not (1 <= seats_per_row <= 50):
-                print("Error: Seats per row must be between 1 and 50")
+            if not (1 <= seats_per_row <= MAX_SEATS_PER_ROW):
+                print(f"Error: Seats per row must be between 1 and {MAX_SEATS_PER_ROW}")
                 continue
                 
             return title, rows, seats_per_row
@@ -0,0 +1,119 @@
+import time
+
+from theater_booking import HOLD_TTL, BookingIdGenerator, Theater
+
+class Venue:
+    """Registry of many Theaters (one per screen and showtime) that share
+    one booking id namespace, so booking ids never collide across shows"""
+    def __init__(self, name="Rocket Cinemas", id_prefix="HKG"):
+        self.name = name
+        self.shows = {}  # (screen, showtime) -> Theater
+        self.id_generator = BookingIdGenerator(id_prefix)
+        self._booking_shows = {}  # booking_id -> (screen, showtime)
+        self._holds = {}  # booking_id -> (Theater, SeatHold) for unconfirmed holds
+
+    def add_show(self, screen, showtime, movie_name, rows, seats_per_row):
+        key = (screen, showtime)
+        if key in self.shows:
+            raise ValueError(f"Show already exists: {screen} {showtime}")
+        theater = Theater(movie_name, rows, seats_per_row, self.id_generator)
+        theater.show_key = key
+        theater.add_booking_listener(self._track_booking)
+        self.shows[key] = theater
+        return theater
+
+    def load_shows(self, show_specs):
+        """Bulk-add shows from (screen, showtime, movie_name, rows, seats_per_row)
+        tuples, e.g. a day's schedule at startup. Returns the number loaded."""
+        add_show = self.add_show
+        count = 0
+        for screen, showtime, movie_name, rows, seats_per_row in show_specs:
+            add_show(screen, showtime, movie_name, rows, seats_per_row)
+            count += 1
+        return count
+
+    def remove_show(self, screen, showtime):
+        theater = self.shows.pop((screen, showtime))
+        for booking_id in theater.bookings:
+            del self._booking_shows[booking_id]
+        return theater
+
+    def get_show(self, screen, showtime):
+        """Return the Theater for a show, or None"""
+        return self.shows.get((screen, showtime))
+
+    def book(self, screen, showtime, num_tickets, start_pos=None):
+        """Allocate and confirm seats on one show.
+        Returns (booking_id, seats), or None if the seats cannot be allocated.
+        Raises ValueError if start_pos is not a seat of the hall."""
+        theater = self.shows[(screen, showtime)]
+        if num_tickets <= 0 or num_tickets > theater.get_available_seats():
+            return None
+        hold = theater.hold_seats(num_tickets, start_pos, ttl=None)  # confirmed straight away
+        if hold is None or theater.confirm_hold(hold) is None:
+            return None
+        return hold.booking_id, hold.seats
+
+    def hold(self, screen, showtime, num_tickets, start_pos=None, ttl=HOLD_TTL):
+        """Hold seats on one show; returns a SeatHold, or None"""
+        theater = self.shows[(screen, showtime)]
+        if num_tickets <= 0 or num_tickets > theater.get_available_seats():
+            return None
+        hold = theater.hold_seats(num_tickets, start_pos, ttl=ttl)
+        if hold is not None:
+            self._holds[hold.booking_id] = (theater, hold)
+        return hold
+
+    def confirm(self, booking_id):
+        """Confirm a hold made with hold(); returns the Booking, or None"""
+        entry = self._holds.pop(booking_id, None)
+        if entry is None:
+            return None
+        theater, hold = entry
+        return theater.confirm_hold(hold)
+
+    def release(self, booking_id):
+        """Release a hold made with hold(); returns True if it was active"""
+        entry = self._holds.pop(booking_id, None)
+        if entry is None:
+            return False
+        theater, hold = entry
+        return theater.release_hold(hold)
+
+    def cancel(self, booking_id, seats=None):
+        """Cancel a confirmed booking, or only some of its seats.
+        Returns the released seats, or None (see Theater.cancel_booking)."""
+        theater = self.find_show(booking_id)
+        if theater is None:
+            return None
+        return theater.cancel_booking(booking_id, seats)
+
+    def release_expired_holds(self):
+        """Release expired holds on every show; returns how many were released"""
+        released = sum(theater.release_expired_holds() for theater in self.shows.values())
+        now = time.monotonic()
+        for booking_id, (_, hold) in list(self._holds.items()):
+            if hold.expired(now):
+                del self._holds[booking_id]
+        return released
+
+    def find_show(self, booking_id):
+        """Return the Theater holding booking_id, or None (O(1))"""
+        key = self._booking_shows.get(booking_id)
+        return self.shows[key] if key is not None else None
+
+    def find_booking(self, booking_id):
+        """Return (theater, Booking) for booking_id, or None (O(1))"""
+        theater = self.find_show(booking_id)
+        if theater is None:
+            return None
+        return theater, theater.find_booking(booking_id)
+
+    def get_available_seats(self):
+        return {key: theater.get_available_seats() for key, theater in self.shows.items()}
+
+    def _track_booking(self, theater, booking_id, booked):
+        if booked:
+            self._booking_shows[booking_id] = theater.show_key
+        else:
+            self._booking_shows.pop(booking_id, None)